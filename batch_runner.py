@@ -0,0 +1,186 @@
+"""
+Batch runner: study guides for a list of videos or whole playlists.
+
+    python batch_runner.py urls.txt
+    python batch_runner.py "https://www.youtube.com/playlist?list=..." --workers 4
+
+Every video runs main.py in its own process and job workspace, up to
+BATCH_WORKERS at a time, sharing the artifact and vision caches. Results,
+timings and failures go to a JSON manifest after each video; running the same
+command again skips the videos already done and retries the rest in their
+old workspaces.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.crewai_video_study_guide.tools.metadata_probe import expand_playlist, extract_video_id
+from src.crewai_video_study_guide.tools.workspace import JobWorkspace, WORKSPACE_ENV, WORKSPACE_ROOT, check_root
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+BATCH_WORKERS = 3
+MANIFEST_FILE = 'batch_manifest.json'
+PLAYLIST_MARKERS = ('list=', '/playlist', '/channel/', '/c/', '/user/', '/@')
+ERROR_TAIL_LINES = 20
+
+
+def is_playlist_url(url):
+    # watch?v=...&list=... is one video opened from a playlist, not the playlist
+    if extract_video_id(url) is not None:
+        return False
+    return any(marker in url for marker in PLAYLIST_MARKERS)
+
+
+def read_sources(source):
+    """URLs from a file (one per line, '#' comments) or the argument itself"""
+    if not os.path.isfile(source):
+        return [source]
+    with open(source, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+def expand_sources(sources):
+    """Video URLs in order, with playlists expanded (one yt-dlp listing each) and repeats dropped"""
+    urls = []
+    for source in sources:
+        if is_playlist_url(source):
+            try:
+                videos = expand_playlist(source)
+            except RuntimeError as e:
+                print(f"⚠️  Skipping {source}: {e}")
+                continue
+            print(f"📃 {source}: {len(videos)} videos")
+            urls.extend(videos)
+        else:
+            urls.append(source)
+    return list(dict.fromkeys(urls))
+
+
+class BatchManifest:
+    """url -> job record, saved atomically after every change"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.jobs = json.load(f)['jobs']
+        except FileNotFoundError:
+            self.jobs = {}
+
+    def get(self, url):
+        with self._lock:
+            return dict(self.jobs.get(url) or {})
+
+    def update(self, url, **fields):
+        with self._lock:
+            self.jobs.setdefault(url, {}).update(fields)
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({'jobs': self.jobs}, f, indent=2)
+            os.replace(self.path + '.tmp', self.path)
+
+    def is_done(self, url):
+        entry = self.get(url)
+        return entry.get('status') == 'done' and os.path.exists(entry.get('output', ''))
+
+
+def log_line(log_path, prefix):
+    """The last line of a job log containing prefix (e.g. the extractor's 'Stage timings:'), if it got that far"""
+    try:
+        with open(log_path, encoding='utf-8', errors='replace') as f:
+            lines = [line.strip() for line in f if prefix in line]
+    except OSError:
+        return None
+    return lines[-1] if lines else None
+
+
+def run_job(url, manifest, workspace_root, output_file):
+    entry = manifest.get(url)
+    # A retry reuses the earlier workspace, so whatever that attempt produced is still there
+    if entry.get('workspace'):
+        workspace = JobWorkspace.at(entry['workspace'], output_file=output_file)
+    else:
+        workspace = JobWorkspace.for_url(url, root=workspace_root, output_file=output_file)
+    workspace.create()
+    log_path = os.path.join(workspace.path, 'run.log')
+    attempts = entry.get('attempts', 0) + 1
+    manifest.update(url, status='running', job_id=workspace.job_id, workspace=workspace.path,
+                    log=log_path, attempts=attempts, started=time.strftime('%Y-%m-%dT%H:%M:%S'))
+    print(f"▶️  {url} → {workspace.path}")
+
+    started = time.time()
+    with open(log_path, 'w', encoding='utf-8') as log:
+        result = subprocess.run([sys.executable, MAIN_SCRIPT, url], stdout=log, stderr=subprocess.STDOUT,
+                                env={**os.environ, WORKSPACE_ENV: workspace.path})
+    seconds = round(time.time() - started, 1)
+
+    if result.returncode == 0 and os.path.exists(workspace.output_path):
+        manifest.update(url, status='done', seconds=seconds, output=workspace.output_path,
+                        stage_timings=log_line(log_path, 'Stage timings:'),
+                        llm_usage=log_line(log_path, 'LLM usage:'), budget=log_line(log_path, 'Budget vs actual'),
+                        error=None, log_tail=None)
+        print(f"✅ {url} ({seconds:.0f}s)")
+        return True
+
+    with open(log_path, encoding='utf-8', errors='replace') as log:
+        tail = log.readlines()[-ERROR_TAIL_LINES:]
+    error = f"exit code {result.returncode}" if result.returncode else "no study guide written"
+    manifest.update(url, status='failed', seconds=seconds, error=error, log_tail=''.join(tail))
+    print(f"❌ {url}: {error} (see {log_path})")
+    return False
+
+
+def run_batch(sources, workers=BATCH_WORKERS, manifest_path=MANIFEST_FILE):
+    """Process every video in sources; returns the URLs that failed"""
+    try:
+        from config import WORKSPACE_DIR, OUTPUT_FILE
+    except ImportError:
+        WORKSPACE_DIR, OUTPUT_FILE = WORKSPACE_ROOT, 'final_study_guide.md'
+    check_root(WORKSPACE_DIR)  # Fail before any job rather than once per job
+
+    urls = expand_sources(sources)
+    manifest = BatchManifest(manifest_path)
+    pending = [url for url in urls if not manifest.is_done(url)]
+    print(f"🎬 {len(urls)} videos: {len(urls) - len(pending)} already done, "
+          f"{len(pending)} to process with {workers} workers")
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda url: run_job(url, manifest, WORKSPACE_DIR, OUTPUT_FILE), pending))
+    elapsed = time.time() - started
+
+    job_seconds = sum(manifest.get(url).get('seconds', 0) for url in pending)
+    print(f"\n📊 {sum(results)} done, {len(results) - sum(results)} failed, "
+          f"{len(urls) - len(pending)} skipped in {elapsed:.0f}s "
+          f"({job_seconds:.0f}s of job time, {job_seconds / elapsed if elapsed else 0:.1f}x parallel)")
+    print(f"📄 Manifest: {os.path.abspath(manifest_path)}")
+    return [url for url, ok in zip(pending, results) if not ok]
+
+
+def main():
+    try:
+        from config import BATCH_WORKERS as workers, BATCH_MANIFEST as manifest_path
+    except ImportError:
+        workers, manifest_path = BATCH_WORKERS, MANIFEST_FILE
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('sources', nargs='+', help="video/playlist URLs, or files with one URL per line")
+    parser.add_argument('--workers', type=int, default=workers, help=f"videos processed at once (default {workers})")
+    parser.add_argument('--manifest', default=manifest_path, help=f"progress/results file (default {manifest_path})")
+    args = parser.parse_args()
+
+    sources = [url for source in args.sources for url in read_sources(source)]
+    try:
+        failed = run_batch(sources, args.workers, args.manifest)
+    except ValueError as e:
+        parser.error(str(e))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
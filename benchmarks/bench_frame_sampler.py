@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Benchmark: per-screenshot seeking (old extract_video_data loop) vs the
+sequential-decode frame sampler, on synthetic videos of several lengths.
+
+Keyframe spacing decides which approach wins, so each length is encoded
+with a short GOP (cheap seeks) and a long, YouTube-like GOP. GOP control
+needs the ffmpeg binary (libx264); without it OpenCV's mp4v default is used.
+
+Usage: python benchmarks/bench_frame_sampler.py [--lengths 60 300 900] [--intervals 2 10 60] [--gops 12 150]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_video_study_guide.tools.frame_sampler import plan_frame_indices, sample_frames
+
+FPS = 30
+WIDTH, HEIGHT = 640, 360
+
+
+def make_synthetic_video(path, seconds, gop):
+    """Write a moving-pattern test video so every frame really has to be decoded"""
+    raw_path = path + ".raw.mp4"
+    writer = cv2.VideoWriter(raw_path, cv2.VideoWriter_fourcc(*"mp4v"), FPS, (WIDTH, HEIGHT))
+    base = cv2.resize(np.random.default_rng(0).integers(0, 255, (HEIGHT // 8, WIDTH // 8, 3), dtype=np.uint8),
+                      (WIDTH, HEIGHT), interpolation=cv2.INTER_NEAREST)
+    for i in range(int(seconds * FPS)):
+        frame = np.roll(base, i * 4, axis=1)
+        cv2.putText(frame, f"{i / FPS:8.2f}s", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+        writer.write(frame)
+    writer.release()
+
+    if shutil.which("ffmpeg"):
+        cmd = ['ffmpeg', '-y', '-loglevel', 'error', '-i', raw_path, '-c:v', 'libx264', '-preset', 'ultrafast',
+               '-g', str(gop), '-keyint_min', str(gop), '-sc_threshold', '0', path]
+        subprocess.run(cmd, check=True)
+        os.remove(raw_path)
+    else:
+        os.replace(raw_path, path)
+
+
+def legacy_seek_loop(video_path, frame_indices):
+    """The original loop: cap.set() + cap.read() for every screenshot"""
+    cap = cv2.VideoCapture(video_path)
+    count = 0
+    for index in frame_indices:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        ret, _ = cap.read()
+        if not ret:
+            break
+        count += 1
+    cap.release()
+    return count
+
+
+def sampler_loop(video_path, frame_indices):
+    cap = cv2.VideoCapture(video_path)
+    count = sum(1 for _ in sample_frames(cap, frame_indices))
+    cap.release()
+    return count
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[60, 300, 900], help="video lengths in seconds")
+    parser.add_argument("--intervals", type=int, nargs="+", default=[2, 10, 60], help="screenshot intervals in seconds")
+    parser.add_argument("--gops", type=int, nargs="+", default=[12, 150], help="keyframe intervals in frames")
+    parser.add_argument("--max-screenshots", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'length':>8} {'gop':>5} {'interval':>9} {'shots':>6} {'legacy s':>9} {'sampler s':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for seconds in args.lengths:
+            for gop in args.gops:
+                video_path = os.path.join(tmp, f"synthetic_{seconds}s_gop{gop}.mp4")
+                make_synthetic_video(video_path, seconds, gop)
+                total_frames = int(cv2.VideoCapture(video_path).get(cv2.CAP_PROP_FRAME_COUNT))
+
+                for interval in args.intervals:
+                    indices = plan_frame_indices(total_frames, FPS, interval, args.max_screenshots)
+                    legacy_count, legacy_time = timed(legacy_seek_loop, video_path, indices)
+                    sampler_count, sampler_time = timed(sampler_loop, video_path, indices)
+                    assert legacy_count == sampler_count, (legacy_count, sampler_count)
+                    print(f"{seconds:>7}s {gop:>5} {interval:>8}s {sampler_count:>6} {legacy_time:>9.2f} "
+                          f"{sampler_time:>10.2f} {legacy_time / sampler_time:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
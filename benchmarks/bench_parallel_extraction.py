@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Benchmark: single-process vs segmented multi-process extraction.
+
+Times scene probing (the decode-heavy ADAPTIVE_DENSITY pass) and
+fixed-interval sampling for 1..N worker processes on a synthetic video,
+and checks that every worker count produces the same frames.
+
+Usage: python benchmarks/bench_parallel_extraction.py [--seconds 1800] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_frame_sampler import FPS, make_synthetic_video
+from src.crewai_video_study_guide.tools.frame_sampler import plan_frame_indices, sample_frames
+from src.crewai_video_study_guide.tools.parallel_extractor import sample_frames_parallel
+from src.crewai_video_study_guide.tools.scene_detector import probe_thumbnails
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=int, default=1800, help="synthetic video length")
+    parser.add_argument("--interval", type=int, default=30, help="screenshot interval in seconds")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video_path = os.path.join(tmp, "video.mp4")
+        make_synthetic_video(video_path, args.seconds, 150)
+        total_frames = args.seconds * FPS
+        indices = plan_frame_indices(total_frames, FPS, args.interval, 1000)
+
+        print(f"{'workers':>8} {'probe s':>8} {'sample s':>9} {'probe x':>8} {'sample x':>9}")
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            cap = cv2.VideoCapture(video_path)
+            start = time.perf_counter()
+            probes, thumbnails = probe_thumbnails(cap, FPS, total_frames, source=video_path, workers=workers)
+            probe_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if workers > 1:
+                frames = list(sample_frames_parallel(video_path, indices, workers))
+            else:
+                frames = list(sample_frames(cap, indices))
+            sample_time = time.perf_counter() - start
+            cap.release()
+
+            result = (probes, thumbnails, [i for i, _ in frames])
+            if baseline is None:
+                baseline = (result, probe_time, sample_time)
+            else:
+                assert np.array_equal(result[0], baseline[0][0]) and result[2] == baseline[0][2]
+                assert np.array_equal(result[1], baseline[0][1])
+            print(f"{workers:>8} {probe_time:>8.2f} {sample_time:>9.2f} "
+                  f"{baseline[1] / probe_time:>7.2f}x {baseline[2] / sample_time:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
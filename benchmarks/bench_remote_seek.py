@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+Benchmark: full download vs remote-seek extraction.
+
+Serves a synthetic MP4 from a local HTTP server with Range support and
+counts the bytes each approach pulls to extract the same screenshots. The
+server is throttled to a given bandwidth so that, as on a real network, a
+client that seeks away stops the transfer instead of draining the file into
+loopback socket buffers.
+
+Usage: python benchmarks/bench_remote_seek.py [--seconds 900] [--interval 60]
+"""
+import argparse
+import http.server
+import os
+import re
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_frame_sampler import FPS, make_synthetic_video
+from src.crewai_video_study_guide.tools.frame_sampler import plan_frame_indices, sample_frames
+from src.crewai_video_study_guide.tools.remote_source import open_remote_capture
+
+
+class RangeRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler with single-range Range support and byte accounting"""
+    bytes_served = 0
+    requests = 0
+    bandwidth = 50 * 1024 ** 2  # bytes per second
+
+    def setup(self):
+        super().setup()
+        # Keep in-flight data near a real connection's window rather than loopback's multi-MB buffers
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 128 * 1024)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+
+        match = re.match(r'bytes=(\d*)-(\d*)', self.headers.get('Range', ''))
+        if match:
+            if match.group(1):
+                start = int(match.group(1))
+                if match.group(2):
+                    end = min(int(match.group(2)), size - 1)
+            else:
+                start = max(0, size - int(match.group(2)))
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        else:
+            self.send_response(200)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        type(self).requests += 1
+
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            try:
+                while remaining > 0:
+                    chunk = f.read(min(64 * 1024, remaining))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    type(self).bytes_served += len(chunk)
+                    remaining -= len(chunk)
+                    time.sleep(len(chunk) / self.bandwidth)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client seeked away and dropped the connection
+
+
+def serve(directory):
+    handler = lambda *args, **kwargs: RangeRequestHandler(*args, directory=directory, **kwargs)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def reset_counters():
+    RangeRequestHandler.bytes_served = 0
+    RangeRequestHandler.requests = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=int, default=900, help="synthetic video length")
+    parser.add_argument("--interval", type=int, default=60, help="screenshot interval in seconds")
+    parser.add_argument("--gop", type=int, default=150, help="keyframe interval in frames")
+    parser.add_argument("--bandwidth", type=float, default=50, help="emulated network bandwidth in MB/s")
+    args = parser.parse_args()
+    RangeRequestHandler.bandwidth = args.bandwidth * 1024 ** 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_synthetic_video(os.path.join(tmp, "video.mp4"), args.seconds, args.gop)
+        size = os.path.getsize(os.path.join(tmp, "video.mp4"))
+        server = serve(tmp)
+        url = f"http://127.0.0.1:{server.server_address[1]}/video.mp4"
+        indices = plan_frame_indices(args.seconds * FPS, FPS, args.interval, 1000)
+
+        reset_counters()
+        start = time.perf_counter()
+        local_path = os.path.join(tmp, "downloaded.mp4")
+        urllib.request.urlretrieve(url, local_path)
+        cap = cv2.VideoCapture(local_path)
+        download_frames = sum(1 for _ in sample_frames(cap, indices))
+        cap.release()
+        download = (RangeRequestHandler.bytes_served, RangeRequestHandler.requests, time.perf_counter() - start)
+
+        reset_counters()
+        start = time.perf_counter()
+        cap = open_remote_capture(url)
+        remote_frames = sum(1 for _ in sample_frames(cap, indices))
+        cap.release()
+        remote = (RangeRequestHandler.bytes_served, RangeRequestHandler.requests, time.perf_counter() - start)
+        server.shutdown()
+
+    print(f"Video: {args.seconds}s, {size / 1024 ** 2:.1f} MB, {len(indices)} screenshots every {args.interval}s")
+    print(f"{'mode':>10} {'frames':>7} {'MB fetched':>11} {'requests':>9} {'seconds':>8}")
+    for name, frames, (fetched, requests, elapsed) in (("download", download_frames, download),
+                                                       ("remote", remote_frames, remote)):
+        print(f"{name:>10} {frames:>7} {fetched / 1024 ** 2:>11.2f} {requests:>9} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+Benchmark: language-guessing transcript calls vs TranscriptEngine.
+
+Runs a local stand-in for the transcript endpoint (track listings and json3
+caption files, each answered after a fixed latency) and fetches transcripts
+for videos with different track setups two ways: the old chain of
+get_transcript('en'), ('en-US'), (any), where every guess lists the tracks
+again, and TranscriptEngine, which lists once, picks locally, falls back to
+the probe's caption tracks and caches by video ID. Checks both return the
+same segments wherever the old chain finds one.
+
+Usage: python benchmarks/bench_transcript.py [--latency 0.3]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_video_study_guide.tools.transcript_engine import (CaptionTrackSource, TranscriptApiSource,
+                                                                  TranscriptEngine)
+
+# video ID -> [(language code, generated)] the transcript API lists; 'captions' videos only have probe tracks
+VIDEOS = {
+    'manual-en': [('en', False), ('de', True)],
+    'en-us-only': [('en-US', False)],
+    'german-only': [('de', True)],
+    'captions-only': [],
+}
+
+
+def segments_for(video_id, language):
+    return [{'text': f"{video_id} {language} line {i}", 'start': i * 4.0, 'duration': 4.0} for i in range(50)]
+
+
+class StubTranscriptHandler(BaseHTTPRequestHandler):
+    """GET /list/<video> -> tracks; GET /captions/<video>/<language> -> json3 caption file"""
+    latency = 0.3
+    requests = 0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        type(self).requests += 1
+        parts = self.path.strip('/').split('/')
+        if parts[0] == 'list':
+            body = {'tracks': [{'language_code': code, 'is_generated': generated}
+                               for code, generated in VIDEOS.get(parts[1], [])]}
+        else:
+            body = {'events': [{'tStartMs': int(s['start'] * 1000), 'dDurationMs': int(s['duration'] * 1000),
+                                'segs': [{'utf8': s['text']}]} for s in segments_for(parts[1], parts[2])]}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class NoTranscriptFound(Exception):
+    pass
+
+
+class StubTranscript:
+    def __init__(self, base_url, video_id, language_code, is_generated):
+        self.base_url, self.video_id = base_url, video_id
+        self.language_code, self.is_generated = language_code, is_generated
+
+    def fetch(self):
+        with urllib.request.urlopen(f"{self.base_url}/captions/{self.video_id}/{self.language_code}") as response:
+            events = json.load(response)['events']
+        return [{'text': e['segs'][0]['utf8'], 'start': e['tStartMs'] / 1000, 'duration': e['dDurationMs'] / 1000}
+                for e in events]
+
+
+class StubTranscriptApi:
+    """Stand-in for YouTubeTranscriptApi backed by the local server (1.x instance API)"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def list(self, video_id):
+        with urllib.request.urlopen(f"{self.base_url}/list/{video_id}") as response:
+            tracks = json.load(response)['tracks']
+        if not tracks:
+            raise NoTranscriptFound(video_id)
+        return [StubTranscript(self.base_url, video_id, t['language_code'], t['is_generated']) for t in tracks]
+
+    def get_transcript(self, video_id, languages=None):
+        """The pre-1.0 class method: a listing plus a fetch for every call"""
+        tracks = self.list(video_id)
+        matches = [t for language in languages for t in tracks if t.language_code == language] if languages else tracks
+        if not matches:
+            raise NoTranscriptFound(f"{video_id}: {languages}")
+        return matches[0].fetch()
+
+
+def legacy_transcript(api, video_id):
+    for languages in (['en'], ['en-US'], None):
+        try:
+            return api.get_transcript(video_id, languages=languages)
+        except NoTranscriptFound:
+            continue
+    return None
+
+
+def probe_info(base_url, video_id):
+    """The caption tracks a yt-dlp probe would list for the video"""
+    return {'automatic_captions': {'en': [{'ext': 'json3', 'url': f"{base_url}/captions/{video_id}/en"}]}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="stand-in seconds per request")
+    args = parser.parse_args()
+    StubTranscriptHandler.latency = args.latency
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubTranscriptHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    api = StubTranscriptApi(base_url)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for video_id in VIDEOS:
+            StubTranscriptHandler.requests = 0
+            start = time.perf_counter()
+            legacy = legacy_transcript(api, video_id)
+            legacy_time, legacy_requests = time.perf_counter() - start, StubTranscriptHandler.requests
+
+            timings = []
+            for _ in range(2):  # Cold, then from the cache
+                StubTranscriptHandler.requests = 0
+                engine = TranscriptEngine(cache_dir=cache_dir, sources=[
+                    TranscriptApiSource(api), CaptionTrackSource(probe_info(base_url, video_id))])
+                start = time.perf_counter()
+                result, _ = engine.get(video_id)
+                timings.append((time.perf_counter() - start, StubTranscriptHandler.requests))
+
+            print(f"{video_id:>13}: legacy {legacy_time:5.2f}s {legacy_requests} requests "
+                  f"({'found' if legacy else 'none'}) | engine {timings[0][0]:5.2f}s {timings[0][1]} requests "
+                  f"({result['language']} from {result['source']}) | cached {timings[1][0]:5.3f}s "
+                  f"{timings[1][1]} requests")
+            if legacy is not None:
+                assert result['segments'] == legacy, video_id
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
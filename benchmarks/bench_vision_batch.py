@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Benchmark: one-screenshot-per-call vision analysis vs the batched engine.
+
+Runs a local OpenAI-compatible stub server that answers every image with a
+fixed latency, then analyzes the same screenshots one at a time (the agent's
+VisionTool loop) and through BatchVisionAnalyzer, and checks both return the
+same per-screenshot analyses in timestamp order.
+
+Usage: python benchmarks/bench_vision_batch.py [--screenshots 30] [--latency 0.8]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_video_study_guide.tools.llm_client import ChatClient
+from src.crewai_video_study_guide.tools.vision_batch import BatchVisionAnalyzer
+
+
+class StubVisionHandler(BaseHTTPRequestHandler):
+    """Answers chat completions with one '### Image n' section per image, after a fixed delay"""
+    latency = 0.8
+    per_image = 0.1
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        content = body['messages'][0]['content']
+        if isinstance(content, str):  # Text-only prompt (synthesis)
+            content = [{'type': 'text', 'text': content}]
+        images = [part['image_url']['url'] for part in content if part['type'] == 'image_url']
+        time.sleep(self.latency + self.per_image * len(images))
+
+        # Stub images differ in size, so the data URL length identifies each one in the answer
+        labels = [len(url) for url in images]
+        if not images:
+            reply = f"notes from a {len(content[0]['text'])} character prompt"
+        elif len(images) == 1:
+            reply = f"analysis of image with {labels[0]} base64 chars"
+        else:
+            reply = "\n".join(f"### Image {n}\nanalysis of image with {label} base64 chars"
+                              for n, label in enumerate(labels, 1))
+        data = json.dumps({'choices': [{'message': {'content': reply}}],
+                           'usage': {'prompt_tokens': 100 * len(images), 'completion_tokens': 20}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubVisionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--screenshots", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.8, help="stub seconds per request")
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--max-rpm", type=int, default=600)
+    args = parser.parse_args()
+    StubVisionHandler.latency = args.latency
+
+    server, base_url = serve()
+    with tempfile.TemporaryDirectory() as tmp:
+        screenshots = []
+        for i in range(args.screenshots):
+            path = os.path.join(tmp, f"ss_{i // 60:02d}_{i % 60:02d}.jpg")
+            noise = np.random.default_rng(i).integers(0, 255, (90 + i, 160, 3), dtype=np.uint8)
+            cv2.imwrite(path, noise)
+            screenshots.append({'path': path, 'times': [f"{i // 60:02d}_{i % 60:02d}"]})
+
+        client = ChatClient('openai', 'stub', base_url, api_key='stub')
+        results = {}
+        for label, batch_size, concurrency in [("one per call", 1, 1),
+                                               ("batched", args.batch_size, args.concurrency)]:
+            analyzer = BatchVisionAnalyzer(client, batch_size, concurrency, args.max_rpm)
+            start = time.perf_counter()
+            analyses = analyzer.analyze(list(reversed(screenshots)))
+            elapsed = time.perf_counter() - start
+            results[label] = analyses
+            print(f"{label:>13}: {elapsed:6.2f}s, {analyzer.requests} requests, "
+                  f"{analyzer.usage['prompt_tokens']} prompt tokens")
+
+        assert [r['times'] for r in results['batched']] == [s['times'] for s in screenshots]
+        assert [r['analysis'] for r in results['batched']] == [r['analysis'] for r in results['one per call']]
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
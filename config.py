@@ -11,11 +11,24 @@ VIDEO_URL = 'https://youtu.be/kNcPTdiDwkI'  # Longer video for HIGH quality test
 
 FORCE_INTERVAL_SECONDS = None  # None = auto-calculate, or set specific interval (e.g., 60)
 FORCE_MAX_SCREENSHOTS = None   # None = auto-calculate, or set specific limit (e.g., 20)
-FORCE_MAX_RPM = None          # None = auto-calculate, or set specific rate limit (e.g., 10)
+FORCE_MAX_RPM = None          # None = RATE_LIMIT_RPM, or set specific rate limit (e.g., 10)
+
+# ===== BUDGET SETTINGS =====
+# The planner picks the screenshot count and request concurrency that fit these, and prints its
+# prediction ('Budget plan:') and the measured cost ('Budget vs actual') for every run
+TARGET_JOB_SECONDS = 600      # Wall-clock target per video
+TOKEN_BUDGET = 300_000        # Vision and synthesis tokens per video (the hard limit)
+RATE_LIMIT_RPM = 30           # Requests per minute your API key allows
 
 # ===== OUTPUT SETTINGS =====
-OUTPUT_FILE = 'final_study_guide.md'
-SCREENSHOT_DIR = 'screenshots'
+OUTPUT_FILE = 'final_study_guide.md'   # Written inside the job workspace
+WORKSPACE_DIR = 'jobs'            # Each run works in its own WORKSPACE_DIR/<job id>/ (video, screenshots, transcript, guide)
+KEEP_JOB_FILES = True             # False = delete screenshots/transcripts after the run, keeping only the guide
+RESUME_JOBS = True                # Rerunning a video whose last job failed resumes it from its last finished stage
+
+# ===== BATCH SETTINGS (batch_runner.py) =====
+BATCH_WORKERS = 3                 # Videos processed at once, each in its own process and workspace
+BATCH_MANIFEST = 'batch_manifest.json'  # Results, timings and failures; rerunning skips videos already done
 
 # ===== ENHANCED NOTE-TAKING SETTINGS =====
 DETAILED_ANALYSIS = True          # Enable detailed visual analysis
@@ -26,15 +39,45 @@ INCLUDE_TIMESTAMPS = True         # Include precise timestamps in notes
 
 # ===== SPEED OPTIMIZATION SETTINGS =====
 ENABLE_PARALLEL_PROCESSING = True # Process multiple screenshots simultaneously
-BATCH_SIZE = 5                    # Number of screenshots to process in parallel
-FAST_MODE = False                 # Disable for better quality (set True for speed)
+BATCH_SIZE = 5                    # Screenshots sent to the vision model per request
+FAST_MODE = False                 # True halves the preferred screenshot density
 REDUCE_API_CALLS = False          # Allow more API calls for better coverage
-MAX_CONCURRENT_REQUESTS = 3       # Maximum parallel API requests
+MAX_CONCURRENT_REQUESTS = 3       # Maximum parallel API requests (the planner uses fewer when they suffice)
+DIRECT_EXTRACTION = True          # Run the extractor as plain code before kickoff (no video_engineer LLM round trip)
+
+# ===== EXTRACTION SETTINGS =====
+EXTRACTION_MODE = "download"      # "download" = fetch whole video, "remote" = seek on the stream URL
+                                  # and fetch only the byte ranges around each screenshot (fixed intervals only)
+MIN_FRAME_HEIGHT = 720            # Download the smallest video-only stream at least this tall (text legibility)
+STREAM_EXTRACTION = True          # Decode frames while the download is still running (one process). Best when the
+                                  # download is the bottleneck; False waits for the file, then decodes in parallel
+EXTRACTION_WORKERS = None         # Decode processes for long videos when not streaming (None = CPU count, 1 = single process)
+
+# ===== CACHE SETTINGS =====
+ENABLE_ARTIFACT_CACHE = True      # Reuse screenshots/transcript from earlier runs of the same video
+ARTIFACT_CACHE_DIR = '.cache/artifacts'
+ARTIFACT_CACHE_MAX_BYTES = 2 * 1024 ** 3  # Least-recently-used entries are evicted above this size (2 GB)
+PROBE_CACHE_DIR = '.cache/probes'  # yt-dlp metadata per video, shared by duration detection, sampling and download (None disables)
+TRANSCRIPT_CACHE_DIR = '.cache/transcripts'  # Transcripts per video ID and language preference (None disables)
+TRANSCRIPT_CACHE_MAX_AGE_DAYS = 30  # Cached manual transcripts older than this are fetched again
+GENERATED_TRANSCRIPT_MAX_AGE_DAYS = 3  # Same for generated ones, so a manual track uploaded later is picked up
+TRANSCRIPT_LANGUAGES = ['en', 'en-US', 'en-GB']  # Preferred transcript languages, in order; otherwise the original track
+ENABLE_VISION_CACHE = True        # Reuse vision analyses of identical images (same prompt and model)
+VISION_CACHE_PATH = '.cache/vision.sqlite3'
+VISION_CACHE_MAX_BYTES = 64 * 1024 ** 2   # Least-recently-used analyses are evicted above this size (64 MB)
+VISION_CACHE_MAX_AGE_DAYS = 30    # Analyses older than this are re-run
 
 # ===== API PROVIDER SETTINGS =====
-PRIMARY_LLM_PROVIDER = "gemini"   # Options: "openai", "gemini", "claude", "mixed"
+PRIMARY_LLM_PROVIDER = "gemini"   # Options: "openai", "gemini"
 VISION_PROVIDER = "gemini"        # Options: "openai", "gemini" (for vision tasks)
-TEXT_PROVIDER = "gemini"          # Options: "openai", "gemini", "claude" (for text tasks)
+VISION_MODEL = None               # None = provider default (gpt-4o-mini / gemini-2.0-flash)
+TEXT_PROVIDER = "gemini"          # Options: "openai", "gemini" (for text tasks)
+
+# ===== SYNTHESIS SETTINGS =====
+SYNTHESIS_MODE = "auto"           # "single" = one agent call, "map_reduce" = parallel sections + final combine,
+                                  # "auto" = map_reduce for videos longer than MAP_REDUCE_MIN_MINUTES
+MAP_REDUCE_MIN_MINUTES = 60
+SYNTHESIS_WINDOW_MINUTES = 15     # Section length when the video has no chapters
 
 # ===== SPEED PRESETS =====
 SPEED_PRESET = "MAXIMUM_SPEED"     # Gemini for everything, fastest processing
@@ -54,10 +97,25 @@ GENERATE_SUMMARY = True            # Create executive summary
 BEAUTIFUL_FORMATTING = True       # Use emojis, headers, and rich formatting
 
 # ===== SCREENSHOT DENSITY SETTINGS =====
-SCREENSHOT_QUALITY = "HIGH"       # Options: "LOW", "MEDIUM", "HIGH", "ULTRA"
-ADAPTIVE_DENSITY = True           # Automatically adjust based on video content
+SCREENSHOT_QUALITY = "HIGH"       # Options: "LOW", "MEDIUM", "HIGH", "ULTRA" (one screenshot per 90/45/30/15s, budget permitting)
+ADAPTIVE_DENSITY = True           # Screenshot on slide/scene changes instead of fixed intervals
+SCENE_CHANGE_THRESHOLD = 2.0      # Min mean grey-level change (0-255) that counts as a new slide/scene;
+                                  # raised per video above its own motion noise, so keep it low
 MIN_SCREENSHOTS = 10              # Minimum screenshots regardless of video length
 MAX_SCREENSHOTS = 50              # Maximum screenshots to prevent overload
+CHAPTER_AWARE_SAMPLING = True     # Split the screenshot budget across the video's chapters by their length
+MIN_SCREENSHOTS_PER_CHAPTER = 2   # Every chapter gets at least this many, even past MAX_SCREENSHOTS
+DEDUP_SCREENSHOTS = True          # Merge near-identical screenshots before vision analysis
+DEDUP_MAX_DISTANCE = 5            # Max perceptual-hash distance (bits of 64) to count as the same image
+SLIDE_CROP = False                # Crop each scene to its slide region (drops webcam, borders, black bars)
+FILTER_BAD_FRAMES = True          # Move blank, dark and blurred samples to the nearest clean frame
+MIN_FRAME_CONTRAST = 8.0          # Grey-level std below this counts as a blank frame
+MIN_FRAME_BRIGHTNESS = 16.0       # Mean grey level below this counts as a fade to black
+MIN_FRAME_SHARPNESS = 15.0        # Laplacian variance below this counts as blurred (see the "Frame quality:" log line)
+FRAME_SEARCH_SECONDS = 2.0        # How far from a rejected sample to look for a clean frame
+FRAME_LONG_EDGE = 1280            # Screenshots are downscaled to this longest side (fewer image tokens)
+FRAME_FORMAT = "jpeg"             # Options: "jpeg", "webp", "png"
+FRAME_QUALITY = 80                # JPEG/WebP quality (0-100)
 
 # ===== PRESET CONFIGURATIONS =====
 """
@@ -1,223 +1,291 @@
 import os
+import sys
 from crewai import Agent, Task, Crew, Process
-from crewai_tools import VisionTool, FileReadTool
-from video_tools import extract_video_data 
+from crewai_tools import FileReadTool
+from video_tools import budget_planner, extract_video_data
+from src.crewai_video_study_guide.tools.batch_vision_tool import BatchScreenshotAnalyzer
+from src.crewai_video_study_guide.tools.study_guide_tool import HierarchicalStudyGuideWriter
+from src.crewai_video_study_guide.tools.checkpoint import STAGES, StageCheckpoint
+from src.crewai_video_study_guide.tools.direct_execution import DirectExecution, StageMeter, without_task
+from src.crewai_video_study_guide.tools.metadata_probe import probe_video
+from src.crewai_video_study_guide.tools.workspace import JobWorkspace, WORKSPACE_ENV, WORKSPACE_ROOT, latest_workspace
 from dotenv import load_dotenv
-import subprocess
 import re
 
 load_dotenv()
 
+DEFAULT_DURATION_MINUTES = 30  # Settings used when the video can't be probed
+
 def get_video_duration(youtube_url):
-    """Get video duration in minutes using yt-dlp"""
+    """Video duration in minutes from the shared metadata probe (the extractor reuses the same probe)"""
     try:
-        cmd = ['yt-dlp', '--get-duration', '--no-playlist', youtube_url]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            duration_str = result.stdout.strip()
-            # Parse duration (format: HH:MM:SS or MM:SS)
-            parts = duration_str.split(':')
-            if len(parts) == 3:  # HH:MM:SS
-                hours, minutes, seconds = map(int, parts)
-                total_minutes = hours * 60 + minutes + seconds / 60
-            elif len(parts) == 2:  # MM:SS
-                minutes, seconds = map(int, parts)
-                total_minutes = minutes + seconds / 60
-            else:  # SS
-                seconds = int(parts[0])
-                total_minutes = seconds / 60
-            return total_minutes
-    except:
-        pass
-    return 30  # Default fallback
+        from config import PROBE_CACHE_DIR
+    except ImportError:
+        PROBE_CACHE_DIR = '.cache/probes'
+    try:
+        return probe_video(youtube_url, PROBE_CACHE_DIR)['duration'] / 60
+    except (RuntimeError, KeyError, TypeError) as e:
+        print(f"⚠️  Could not read the video duration ({e}); assuming {DEFAULT_DURATION_MINUTES} minutes")
+        return DEFAULT_DURATION_MINUTES
+
+def create_batch_screenshot_analyzer(max_rpm, max_concurrent):
+    """Batched vision stage, rate-limited like the rest of the crew"""
+    try:
+        from config import VISION_PROVIDER, VISION_MODEL, BATCH_SIZE
+        from config import ENABLE_VISION_CACHE, VISION_CACHE_PATH, VISION_CACHE_MAX_BYTES, VISION_CACHE_MAX_AGE_DAYS
+        return BatchScreenshotAnalyzer(
+            provider=VISION_PROVIDER,
+            model=VISION_MODEL,
+            batch_size=BATCH_SIZE,
+            max_concurrent=max_concurrent,
+            max_rpm=max_rpm,
+            cache_path=VISION_CACHE_PATH if ENABLE_VISION_CACHE else None,
+            cache_max_bytes=VISION_CACHE_MAX_BYTES,
+            cache_max_age_days=VISION_CACHE_MAX_AGE_DAYS,
+        )
+    except ImportError:
+        return BatchScreenshotAnalyzer(max_rpm=max_rpm, max_concurrent=max_concurrent)
 
-def get_optimal_crew_settings(duration_minutes):
-    """Get optimal crew settings based on video duration - SPEED OPTIMIZED"""
+def create_study_guide_writer(max_rpm, max_concurrent):
+    """Map-reduce synthesis for long videos: sections are written in parallel, then combined"""
     try:
-        from config import FAST_MODE, MAX_CONCURRENT_REQUESTS
-        if FAST_MODE:
-            # Much more aggressive settings for speed
-            if duration_minutes <= 5:        # Short videos
-                return {'max_rpm': 60, 'memory': False, 'max_execution_time': 300}
-            elif duration_minutes <= 15:     # Medium videos
-                return {'max_rpm': 45, 'memory': False, 'max_execution_time': 600}
-            elif duration_minutes <= 60:     # Long videos
-                return {'max_rpm': 30, 'memory': True, 'max_execution_time': 900}
-            elif duration_minutes <= 180:    # Very long videos
-                return {'max_rpm': 20, 'memory': True, 'max_execution_time': 1200}
-            else:                            # Ultra long videos
-                return {'max_rpm': 15, 'memory': True, 'max_execution_time': 1800}
+        from config import TEXT_PROVIDER, SYNTHESIS_WINDOW_MINUTES
+        return HierarchicalStudyGuideWriter(
+            provider=TEXT_PROVIDER,
+            max_concurrent=max_concurrent,
+            max_rpm=max_rpm,
+            window_seconds=SYNTHESIS_WINDOW_MINUTES * 60,
+        )
+    except ImportError:
+        return HierarchicalStudyGuideWriter(max_rpm=max_rpm, max_concurrent=max_concurrent)
+
+def create_crew(output_file, plan, direct_extraction=False):
+    """
+    The three-agent note-taking crew for one video, with the rate limit, concurrency and
+    synthesis mode of the budget plan; with direct_extraction the extractor runs without its agent
+    """
+    # Agents
+    video_engineer = Agent(
+        role='Video Content Engineer',
+        goal='Download the video, extract screenshots at key intervals, and retrieve the full transcript.',
+        backstory="""You are an expert in computer vision and media processing. Your job is to 
+                     use your custom tools to cleanly break down the video data for the analysis agent.""",
+        tools=[extract_video_data],
+        verbose=True,
+        allow_delegation=False
+    )
+
+    content_analyzer = Agent(
+        role='Speed-Optimized Content Analyzer',
+        goal='Rapidly analyze screenshots in batches and extract key visual information efficiently.',
+        backstory="""You are an efficient visual analyst optimized for speed. You quickly identify important 
+                     details, read text in images, and understand visual context. You work in batches to 
+                     maximize processing speed while maintaining quality analysis.""",
+        tools=[create_batch_screenshot_analyzer(plan.max_rpm, plan.concurrency)],
+        verbose=False,  # Reduced verbosity for speed
+        allow_delegation=False,
+        max_iter=3,     # Limit iterations for speed
+        max_execution_time=300  # 5 minute timeout per task
+    )
+
+    note_synthesizer = Agent(
+        role='Speed-Optimized Note Synthesizer',
+        goal='Rapidly create comprehensive study notes by efficiently combining visual analysis with transcript data.',
+        backstory="""You are a highly efficient educational content creator optimized for speed and quality. 
+                     You quickly synthesize information from multiple sources to create well-structured study 
+                     guides. You work fast while maintaining educational value and clear organization.""",
+        tools=[FileReadTool()],
+        verbose=False,  # Reduced verbosity for speed
+        allow_delegation=False,  # No delegation for speed
+        max_iter=2,     # Limit iterations for speed
+        max_execution_time=300  # 5 minute timeout per task
+    )
+
+    # Tasks
+    extract_task = Task(
+        description=(
+            "Use the 'Video Screenshot and Transcript Extractor' tool on the URL {youtube_url}. "
+            "The tool will automatically determine the optimal screenshot interval based on the video length. "
+            "The tool returns a JSON manifest of the screenshots and transcript; that manifest is your final answer."
+        ),
+        expected_output="The extractor's JSON manifest listing every screenshot, its timestamps and the transcript paths.",
+        agent=video_engineer,
+    )
+
+    analysis_task = Task(
+        description=(
+            "SPEED-OPTIMIZED ANALYSIS: Analyze all screenshots from the Video Content Engineer in one step. "
+            "Call the 'Batch Screenshot Analyzer' once; it reads the extraction manifest from the job workspace. "
+            "It analyzes every screenshot (each file in the manifest is a distinct image; further timestamps show the same image again), "
+            "attaches the transcript excerpt spoken while each screenshot is on screen, and its output is your final answer."
+        ),
+        expected_output="Visual analysis for each screenshot in timestamp order, each followed by its aligned transcript excerpt.",
+        agent=content_analyzer,
+        context=[extract_task]
+    )
+
+    if plan.map_reduce:
+        synthesis_task = Task(
+            description=(
+                "HIERARCHICAL SYNTHESIS: This video is too long to synthesize in one pass. "
+                "Call the 'Hierarchical Study Guide Writer' tool once. It writes the study guide section by section "
+                "in parallel from the screenshot analyses and transcript, then adds the summary, contents, key takeaways "
+                "and review questions. Its output is your final answer."
+            ),
+            expected_output="A well-structured study guide in Markdown format covering the whole video section by section.",
+            agent=note_synthesizer,
+            tools=[create_study_guide_writer(plan.max_rpm, plan.concurrency)],
+            context=[],  # The tool reads the analyses itself; keep them out of the agent's context
+            output_file=output_file
+        )
+    else:
+        synthesis_task = Task(
+            description=(
+                "SPEED-OPTIMIZED SYNTHESIS: Rapidly create a comprehensive study guide using analysis and transcript data. "
+                "Work efficiently to: "
+                "1. Use the transcript excerpt under each screenshot analysis; it is already aligned to the time that screenshot is on screen, "
+                "so do not read the full transcript file. "
+                "2. Only if the analysis has no transcript excerpts, read the transcript file (if available) using FileReadTool. "
+                "3. Create structured, informative notes combining visual and audio information. "
+                "4. Extract key concepts and main points without excessive elaboration. "
+                "5. Use clear headings, bullet points, and organized structure. "
+                "6. Include relevant transcript quotes when they add educational value. "
+                "7. Focus on learning objectives and practical study value. "
+                "8. Maintain quality while prioritizing speed and efficiency. "
+                "Generate a professional study guide optimized for both speed and educational value."
+            ),
+            expected_output="A well-structured study guide in Markdown format efficiently combining visual and audio information with key concepts and learning materials.",
+            agent=note_synthesizer,
+            context=[extract_task, analysis_task],
+            output_file=output_file
+        )
+
+    agents = [video_engineer, content_analyzer, note_synthesizer]
+    tasks = [extract_task, analysis_task, synthesis_task]
+    if direct_extraction:
+        tasks, agents = without_task(tasks, agents, extract_task)
+
+    crew = Crew(
+        agents=agents,
+        tasks=tasks,
+        process=Process.sequential,  # Keep sequential for now, but optimized
+        verbose=False,  # Reduced verbosity for speed
+        full_output=True,  # Get complete output
+        **plan.crew_settings()  # Rate limit and memory from the budget plan
+    )
+    if direct_extraction:
+        # Plain code before kickoff; the manifest still reaches the later tasks as extract_task's output
+        crew.before_kickoff_callbacks.append(DirectExecution(extract_video_data, extract_task, 'extract'))
+    return crew
+
+def print_video_report(video_duration, plan):
+    """Duration, category and the budget plan this run will use"""
+    print(f"📹 Video duration: {video_duration:.1f} minutes")
+    print(f"⚙️  {plan.summary()}")
+    print(f"📝 Synthesis: {'map-reduce by section' if plan.map_reduce else 'single pass'}")
+
+    # Determine video category and provide recommendations
+    if video_duration <= 2:
+        category = "Very Short"
+        recommendation = "HIGH quality recommended for maximum detail"
+    elif video_duration <= 15:
+        category = "Short"
+        recommendation = "HIGH quality recommended for comprehensive coverage"
+    elif video_duration <= 60:
+        category = "Medium"
+        recommendation = "MEDIUM-HIGH quality recommended for balanced processing"
+    elif video_duration <= 180:
+        category = "Long"
+        recommendation = "MEDIUM quality recommended for efficient processing"
+    else:
+        category = "Very Long"
+        recommendation = "LOW-MEDIUM quality recommended for manageable processing time"
+
+    print(f"📊 Video category: {category}")
+    print(f"💡 Recommendation: {recommendation}")
+
+    # Show current settings
+    try:
+        from config import SCREENSHOT_QUALITY, FAST_MODE
+        print(f"🎯 Current quality: {SCREENSHOT_QUALITY}")
+        print(f"⚡ Fast mode: {'ON' if FAST_MODE else 'OFF'}")
     except ImportError:
         pass
-    
-    # Fallback to original settings
-    if duration_minutes <= 5:        # Short videos
-        return {'max_rpm': 15, 'memory': False}
-    elif duration_minutes <= 15:     # Medium videos
-        return {'max_rpm': 12, 'memory': True}
-    elif duration_minutes <= 60:     # Long videos
-        return {'max_rpm': 8, 'memory': True}
-    elif duration_minutes <= 180:    # Very long videos
-        return {'max_rpm': 5, 'memory': True}
-    else:                            # Ultra long videos
-        return {'max_rpm': 3, 'memory': True}
-
-# Agents
-video_engineer = Agent(
-    role='Video Content Engineer',
-    goal='Download the video, extract screenshots at key intervals, and retrieve the full transcript.',
-    backstory="""You are an expert in computer vision and media processing. Your job is to 
-                 use your custom tools to cleanly break down the video data for the analysis agent.""",
-    tools=[extract_video_data],
-    verbose=True,
-    allow_delegation=False
-)
-
-content_analyzer = Agent(
-    role='Speed-Optimized Content Analyzer',
-    goal='Rapidly analyze screenshots in batches and extract key visual information efficiently.',
-    backstory="""You are an efficient visual analyst optimized for speed. You quickly identify important 
-                 details, read text in images, and understand visual context. You work in batches to 
-                 maximize processing speed while maintaining quality analysis.""",
-    tools=[VisionTool()],
-    verbose=False,  # Reduced verbosity for speed
-    allow_delegation=False,
-    max_iter=3,     # Limit iterations for speed
-    max_execution_time=300  # 5 minute timeout per task
-)
-
-note_synthesizer = Agent(
-    role='Speed-Optimized Note Synthesizer',
-    goal='Rapidly create comprehensive study notes by efficiently combining visual analysis with transcript data.',
-    backstory="""You are a highly efficient educational content creator optimized for speed and quality. 
-                 You quickly synthesize information from multiple sources to create well-structured study 
-                 guides. You work fast while maintaining educational value and clear organization.""",
-    tools=[FileReadTool()],
-    verbose=False,  # Reduced verbosity for speed
-    allow_delegation=False,  # No delegation for speed
-    max_iter=2,     # Limit iterations for speed
-    max_execution_time=300  # 5 minute timeout per task
-)
-
-# Import configuration
-try:
-    from config import VIDEO_URL, FORCE_INTERVAL_SECONDS, FORCE_MAX_RPM, OUTPUT_FILE
-    youtube_url = VIDEO_URL
-    output_file = OUTPUT_FILE
-except ImportError:
-    # Fallback if config.py doesn't exist
-    youtube_url = 'https://www.youtube.com/watch?v=GWnSsjT4V68'
-    output_file = 'final_study_guide.md'
-
-# Tasks
-extract_task = Task(
-    description=(
-        "Use the 'Video Screenshot and Transcript Extractor' tool on the URL {youtube_url}. "
-        "The tool will automatically determine the optimal screenshot interval based on the video length. "
-        "Ensure the output clearly lists the file paths of all saved screenshots and the transcript file."
-    ),
-    expected_output='A clean summary listing the file paths and timestamps for all extracted screenshots and the transcript path.',
-    agent=video_engineer,
-)
-
-analysis_task = Task(
-    description=(
-        "SPEED-OPTIMIZED ANALYSIS: Rapidly analyze all screenshots from the Video Content Engineer. "
-        "Work efficiently through each screenshot file: "
-        "1. Quickly identify key visual elements, text, and educational content using VisionTool. "
-        "2. Extract main concepts and themes without excessive detail. "
-        "3. Note important text, titles, or data visible in images. "
-        "4. Focus on educational value and learning objectives. "
-        "5. Work through screenshots systematically and efficiently. "
-        "Prioritize speed while maintaining quality. Provide concise but comprehensive analysis."
-    ),
-    expected_output="Efficient visual analysis for each screenshot with timestamps, focusing on key concepts and educational content.",
-    agent=content_analyzer,
-    context=[extract_task]
-)
-
-synthesis_task = Task(
-    description=(
-        "SPEED-OPTIMIZED SYNTHESIS: Rapidly create a comprehensive study guide using analysis and transcript data. "
-        "Work efficiently to: "
-        "1. Quickly read transcript file (if available) using FileReadTool. "
-        "2. Efficiently match visual analysis with transcript content by timestamp. "
-        "3. Create structured, informative notes combining visual and audio information. "
-        "4. Extract key concepts and main points without excessive elaboration. "
-        "5. Use clear headings, bullet points, and organized structure. "
-        "6. Include relevant transcript quotes when they add educational value. "
-        "7. Focus on learning objectives and practical study value. "
-        "8. Maintain quality while prioritizing speed and efficiency. "
-        "Generate a professional study guide optimized for both speed and educational value."
-    ),
-    expected_output="A well-structured study guide in Markdown format efficiently combining visual and audio information with key concepts and learning materials.",
-    agent=note_synthesizer,
-    context=[extract_task, analysis_task],
-    output_file=output_file
-)
-
-inputs = {
-    'youtube_url': youtube_url,
-}
-
-# Auto-detect video duration and optimize settings
-print("🔍 Analyzing video...")
-video_duration = get_video_duration(inputs['youtube_url'])
-crew_settings = get_optimal_crew_settings(video_duration)
-
-# Apply any forced settings from config
-try:
-    if FORCE_MAX_RPM is not None:
-        crew_settings['max_rpm'] = FORCE_MAX_RPM
-except:
-    pass
-
-print(f"📹 Video duration: {video_duration:.1f} minutes")
-print(f"⚙️  Optimized settings: {crew_settings}")
-
-# Determine video category and provide recommendations
-if video_duration <= 2:
-    category = "Very Short"
-    recommendation = "HIGH quality recommended for maximum detail"
-elif video_duration <= 15:
-    category = "Short"
-    recommendation = "HIGH quality recommended for comprehensive coverage"
-elif video_duration <= 60:
-    category = "Medium"
-    recommendation = "MEDIUM-HIGH quality recommended for balanced processing"
-elif video_duration <= 180:
-    category = "Long"
-    recommendation = "MEDIUM quality recommended for efficient processing"
-else:
-    category = "Very Long"
-    recommendation = "LOW-MEDIUM quality recommended for manageable processing time"
-
-print(f"📊 Video category: {category}")
-print(f"💡 Recommendation: {recommendation}")
-
-# Show current settings
-try:
-    from config import SCREENSHOT_QUALITY, FAST_MODE
-    print(f"🎯 Current quality: {SCREENSHOT_QUALITY}")
-    print(f"⚡ Fast mode: {'ON' if FAST_MODE else 'OFF'}")
-except ImportError:
-    pass
-
-print(f"💾 Output will be saved to: {output_file}")
-
-note_taking_crew = Crew(
-    agents=[video_engineer, content_analyzer, note_synthesizer],
-    tasks=[extract_task, analysis_task, synthesis_task],
-    process=Process.sequential,  # Keep sequential for now, but optimized
-    verbose=False,  # Reduced verbosity for speed
-    full_output=True,  # Get complete output
-    **crew_settings  # Apply optimized settings
-)
-
-print("Starting the Note Taker Crew...")
-result = note_taking_crew.kickoff(inputs=inputs)
-
-print("\n\n################################")
-print("###### CREW FINISHED WORK ######")
-print("################################")
-print(result)
\ No newline at end of file
+
+def job_workspace(youtube_url, output_file):
+    """The workspace a batch runner assigned this process, this video's unfinished job, or a fresh one"""
+    try:
+        from config import WORKSPACE_DIR, RESUME_JOBS
+    except ImportError:
+        WORKSPACE_DIR, RESUME_JOBS = WORKSPACE_ROOT, True
+    assigned = os.environ.get(WORKSPACE_ENV)
+    if assigned:
+        return JobWorkspace.at(assigned, output_file=output_file).activate()
+    if RESUME_JOBS:
+        previous = latest_workspace(youtube_url, WORKSPACE_DIR, output_file=output_file)
+        if previous is not None and StageCheckpoint(previous).resume_point() is not None:
+            print(f"♻️  Resuming unfinished job {previous.job_id}")
+            return previous.activate()
+    return JobWorkspace.for_url(youtube_url, root=WORKSPACE_DIR, output_file=output_file).activate()
+
+def run(youtube_url=None):
+    """Generate the study guide for one video; returns the crew result"""
+    # Import configuration
+    try:
+        from config import VIDEO_URL, OUTPUT_FILE
+        youtube_url = youtube_url or VIDEO_URL
+        output_name = OUTPUT_FILE
+    except ImportError:
+        # Fallback if config.py doesn't exist
+        youtube_url = youtube_url or 'https://www.youtube.com/watch?v=GWnSsjT4V68'
+        output_name = 'final_study_guide.md'
+    try:
+        from config import KEEP_JOB_FILES, DIRECT_EXTRACTION
+    except ImportError:
+        KEEP_JOB_FILES, DIRECT_EXTRACTION = True, True
+
+    # Each run works in its own directory, so runs on the same machine never share files
+    workspace = job_workspace(youtube_url, output_name)
+    output_file = workspace.output_path
+    checkpoint = StageCheckpoint(workspace)
+    if checkpoint.get('synthesis') is not None:
+        print(f"✅ Study guide already written: {output_file}")
+        with open(output_file, encoding='utf-8') as f:
+            return f.read()
+    if checkpoint.resume_point() != 'extract':
+        print(f"⏩ Finished stages are reused; resuming at: {checkpoint.resume_point()}")
+    inputs = {
+        'youtube_url': youtube_url,
+    }
+
+    # Auto-detect video duration and plan the job within its time and token budgets
+    print("🔍 Analyzing video...")
+    video_duration = get_video_duration(inputs['youtube_url'])
+    plan = budget_planner().plan(video_duration * 60)
+
+    print_video_report(video_duration, plan)
+    print(f"📁 Job workspace: {workspace.path}")
+    print(f"💾 Output will be saved to: {output_file}")
+
+    print(f"🛠️  Extraction: {'direct (no agent)' if DIRECT_EXTRACTION else 'video_engineer agent'}")
+
+    note_taking_crew = create_crew(workspace.task_output_file, plan, DIRECT_EXTRACTION)
+    meter = StageMeter(note_taking_crew, STAGES[1:] if DIRECT_EXTRACTION else STAGES)
+
+    print("Starting the Note Taker Crew...")
+    result = note_taking_crew.kickoff(inputs=inputs)
+    print(f"📈 {meter.report()}")
+    print(f"🎯 {plan.compare(meter.summary())}")
+    if os.path.exists(output_file):
+        checkpoint.put('synthesis', output_file, [output_file])
+    if not KEEP_JOB_FILES:
+        workspace.cleanup(keep_output=True)
+
+    print("\n\n################################")
+    print("###### CREW FINISHED WORK ######")
+    print("################################")
+    print(result)
+    return result
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -1,12 +1,33 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import VisionTool, FileReadTool
-from .tools.video_tools import extract_video_data
+from crewai_tools import FileReadTool
+from .tools.video_tools import budget_planner, extract_video_data, video_duration
+from .tools.batch_vision_tool import BatchScreenshotAnalyzer
+from .tools.direct_execution import DirectExecution, without_task
+from .tools.study_guide_tool import HierarchicalStudyGuideWriter
+from .tools.workspace import current_workspace
+
+DEFAULT_DURATION_SECONDS = 30 * 60  # Plan used when the video can't be probed
 
 @CrewBase
 class CrewaiVideoStudyGuideCrew():
     """CrewaiVideoStudyGuide crew"""
 
+    # Run the extractor as plain code before kickoff instead of through video_engineer
+    direct_extraction = True
+
+    def __init__(self, plan=None):
+        # Screenshot count, concurrency, rate limit, memory and synthesis mode: see for_video()
+        self.plan = plan or budget_planner().plan(DEFAULT_DURATION_SECONDS)
+
+    @classmethod
+    def for_video(cls, youtube_url):
+        """Crew planned for this video's duration within the time and token budgets"""
+        duration = video_duration(youtube_url)
+        if duration is None:
+            print(f"Planning for a {DEFAULT_DURATION_SECONDS // 60}-minute video")
+        return cls(budget_planner().plan(duration or DEFAULT_DURATION_SECONDS))
+
     @agent
     def video_engineer(self) -> Agent:
         return Agent(
@@ -20,7 +41,7 @@ class CrewaiVideoStudyGuideCrew():
     def content_analyzer(self) -> Agent:
         return Agent(
             config=self.agents_config['content_analyzer'],
-            tools=[VisionTool()],
+            tools=[BatchScreenshotAnalyzer(max_rpm=self.plan.max_rpm, max_concurrent=self.plan.concurrency)],
             verbose=False,
             allow_delegation=False,
             max_iter=3,
@@ -55,22 +76,37 @@ class CrewaiVideoStudyGuideCrew():
 
     @task
     def synthesis_task(self) -> Task:
+        # Multi-hour videos: write the guide section by section in parallel, then combine
+        if self.plan.map_reduce:
+            return Task(
+                config=self.tasks_config['map_reduce_synthesis_task'],
+                agent=self.note_synthesizer(),
+                tools=[HierarchicalStudyGuideWriter(max_rpm=self.plan.max_rpm, max_concurrent=self.plan.concurrency)],
+                context=[],
+                output_file=current_workspace().task_output_file
+            )
         return Task(
             config=self.tasks_config['synthesis_task'],
             agent=self.note_synthesizer(),
             context=[self.extract_task(), self.analysis_task()],
-            output_file='final_study_guide.md'
+            output_file=current_workspace().task_output_file
         )
 
     @crew
     def crew(self) -> Crew:
         """Creates the CrewaiVideoStudyGuide crew"""
-        return Crew(
-            agents=self.agents,
-            tasks=self.tasks,
+        agents, tasks = self.agents, self.tasks
+        if self.direct_extraction:
+            tasks, agents = without_task(tasks, agents, self.extract_task())
+        crew = Crew(
+            agents=agents,
+            tasks=tasks,
             process=Process.sequential,
             verbose=False,
             full_output=True,
-            max_rpm=15,
-            memory=False
-        )
\ No newline at end of file
+            **self.plan.crew_settings()
+        )
+        if self.direct_extraction:
+            # extract_task keeps its place as context; its output comes from the tool, not an agent
+            crew.before_kickoff_callbacks.append(DirectExecution(extract_video_data, self.extract_task(), 'extract'))
+        return crew
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 import sys
 from crew import CrewaiVideoStudyGuideCrew
+from crewai_video_study_guide.tools.workspace import JobWorkspace
 
 def run():
     """
@@ -9,7 +10,9 @@ def run():
     inputs = {
         'youtube_url': 'https://youtu.be/kNcPTdiDwkI'
     }
-    CrewaiVideoStudyGuideCrew().crew().kickoff(inputs=inputs)
+    # A fresh workspace per run; the crew's tools and output file resolve to it
+    JobWorkspace.for_url(inputs['youtube_url']).activate()
+    CrewaiVideoStudyGuideCrew.for_video(inputs['youtube_url']).crew().kickoff(inputs=inputs)
 
 if __name__ == "__main__":
     run()
\ No newline at end of file
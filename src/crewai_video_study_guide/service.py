@@ -0,0 +1,310 @@
+"""
+HTTP job-queue service for the study guide crew.
+
+    POST /jobs                 {"youtube_url": "..."} -> 202 {"job_id": ..., "status": "queued", ...}
+    GET  /jobs                 every job, newest first
+    GET  /jobs/<job_id>        status, current stage and per-stage timings
+    GET  /jobs/<job_id>/guide  the finished study guide (text/markdown)
+    GET  /health
+
+Requests only enqueue or read state, so they return at once however long the
+video is. SERVICE_WORKERS background workers each run one job at a time:
+CrewaiVideoStudyGuideCrew in a child process with its own job workspace,
+which reports the stage it is in through progress.json. Jobs still queued
+or running when the service stops are queued again on restart and resume
+from their stage checkpoints.
+
+    python -m src.crewai_video_study_guide.service [--port 8000] [--workers 2]
+"""
+import argparse
+import json
+import os
+import queue
+import re
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .tools.checkpoint import STAGES, StageCheckpoint
+from .tools.direct_execution import DirectExecution, StageMeter
+from .tools.workspace import JobWorkspace, WORKSPACE_ENV, WORKSPACE_ROOT, check_root, current_workspace
+
+SERVICE_PORT = 8000
+SERVICE_WORKERS = 2
+JOB_FILE = "job.json"
+PROGRESS_FILE = "progress.json"
+ERROR_TAIL_LINES = 20
+JOB_ID_PATTERN = re.compile(r'^[\w.-]+$')
+
+
+def _write_json(path, data):
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class ProgressReporter:
+    """Crew task_callback that records the current stage and each finished stage's duration"""
+
+    def __init__(self, path):
+        self.path = path
+        self.timings = {}
+        self._stage = 0
+        self._stage_started = time.time()
+        self._save()
+
+    def _save(self):
+        stage = STAGES[self._stage] if self._stage < len(STAGES) else None
+        _write_json(self.path, {'stage': stage, 'completed': list(self.timings), 'stage_timings': self.timings})
+
+    def __call__(self, _task_output):
+        now = time.time()
+        if self._stage < len(STAGES):
+            self.timings[STAGES[self._stage]] = round(now - self._stage_started, 1)
+        self._stage += 1
+        self._stage_started = now
+        self._save()
+
+
+def run_job(youtube_url):
+    """Child-process side: run the crew for one video in the assigned workspace"""
+    from .crew import CrewaiVideoStudyGuideCrew
+
+    workspace = current_workspace(youtube_url)
+    checkpoint = StageCheckpoint(workspace)
+    if checkpoint.get('synthesis') is not None:
+        return  # Requeued after the guide was already written
+    crew_base = CrewaiVideoStudyGuideCrew.for_video(youtube_url)
+    print(crew_base.plan.summary())
+    crew = crew_base.crew()
+    progress = ProgressReporter(os.path.join(workspace.path, PROGRESS_FILE))
+    crew.task_callback = progress
+    direct = [callback for callback in crew.before_kickoff_callbacks if isinstance(callback, DirectExecution)]
+    for callback in direct:
+        callback.callback = progress  # Direct stages advance the progress like finished tasks
+    meter = StageMeter(crew, [stage for stage in STAGES if stage not in {callback.stage for callback in direct}])
+    crew.kickoff(inputs={'youtube_url': youtube_url})
+    print(meter.report())
+    print(crew_base.plan.compare(meter.summary()))
+    if not os.path.exists(workspace.output_path):
+        raise RuntimeError(f"Crew finished without writing {workspace.output_path}")
+    checkpoint.put('synthesis', workspace.output_path, [workspace.output_path])
+
+
+class JobQueue:
+    """
+    Jobs are workspaces under root holding job.json; a pool of worker threads
+    runs each one as `command + [youtube_url]` with JOB_WORKSPACE set.
+    """
+
+    def __init__(self, root=WORKSPACE_ROOT, workers=SERVICE_WORKERS, command=None):
+        self.root = check_root(root)
+        self.workers = max(1, workers)
+        self.command = command or [sys.executable, '-m', __name__, 'run']
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._jobs = {}
+        os.makedirs(root, exist_ok=True)
+        self._recover()
+
+    def _recover(self):
+        """Reload earlier jobs; anything unfinished goes back on the queue"""
+        requeued = 0
+        for name in sorted(os.listdir(self.root)):
+            job = _read_json(os.path.join(self.root, name, JOB_FILE))
+            if job is None:
+                continue
+            self._jobs[job['job_id']] = job
+            if job['status'] in ('queued', 'running'):
+                self._update(job['job_id'], status='queued')
+                self._queue.put(job['job_id'])
+                requeued += 1
+        if requeued:
+            print(f"Requeued {requeued} unfinished jobs")
+
+    def _workspace(self, job_id):
+        return JobWorkspace(job_id, root=self.root)
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(fields)
+            _write_json(os.path.join(self._workspace(job_id).path, JOB_FILE), job)
+            return dict(job)
+
+    def start(self):
+        for _ in range(self.workers):
+            threading.Thread(target=self._work, daemon=True).start()
+        return self
+
+    def submit(self, youtube_url):
+        workspace = JobWorkspace.for_url(youtube_url, root=self.root).create()
+        job = {'job_id': workspace.job_id, 'youtube_url': youtube_url, 'status': 'queued',
+               'created': time.time(), 'started': None, 'finished': None, 'error': None}
+        with self._lock:
+            self._jobs[workspace.job_id] = job
+        self._update(workspace.job_id)
+        self._queue.put(workspace.job_id)
+        return self.get(workspace.job_id)
+
+    def get(self, job_id):
+        """Job record with its live stage progress, or None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            job = dict(job) if job is not None else None
+        if job is None:
+            return None
+        progress = _read_json(os.path.join(self._workspace(job_id).path, PROGRESS_FILE)) or {}
+        job['stage'] = progress.get('stage') if job['status'] == 'running' else None
+        job['stage_timings'] = progress.get('stage_timings', {})
+        end = job['finished'] or time.time()
+        job['elapsed'] = round(end - job['started'], 1) if job['started'] else None
+        job['queue_position'] = self._queue_position(job_id) if job['status'] == 'queued' else None
+        return job
+
+    def _queue_position(self, job_id):
+        with self._queue.mutex:
+            pending = list(self._queue.queue)
+        return pending.index(job_id) + 1 if job_id in pending else None
+
+    def jobs(self):
+        with self._lock:
+            job_ids = sorted(self._jobs, key=lambda job_id: self._jobs[job_id]['created'], reverse=True)
+        return [self.get(job_id) for job_id in job_ids]
+
+    def guide_path(self, job_id):
+        job = self.get(job_id)
+        if job is None or job['status'] != 'done':
+            return None
+        return self._workspace(job_id).output_path
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            except Exception as e:
+                self._update(job_id, status='failed', finished=time.time(), error=str(e))
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id):
+        workspace = self._workspace(job_id)
+        job = self._update(job_id, status='running', started=time.time(), finished=None, error=None)
+        log_path = os.path.join(workspace.path, 'run.log')
+        print(f"Job {job_id} started: {job['youtube_url']}")
+        with open(log_path, 'w', encoding='utf-8') as log:
+            result = subprocess.run(self.command + [job['youtube_url']], stdout=log, stderr=subprocess.STDOUT,
+                                    env={**os.environ, WORKSPACE_ENV: workspace.path})
+
+        if result.returncode == 0 and os.path.exists(workspace.output_path):
+            self._update(job_id, status='done', finished=time.time())
+            print(f"Job {job_id} done")
+            return
+        with open(log_path, encoding='utf-8', errors='replace') as log:
+            tail = ''.join(log.readlines()[-ERROR_TAIL_LINES:])
+        self._update(job_id, status='failed', finished=time.time(),
+                     error=f"exit code {result.returncode}\n{tail}" if result.returncode else "no study guide written")
+        print(f"Job {job_id} failed")
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    jobs = None  # JobQueue, set by serve()
+
+    def _send(self, status, body, content_type='application/json'):
+        data = body.encode('utf-8') if isinstance(body, str) else json.dumps(body, indent=2).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _job_path(self):
+        """(job_id, rest) for /jobs/<job_id>[/rest]"""
+        parts = self.path.split('?', 1)[0].strip('/').split('/')
+        if len(parts) < 2 or parts[0] != 'jobs' or not JOB_ID_PATTERN.match(parts[1]):
+            return None, None
+        return parts[1], '/'.join(parts[2:])
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0].rstrip('/')
+        if path == '/health':
+            return self._send(200, {'status': 'ok', 'workers': self.jobs.workers})
+        if path == '/jobs':
+            return self._send(200, {'jobs': self.jobs.jobs()})
+
+        job_id, rest = self._job_path()
+        job = self.jobs.get(job_id) if job_id else None
+        if job is None:
+            return self._send(404, {'error': 'job not found'})
+        if rest == '':
+            return self._send(200, job)
+        if rest == 'guide':
+            guide_path = self.jobs.guide_path(job_id)
+            if guide_path is None:
+                return self._send(409, {'error': f"job is {job['status']}", 'status': job['status']})
+            with open(guide_path, encoding='utf-8') as f:
+                return self._send(200, f.read(), content_type='text/markdown')
+        return self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path.split('?', 1)[0].rstrip('/') != '/jobs':
+            return self._send(404, {'error': 'not found'})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+            youtube_url = body['youtube_url'].strip()
+        except (ValueError, KeyError, AttributeError, TypeError):
+            return self._send(400, {'error': 'expected JSON body {"youtube_url": "..."}'})
+        if not youtube_url.startswith(('http://', 'https://')):
+            return self._send(400, {'error': 'youtube_url must be an http(s) URL'})
+        return self._send(202, self.jobs.submit(youtube_url))
+
+    def log_message(self, fmt, *args):
+        print(f"{self.address_string()} {fmt % args}")
+
+
+def serve(port=SERVICE_PORT, workers=SERVICE_WORKERS, root=WORKSPACE_ROOT, command=None, host='0.0.0.0'):
+    """Start the workers and return the (not yet serving) HTTP server"""
+    JobRequestHandler.jobs = JobQueue(root, workers, command).start()
+    return ThreadingHTTPServer((host, port), JobRequestHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Study guide job-queue service")
+    subcommands = parser.add_subparsers(dest='command')
+    run_parser = subcommands.add_parser('run', help="run one job in this process (used by the workers)")
+    run_parser.add_argument('youtube_url')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', SERVICE_PORT)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SERVICE_WORKERS', SERVICE_WORKERS)))
+    parser.add_argument('--root', default=os.environ.get('WORKSPACE_DIR', WORKSPACE_ROOT))
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run_job(args.youtube_url)
+        return
+
+    try:
+        server = serve(args.port, args.workers, args.root)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Study guide service on port {args.port} with {args.workers} workers (jobs in {args.root})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Persistent cache for extraction artifacts.
+
+Entries are keyed by the video ID plus every parameter that affects which
+screenshots get extracted, and hold the screenshot set, the transcript files
+and the tool output. A warm rerun restores them into the job's workspace
+without touching yt-dlp or OpenCV. Least-recently-used entries are evicted
+once the cache grows past its byte budget.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "artifacts")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GB
+ENTRY_FILE = "entry.json"
+
+
+def cache_key(video_id, params):
+    """Stable key for a video and the sampling parameters used to extract it"""
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"{video_id}-{digest[:16]}"
+
+
+def relocate_paths(output, moved):
+    """
+    The tool output with every cached file's path replaced by where it was
+    restored (moved: old absolute path -> new). A JSON manifest is rewritten
+    field by field, since its text escapes Windows backslashes.
+    """
+    try:
+        manifest = json.loads(output)
+    except ValueError:
+        manifest = None
+    if not isinstance(manifest, dict):
+        # Old line-format output: the paths appear verbatim
+        for old, new in moved.items():
+            output = output.replace(old, new)
+        return output
+
+    def relocate(path):
+        return moved.get(os.path.abspath(path), path) if path else path
+
+    for screenshot in manifest.get("screenshots") or []:
+        screenshot["path"] = relocate(screenshot.get("path"))
+    transcript = manifest.get("transcript")
+    if transcript:
+        for name in ("text", "structured"):
+            if name in transcript:
+                transcript[name] = relocate(transcript[name])
+    return json.dumps(manifest, separators=(",", ":"))
+
+
+class ArtifactCache:
+    """LRU-evicted on-disk store of extraction outputs"""
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    def _load(self, key):
+        try:
+            with open(os.path.join(self._entry_dir(key), ENTRY_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, key, entry):
+        entry_path = os.path.join(self._entry_dir(key), ENTRY_FILE)
+        with open(entry_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(entry_path + ".tmp", entry_path)
+
+    def get(self, key):
+        """Entry metadata for key (marking it as recently used), or None on a miss"""
+        entry = self._load(key)
+        if entry is None:
+            return None
+        entry_dir = self._entry_dir(key)
+        if not all(os.path.exists(os.path.join(entry_dir, "files", f["relpath"])) for f in entry["files"]):
+            self.remove(key)
+            return None
+        entry["last_used"] = time.time()
+        self._save(key, entry)
+        return entry
+
+    def put(self, key, paths, output, base=os.curdir, metadata=None):
+        """Copy the given artifact files (laid out relative to base) into the cache together with the tool output"""
+        entry_dir = self._entry_dir(key)
+        staging_dir = f"{entry_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+        files = []
+        size = 0
+        for path in paths:
+            relpath = os.path.relpath(path, base)
+            if relpath.startswith(os.pardir):
+                relpath = os.path.basename(path)
+            target = os.path.join(staging_dir, "files", relpath)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(path, target)
+            size += os.path.getsize(target)
+            files.append({"path": os.path.abspath(path), "relpath": relpath})
+
+        self.remove(key)
+        os.replace(staging_dir, entry_dir)
+        now = time.time()
+        self._save(key, {
+            "key": key,
+            "created": now,
+            "last_used": now,
+            "size": size,
+            "files": files,
+            "output": output,
+            "metadata": metadata or {},
+        })
+        self.evict(keep=key)
+
+    def restore(self, key, base=os.curdir):
+        """
+        Copy a cached entry's files back under base, in the layout they were
+        cached with, and return its output, or None on a miss.
+        """
+        entry = self.get(key)
+        if entry is None:
+            return None
+
+        moved = {}
+        for f in entry["files"]:
+            destination = os.path.abspath(os.path.join(base, f["relpath"]))
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copy2(os.path.join(self._entry_dir(key), "files", f["relpath"]), destination)
+            moved[f["path"]] = destination
+        return relocate_paths(entry["output"], moved)
+
+    def remove(self, key):
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def entries(self):
+        """All readable entries, least recently used first"""
+        loaded = [self._load(name) for name in os.listdir(self.root)
+                  if os.path.isdir(os.path.join(self.root, name))]
+        return sorted((e for e in loaded if e is not None), key=lambda e: e["last_used"])
+
+    def evict(self, keep=None):
+        """Drop least-recently-used entries until the cache fits its byte budget"""
+        entries = self.entries()
+        total = sum(e["size"] for e in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry["key"] == keep:
+                continue
+            self.remove(entry["key"])
+            total -= entry["size"]
+            print(f"Evicted cached artifacts {entry['key']} ({entry['size'] / 1024 ** 2:.1f} MB)")
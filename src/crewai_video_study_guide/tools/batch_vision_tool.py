@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import time
+from typing import Optional, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+from .checkpoint import StageCheckpoint
+from .extraction_manifest import load_manifest, parse_manifest
+from .llm_client import ChatClient
+from .transcript_index import TranscriptIndex, attach_transcript, format_timestamp
+from .vision_batch import BATCH_SIZE, MAX_CONCURRENT_REQUESTS, MAX_RPM, BatchVisionAnalyzer, time_seconds
+from .vision_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_AGE_DAYS, DEFAULT_MAX_BYTES, VisionCache
+from .workspace import current_workspace
+
+
+def structured_transcript_path(manifest):
+    """Path of the structured transcript named in the manifest, if it exists"""
+    path = (manifest.get('transcript') or {}).get('structured')
+    if not path or not os.path.exists(path):
+        return None
+    return path
+
+
+def load_transcript_index(path):
+    if path is None:
+        return None
+    try:
+        return TranscriptIndex.from_file(path)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Warning: could not index transcript: {e}")
+        return None
+
+
+class BatchScreenshotAnalyzerInput(BaseModel):
+    screenshot_list: str = Field(
+        default="",
+        description="The extractor's JSON manifest. Optional: the manifest saved in the job workspace is used when empty."
+    )
+
+
+class BatchScreenshotAnalyzer(BaseTool):
+    name: str = "Batch Screenshot Analyzer"
+    description: str = (
+        "Analyzes every screenshot listed by the Video Screenshot and Transcript Extractor in one call. "
+        "Reads the extraction manifest from the job workspace (or the manifest passed in); "
+        "returns one analysis per screenshot in timestamp order, "
+        "each with the transcript spoken while it is on screen."
+    )
+    args_schema: Type[BaseModel] = BatchScreenshotAnalyzerInput
+    result_as_answer: bool = True  # The aligned analyses go to the synthesizer as-is
+    provider: str = "openai"
+    model: Optional[str] = None
+    base_url: Optional[str] = None
+    batch_size: int = BATCH_SIZE
+    max_concurrent: int = MAX_CONCURRENT_REQUESTS
+    max_rpm: int = MAX_RPM
+    cache_path: Optional[str] = DEFAULT_CACHE_PATH  # None disables the vision cache
+    cache_max_bytes: int = DEFAULT_MAX_BYTES
+    cache_max_age_days: float = DEFAULT_MAX_AGE_DAYS
+    write_analyses: bool = True  # Per-screenshot records in the job workspace, for map-reduce synthesis
+    _cache: Optional[VisionCache] = PrivateAttr(default=None)
+    _usage: dict = PrivateAttr(default_factory=dict)
+
+    @property
+    def cache(self):
+        if self._cache is None and self.cache_path:
+            self._cache = VisionCache(self.cache_path, self.cache_max_bytes, self.cache_max_age_days)
+        return self._cache
+
+    def token_usage(self):
+        """Tokens and requests of this tool's own vision calls so far (StageMeter adds them to the stage)"""
+        return dict(self._usage)
+
+    def cache_stats(self):
+        """Hit/miss counters since this tool was created, plus cache size"""
+        return self.cache.stats() if self.cache is not None else None
+
+    def _run(self, screenshot_list: str = "") -> str:
+        workspace = current_workspace()
+        manifest = parse_manifest(screenshot_list) or load_manifest(workspace)
+        screenshots = manifest['screenshots'] if manifest else []
+        if not screenshots:
+            return "No screenshots found. Run the Video Screenshot and Transcript Extractor first."
+
+        # A rerun of the job picks up where the last attempt stopped
+        checkpoint = StageCheckpoint(workspace)
+        listing_key = hashlib.sha256(json.dumps(screenshots, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        checkpointed_output = checkpoint.get('analysis', listing_key)
+        if checkpointed_output is not None:
+            print(f"Resuming job: screenshot analysis already done in {workspace.path}")
+            return checkpointed_output
+        paths = {screenshot['path'] for screenshot in screenshots}
+        completed = {path: analysis for path, analysis in checkpoint.analyses().items() if path in paths}
+        if completed:
+            print(f"Resuming job: {len(completed)} of {len(screenshots)} screenshots already analyzed")
+
+        succeeded = set(completed)
+        def record(screenshot, analysis):
+            succeeded.add(screenshot['path'])
+            checkpoint.add_analysis(screenshot, analysis)
+
+        analyzer = BatchVisionAnalyzer(ChatClient(self.provider, self.model, self.base_url),
+                                       self.batch_size, self.max_concurrent, self.max_rpm, cache=self.cache)
+        started = time.time()
+        results = analyzer.analyze(screenshots, completed, record)
+        print(f"Analyzed {len(results)} screenshots with {analyzer.requests} vision requests "
+              f"in {time.time() - started:.1f}s")
+        for name, value in {**analyzer.usage, 'requests': analyzer.requests}.items():
+            self._usage[name] = self._usage.get(name, 0) + value
+        if self.cache is not None:
+            stats = self.cache_stats()
+            print(f"Vision cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
+
+        # Pre-aligned transcript per screenshot, so synthesis never needs the whole file
+        transcript_path = structured_transcript_path(manifest)
+        transcript_index = load_transcript_index(transcript_path)
+        if transcript_index is not None:
+            attach_transcript(results, transcript_index, time_seconds)
+        chapters = manifest.get('chapters') or []
+        if self.write_analyses:
+            with open(workspace.analyses_path, 'w', encoding='utf-8') as f:
+                json.dump({'transcript_path': transcript_path, 'chapters': chapters, 'screenshots': results},
+                          f, indent=2)
+
+        sections = []
+        chapter_number = 0
+        for result in results:
+            # Chapter headings let synthesis follow the video's own structure
+            start = time_seconds(result['times'][0])
+            while chapter_number < len(chapters) and chapters[chapter_number]['start_time'] <= start:
+                chapter = chapters[chapter_number]
+                chapter_number += 1
+                sections.append(f"## Chapter {chapter_number}: {chapter['title']} "
+                                f"[{format_timestamp(chapter['start_time'])}-{format_timestamp(chapter['end_time'])}]")
+            heading = f"### [{result['times'][0]}] {result['path']}"
+            if len(result['times']) > 1:
+                heading += f" (also at {', '.join(result['times'][1:])})"
+            lines = [heading, result['analysis']]
+            for excerpt in result.get('transcript', []):
+                lines.append(f"Transcript [{format_timestamp(excerpt['start'])}-{format_timestamp(excerpt['end'])}]: "
+                             f"{excerpt['text']}")
+            sections.append("\n".join(lines))
+        output = "\n\n".join(sections)
+
+        # Only a complete stage is final; failed screenshots are retried on the next run
+        if len(succeeded) == len(results):
+            checkpoint.put('analysis', output, key=listing_key)
+        return output
@@ -0,0 +1,288 @@
+"""
+Cost/latency budget planner.
+
+Replaces the per-duration tables of intervals, screenshot counts and max_rpm.
+Given a wall-clock target and a token budget for one job, the planner
+estimates what each stage costs:
+
+    extract    download and decode, proportional to the video's length
+    analysis   one vision request per BATCH_SIZE screenshots: image tokens
+               (from the frame size and provider), prompt and analyses
+    synthesis  the analyses plus the transcript (estimated from the length
+               of the video) in one agent call, or per window plus a reduce
+               call with map-reduce synthesis
+
+It starts from the density SCREENSHOT_QUALITY asks for and takes the most
+screenshots, at the lowest concurrency, that fit both budgets. Low concurrency
+leaves the provider's rate limit to other jobs running at the same time. The
+token budget is the hard limit: when the time target is out of reach anyway,
+the plan stops cutting screenshots once they fit the tokens.
+
+The prediction is printed before the crew starts ('Budget plan:') and next
+to the measured stage costs when it finishes ('Budget vs actual:'), so the
+cost model's constants can be checked against real runs.
+"""
+import math
+from dataclasses import dataclass, field
+
+from .frame_encoder import FRAME_LONG_EDGE
+from .map_reduce_synthesis import MAX_NOTES_CHARS_FOR_REDUCE, WINDOW_SECONDS
+from .vision_batch import BATCH_SIZE, MAX_CONCURRENT_REQUESTS, MAX_RPM
+
+TARGET_JOB_SECONDS = 600
+TOKEN_BUDGET = 300_000
+QUALITY_INTERVALS = {'LOW': 90, 'MEDIUM': 45, 'HIGH': 30, 'ULTRA': 15}  # Preferred seconds between screenshots
+MIN_INTERVAL_SECONDS = 5
+MIN_SCREENSHOTS = 10
+MAX_SCREENSHOTS = 50
+MAP_REDUCE_MIN_MINUTES = 60
+MEMORY_MIN_MINUTES = 5  # Crew memory for videos longer than this (three times longer in FAST_MODE)
+
+# Cost model. Rough by design; compare with the 'Budget vs actual:' line and adjust.
+FRAME_ASPECT = 16 / 9
+VISION_PROMPT_TOKENS = 120         # Instructions per vision request
+ANALYSIS_TOKENS = 200              # Completion tokens per screenshot analysis
+MANIFEST_TOKENS_PER_SCREENSHOT = 60  # The screenshot's entry in the manifest an agent gets as context
+TRANSCRIPT_TOKENS_PER_MINUTE = 200   # About 150 spoken words a minute
+AGENT_PROMPT_TOKENS = 1500         # Role, task and tool descriptions per agent call
+AGENT_REPLY_TOKENS = 100           # An agent's reply that only calls a tool
+GUIDE_TOKENS = 3000                # A single-pass study guide
+SECTION_PROMPT_TOKENS = 400
+SECTION_TOKENS = 800               # Notes per map-reduce window
+REDUCE_TOKENS = 1500               # Summary, contents, takeaways and questions
+REQUEST_SECONDS = 1.5              # Fixed latency per model call
+PROMPT_TOKENS_PER_SECOND = 4000
+OUTPUT_TOKENS_PER_SECOND = 80
+EXTRACTION_SECONDS = 5.0
+EXTRACTION_SECONDS_PER_MINUTE = 2.0  # Download and decode per minute of video
+
+# config.py names the planner reads, shared by main.py and the extractor so both plan alike
+PLANNER_SETTINGS = ('TARGET_JOB_SECONDS', 'TOKEN_BUDGET', 'RATE_LIMIT_RPM', 'FORCE_MAX_RPM', 'FORCE_MAX_SCREENSHOTS',
+                    'SCREENSHOT_QUALITY', 'FAST_MODE', 'MIN_SCREENSHOTS', 'MAX_SCREENSHOTS', 'FRAME_LONG_EDGE',
+                    'VISION_PROVIDER', 'BATCH_SIZE', 'MAX_CONCURRENT_REQUESTS', 'ENABLE_PARALLEL_PROCESSING',
+                    'SYNTHESIS_MODE', 'MAP_REDUCE_MIN_MINUTES')
+
+
+def image_tokens(long_edge, provider='openai'):
+    """Prompt tokens for one screenshot whose longest side is long_edge"""
+    width, height = long_edge, long_edge / FRAME_ASPECT
+    if provider == 'gemini':
+        # 258 per 768x768 tile; small images are a single tile
+        return 258 * math.ceil(width / 768) * math.ceil(height / 768)
+    # OpenAI high detail: fit in 2048x2048, shortest side down to 768, then 170 per 512px tile plus 85
+    scale = min(1.0, 2048 / max(width, height), 768 / min(width, height))
+    return 85 + 170 * math.ceil(width * scale / 512) * math.ceil(height * scale / 512)
+
+
+def request_seconds(prompt_tokens, completion_tokens):
+    return REQUEST_SECONDS + prompt_tokens / PROMPT_TOKENS_PER_SECOND + completion_tokens / OUTPUT_TOKENS_PER_SECOND
+
+
+def _format_minutes(seconds):
+    return f"{seconds / 60:.1f} min"
+
+
+@dataclass
+class BudgetPlan:
+    duration_seconds: float
+    screenshots: int
+    interval_seconds: int
+    concurrency: int
+    max_rpm: int
+    map_reduce: bool
+    memory: bool
+    target_seconds: float
+    token_budget: int
+    stages: dict = field(default_factory=dict)  # {stage: {'seconds', 'tokens'}} predicted
+
+    @property
+    def seconds(self):
+        return sum(stage['seconds'] for stage in self.stages.values())
+
+    @property
+    def tokens(self):
+        return sum(stage['tokens'] for stage in self.stages.values())
+
+    @property
+    def fits(self):
+        return self.seconds <= self.target_seconds and self.tokens <= self.token_budget
+
+    def sampling(self):
+        """(interval_seconds, max_screenshots), as the extractor's interval_fn returns them"""
+        return self.interval_seconds, self.screenshots
+
+    def crew_settings(self):
+        return {'max_rpm': self.max_rpm, 'memory': self.memory}
+
+    def summary(self):
+        line = (f"Budget plan: {self.screenshots} screenshots (every {self.interval_seconds}s), "
+                f"concurrency {self.concurrency}, {self.max_rpm} rpm, "
+                f"{'map-reduce' if self.map_reduce else 'single-pass'} synthesis -> predicted "
+                f"{_format_minutes(self.seconds)} / {self.tokens:,} tokens "
+                f"(target {_format_minutes(self.target_seconds)} / {self.token_budget:,} tokens)")
+        if self.tokens > self.token_budget:
+            line += "; over the token budget even at the minimum screenshot count"
+        elif self.seconds > self.target_seconds:
+            line += "; the time target can't be met, planned for the token budget"
+        return line
+
+    def compare(self, actual):
+        """
+        One 'Budget vs actual:' line per stage and in total, given measured
+        {stage: {'seconds', 'tokens', ...}} such as StageMeter.summary().
+        """
+        parts = []
+        for stage, predicted in self.stages.items():
+            measured = actual.get(stage)
+            measured_text = f"{measured['seconds']:.0f}s {measured['tokens']:,}" if measured else "not run"
+            parts.append(f"{stage} {predicted['seconds']:.0f}s {predicted['tokens']:,} vs {measured_text}")
+        seconds = sum(cost['seconds'] for cost in actual.values())
+        tokens = sum(cost['tokens'] for cost in actual.values())
+        parts.append(f"total {self.seconds:.0f}s {self.tokens:,} vs {seconds:.0f}s {tokens:,}")
+        return "Budget vs actual (predicted vs measured seconds and tokens): " + " | ".join(parts)
+
+
+class BudgetPlanner:
+    """Picks screenshot count and concurrency for a job from its time and token budgets"""
+
+    def __init__(self, target_seconds=TARGET_JOB_SECONDS, token_budget=TOKEN_BUDGET, rate_limit_rpm=MAX_RPM,
+                 max_concurrent=MAX_CONCURRENT_REQUESTS, batch_size=BATCH_SIZE, frame_long_edge=FRAME_LONG_EDGE,
+                 vision_provider='openai', quality="HIGH", fast_mode=False, min_screenshots=MIN_SCREENSHOTS,
+                 max_screenshots=MAX_SCREENSHOTS, forced_screenshots=None, synthesis_mode="auto",
+                 map_reduce_min_minutes=MAP_REDUCE_MIN_MINUTES):
+        self.target_seconds = target_seconds
+        self.token_budget = token_budget
+        self.rate_limit_rpm = max(1, rate_limit_rpm)
+        self.max_concurrent = max(1, max_concurrent)
+        self.batch_size = max(1, batch_size)
+        self.image_tokens = image_tokens(frame_long_edge, vision_provider)
+        self.quality = quality
+        self.fast_mode = fast_mode
+        self.min_screenshots = min_screenshots
+        self.max_screenshots = max_screenshots
+        self.forced_screenshots = forced_screenshots
+        self.synthesis_mode = synthesis_mode
+        self.map_reduce_min_minutes = map_reduce_min_minutes
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Planner for a load_settings(extra_names=PLANNER_SETTINGS) dict; missing names keep their defaults"""
+        def get(name, default):
+            value = settings.get(name)
+            return default if value is None else value
+        parallel = get('ENABLE_PARALLEL_PROCESSING', True)
+        return cls(
+            target_seconds=get('TARGET_JOB_SECONDS', TARGET_JOB_SECONDS),
+            token_budget=get('TOKEN_BUDGET', TOKEN_BUDGET),
+            rate_limit_rpm=get('FORCE_MAX_RPM', get('RATE_LIMIT_RPM', MAX_RPM)),
+            max_concurrent=get('MAX_CONCURRENT_REQUESTS', MAX_CONCURRENT_REQUESTS) if parallel else 1,
+            batch_size=get('BATCH_SIZE', BATCH_SIZE),
+            frame_long_edge=get('FRAME_LONG_EDGE', FRAME_LONG_EDGE),
+            vision_provider=get('VISION_PROVIDER', 'openai'),
+            quality=get('SCREENSHOT_QUALITY', "HIGH"),
+            fast_mode=get('FAST_MODE', False),
+            min_screenshots=get('MIN_SCREENSHOTS', MIN_SCREENSHOTS),
+            max_screenshots=get('MAX_SCREENSHOTS', MAX_SCREENSHOTS),
+            forced_screenshots=settings.get('FORCE_MAX_SCREENSHOTS'),
+            synthesis_mode=get('SYNTHESIS_MODE', "auto"),
+            map_reduce_min_minutes=get('MAP_REDUCE_MIN_MINUTES', MAP_REDUCE_MIN_MINUTES),
+        )
+
+    def uses_map_reduce(self, duration_minutes):
+        """Whether the video is long enough that one synthesis call can't hold all of it"""
+        if self.synthesis_mode == "auto":
+            return duration_minutes > self.map_reduce_min_minutes
+        return self.synthesis_mode == "map_reduce"
+
+    def wanted_screenshots(self, duration_seconds):
+        """The screenshot count SCREENSHOT_QUALITY asks for, before the budgets"""
+        if self.forced_screenshots is not None:
+            return self.forced_screenshots
+        interval = QUALITY_INTERVALS.get(self.quality, QUALITY_INTERVALS['HIGH']) * (2 if self.fast_mode else 1)
+        wanted = math.ceil(duration_seconds / interval)
+        return max(self.min_screenshots, min(wanted, self.max_screenshots))
+
+    def estimate(self, duration_seconds, screenshots, concurrency, map_reduce):
+        """Predicted {stage: {'seconds', 'tokens'}}"""
+        minutes = duration_seconds / 60
+        transcript_tokens = minutes * TRANSCRIPT_TOKENS_PER_MINUTE
+        agent_tokens = AGENT_PROMPT_TOKENS + AGENT_REPLY_TOKENS
+        agent_seconds = request_seconds(AGENT_PROMPT_TOKENS, AGENT_REPLY_TOKENS)
+
+        # Vision: full batches in waves of `concurrency`, no faster than the rate limit allows
+        batches = math.ceil(screenshots / self.batch_size)
+        batch_images = min(self.batch_size, screenshots)
+        batch_seconds = request_seconds(VISION_PROMPT_TOKENS + batch_images * self.image_tokens,
+                                        batch_images * ANALYSIS_TOKENS)
+        vision_seconds = max(math.ceil(batches / concurrency) * batch_seconds,
+                             max(0, batches - concurrency) * 60 / self.rate_limit_rpm + batch_seconds)
+        vision_tokens = batches * VISION_PROMPT_TOKENS + screenshots * (self.image_tokens + ANALYSIS_TOKENS)
+        analysis = {'seconds': agent_seconds + vision_seconds,
+                    'tokens': agent_tokens + screenshots * MANIFEST_TOKENS_PER_SCREENSHOT + vision_tokens}
+
+        # Synthesis reads every analysis (each carrying its transcript excerpt) once
+        analyses_tokens = screenshots * ANALYSIS_TOKENS + transcript_tokens
+        if map_reduce:
+            windows = max(1, math.ceil(duration_seconds / WINDOW_SECONDS))
+            map_prompt = SECTION_PROMPT_TOKENS + analyses_tokens / windows
+            reduce_prompt = SECTION_PROMPT_TOKENS + windows * min(SECTION_TOKENS, MAX_NOTES_CHARS_FOR_REDUCE / 4)
+            synthesis = {
+                'seconds': (agent_seconds + math.ceil(windows / concurrency) * request_seconds(map_prompt, SECTION_TOKENS)
+                            + request_seconds(reduce_prompt, REDUCE_TOKENS)),
+                'tokens': (agent_tokens + windows * (map_prompt + SECTION_TOKENS) + reduce_prompt + REDUCE_TOKENS),
+            }
+        else:
+            prompt = AGENT_PROMPT_TOKENS + screenshots * MANIFEST_TOKENS_PER_SCREENSHOT + analyses_tokens
+            synthesis = {'seconds': request_seconds(prompt, GUIDE_TOKENS), 'tokens': prompt + GUIDE_TOKENS}
+
+        stages = {
+            'extract': {'seconds': EXTRACTION_SECONDS + EXTRACTION_SECONDS_PER_MINUTE * minutes, 'tokens': 0},
+            'analysis': analysis,
+            'synthesis': synthesis,
+        }
+        return {name: {'seconds': round(cost['seconds'], 1), 'tokens': int(cost['tokens'])}
+                for name, cost in stages.items()}
+
+    def plan(self, duration_seconds, map_reduce=None):
+        """
+        The most screenshots (down to MIN_SCREENSHOTS) at the lowest concurrency
+        that fit both budgets. When the time target can't be met at all (long
+        videos spend most of it downloading), the token budget alone decides, at
+        full concurrency; when neither can be met, the minimum at full concurrency.
+        """
+        if map_reduce is None:
+            map_reduce = self.uses_map_reduce(duration_seconds / 60)
+        wanted = max(1, self.wanted_screenshots(duration_seconds))
+        fewest = wanted if self.forced_screenshots is not None else min(self.min_screenshots, wanted)
+        counts = range(wanted, fewest - 1, -1)
+        for screenshots in counts:
+            for concurrency in range(1, self.max_concurrent + 1):
+                choice = self._plan(duration_seconds, screenshots, concurrency, map_reduce)
+                if choice.fits:
+                    return choice
+        for screenshots in counts:
+            choice = self._plan(duration_seconds, screenshots, self.max_concurrent, map_reduce)
+            if choice.tokens <= self.token_budget:
+                return choice
+        return choice
+
+    def _plan(self, duration_seconds, screenshots, concurrency, map_reduce):
+        memory_minutes = MEMORY_MIN_MINUTES * (3 if self.fast_mode else 1)
+        return BudgetPlan(
+            duration_seconds=duration_seconds,
+            screenshots=screenshots,
+            interval_seconds=max(MIN_INTERVAL_SECONDS, int(duration_seconds / screenshots)),
+            concurrency=concurrency,
+            max_rpm=self.rate_limit_rpm,
+            map_reduce=map_reduce,
+            memory=duration_seconds / 60 > memory_minutes,
+            target_seconds=self.target_seconds,
+            token_budget=self.token_budget,
+            stages=self.estimate(duration_seconds, screenshots, concurrency, map_reduce),
+        )
+
+    def sampling(self, duration_minutes):
+        """interval_fn for run_extraction: (interval_seconds, max_screenshots) from the plan"""
+        plan = self.plan(duration_minutes * 60)
+        print(plan.summary())
+        return plan.sampling()
@@ -0,0 +1,102 @@
+"""
+Chapter-aware screenshot scheduling.
+
+Spreading max_screenshots evenly (or by scene change) over a long lecture can
+leave whole chapters without a single screenshot. When the metadata probe
+reports chapters, the budget is split across them in proportion to their
+length, every chapter is guaranteed MIN_SCREENSHOTS_PER_CHAPTER, and sampling
+(fixed-interval or adaptive) runs per chapter. The chapter list goes into the
+extraction manifest so later stages can chunk by the same boundaries.
+"""
+import numpy as np
+
+from .scene_detector import MIN_CHANGE_SCORE, PROBE_SECONDS, change_scores, probe_frame_indices, select_keyframes
+
+MIN_SCREENSHOTS_PER_CHAPTER = 2
+
+
+def video_chapters(video_info, duration_seconds):
+    """
+    The probe's chapters as [{'title', 'start_time', 'end_time'}], sorted, clipped
+    to the video and without gaps, or [] when there are fewer than two.
+    """
+    raw = sorted((c for c in video_info.get('chapters') or [] if c.get('start_time') is not None),
+                 key=lambda c: c['start_time'])
+    chapters = []
+    for i, chapter in enumerate(raw):
+        start = max(0.0, float(chapter['start_time']))
+        next_start = raw[i + 1]['start_time'] if i + 1 < len(raw) else duration_seconds
+        end = min(float(chapter.get('end_time') or next_start), float(next_start), duration_seconds)
+        if end > start:
+            chapters.append({'title': chapter.get('title') or f"Chapter {i + 1}",
+                             'start_time': round(start, 2), 'end_time': round(end, 2)})
+    if chapters:
+        chapters[0]['start_time'] = 0.0  # Anything before the first marker belongs to it
+    return chapters if len(chapters) > 1 else []
+
+
+def allocate_screenshots(chapters, budget, minimum=MIN_SCREENSHOTS_PER_CHAPTER):
+    """
+    Screenshots per chapter: minimum each (guaranteed, even past budget), the
+    rest of the budget in proportion to chapter length by largest remainder.
+    """
+    allocations = [minimum] * len(chapters)
+    spare = budget - minimum * len(chapters)
+    if spare <= 0:
+        return allocations
+    lengths = np.array([c['end_time'] - c['start_time'] for c in chapters], dtype=float)
+    shares = spare * lengths / lengths.sum()
+    extra = np.floor(shares).astype(int)
+    for i in np.argsort(-(shares - extra), kind='stable')[:spare - int(extra.sum())]:
+        extra[i] += 1
+    return [a + int(e) for a, e in zip(allocations, extra)]
+
+
+def _frame_range(chapter, fps, total_frames):
+    return int(chapter['start_time'] * fps), min(total_frames, max(1, int(chapter['end_time'] * fps)))
+
+
+def plan_chapter_frame_indices(chapters, allocations, fps, total_frames, interval_seconds,
+                               minimum=MIN_SCREENSHOTS_PER_CHAPTER):
+    """
+    Fixed-interval sampling per chapter: as many frames as the interval gives,
+    kept within [minimum, allocation] and spread evenly over the chapter.
+    """
+    indices = []
+    for chapter, allocation in zip(chapters, allocations):
+        first, last = _frame_range(chapter, fps, total_frames)
+        if last <= first:
+            continue
+        by_interval = int(np.ceil((chapter['end_time'] - chapter['start_time']) / max(interval_seconds, 1e-6)))
+        count = min(allocation, max(minimum, by_interval), last - first)
+        step = (last - first) / count
+        indices.extend(first + int(j * step) for j in range(count))
+    return sorted(set(indices))
+
+
+def detect_chapter_keyframes(probe, fps, total_frames, chapters, allocations, minimum=MIN_SCREENSHOTS_PER_CHAPTER,
+                             probe_seconds=PROBE_SECONDS, min_score=MIN_CHANGE_SCORE):
+    """
+    Adaptive density per chapter: one probe pass over the whole video, then the
+    strongest scene changes inside each chapter, within [minimum, allocation].
+    A chapter start always counts as a change.
+    """
+    probe_indices, thumbnails = probe(probe_frame_indices(fps, total_frames, probe_seconds))
+    scores = change_scores(thumbnails)
+    keyframes = []
+    for chapter, allocation in zip(chapters, allocations):
+        first, last = _frame_range(chapter, fps, total_frames)
+        inside = np.flatnonzero((probe_indices >= first) & (probe_indices < last))
+        if inside.size == 0:
+            continue
+        chapter_scores = scores[inside].copy()
+        chapter_scores[0] = np.inf
+        keyframes.extend(select_keyframes(probe_indices[inside], chapter_scores, minimum, allocation, min_score))
+    print(f"Adaptive density: {len(keyframes)} screenshots from {len(probe_indices)} probes "
+          f"across {len(chapters)} chapters")
+    return sorted(set(keyframes))
+
+
+def describe_schedule(chapters, allocations):
+    return (f"Chapter-aware sampling: {len(chapters)} chapters, "
+            f"{min(allocations)}-{max(allocations)} screenshots each ({sum(allocations)} max)")
@@ -0,0 +1,90 @@
+"""
+Stage checkpoints inside a job workspace.
+
+checkpoint.json holds the output of each finished stage (extract, analysis,
+synthesis) with the files it produced; analyses.jsonl gets a line per
+screenshot as soon as its vision batch returns. Rerunning a job in the same
+workspace returns finished stages straight from the checkpoint and sends only
+the screenshots without an analysis to the vision model, so recovering from
+a failure costs only the work that was left.
+"""
+import json
+import os
+import threading
+import time
+
+CHECKPOINT_FILE = "checkpoint.json"
+ANALYSES_LOG = "analyses.jsonl"
+STAGES = ('extract', 'analysis', 'synthesis')  # Crew tasks, in order
+
+
+class StageCheckpoint:
+    def __init__(self, workspace):
+        self.path = os.path.join(workspace.path, CHECKPOINT_FILE)
+        self.analyses_path = os.path.join(workspace.path, ANALYSES_LOG)
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, stage, key=None):
+        """
+        The stage's saved output, or None when it never finished, its files are
+        gone, or it was saved for a different key (e.g. other inputs).
+        """
+        entry = self._load().get(stage)
+        if entry is None or entry.get('key') != key:
+            return None
+        if not all(os.path.exists(path) for path in entry['files']):
+            return None
+        return entry['output']
+
+    def put(self, stage, output, files=(), key=None):
+        with self._lock:
+            stages = self._load()
+            stages[stage] = {'output': output, 'files': [os.path.abspath(path) for path in files],
+                             'key': key, 'finished': time.time()}
+            # Anything after this stage was built on the old output
+            for later in STAGES[STAGES.index(stage) + 1:]:
+                stages.pop(later, None)
+            if 'analysis' in STAGES[STAGES.index(stage) + 1:] and os.path.exists(self.analyses_path):
+                os.remove(self.analyses_path)
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(stages, f, indent=2)
+            os.replace(self.path + '.tmp', self.path)
+
+    def resume_point(self):
+        """The first stage without a checkpoint, or None when the job is complete"""
+        stages = self._load()
+        return next((stage for stage in STAGES if stage not in stages), None)
+
+    def analyses(self):
+        """{screenshot path: analysis} for every screenshot analyzed so far"""
+        analyses = {}
+        try:
+            with open(self.analyses_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # A line cut short by the crash that made this a resume
+                    analyses[record['path']] = record['analysis']
+        except OSError:
+            pass
+        return analyses
+
+    def add_analysis(self, screenshot, analysis):
+        record = json.dumps({'path': screenshot['path'], 'analysis': analysis}) + "\n"
+        with self._lock:
+            with open(self.analyses_path, 'ab+') as f:
+                # Start a fresh line if the previous attempt died mid-write
+                end = f.seek(0, os.SEEK_END)
+                if end:
+                    f.seek(end - 1)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                f.write(record.encode('utf-8'))
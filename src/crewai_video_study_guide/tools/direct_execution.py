@@ -0,0 +1,159 @@
+"""
+Direct execution of deterministic crew stages, and per-stage cost metering.
+
+Extraction is a single tool call with nothing to decide, yet as a crew task
+the video_engineer agent spends at least one LLM round trip (sometimes a retry)
+just to call the tool and hand back its output. DirectExecution runs the tool
+as plain code from a before-kickoff callback and stores the result as the
+task's output. The task itself stays out of the crew; the tasks that list it
+as context receive the manifest exactly as if the agent had returned it.
+
+StageMeter records the latency and LLM tokens of every stage, direct or not,
+so the saving can be measured: compare a run with DIRECT_EXTRACTION on and off.
+Its summary is also what the budget planner's predictions are compared with.
+"""
+import time
+
+from crewai.llms.base_llm import BaseLLM
+from crewai.tasks.task_output import TaskOutput
+
+DIRECT_AGENT = "direct execution"
+
+
+class DirectExecution:
+    """Before-kickoff callback that runs a task's tool with a kickoff input and fills in the task's output"""
+
+    def __init__(self, tool, task, stage, argument='youtube_url', callback=None):
+        self.tool = tool
+        self.task = task
+        self.stage = stage
+        self.argument = argument
+        self.callback = callback  # Called with the TaskOutput, like a crew task_callback
+        self.seconds = None
+
+    def __call__(self, inputs):
+        started = time.time()
+        output = self.tool.run(**{self.argument: inputs[self.argument]})
+        self.seconds = time.time() - started
+        self.task.output = TaskOutput(
+            description=self.task.description,
+            name=self.task.name,
+            expected_output=self.task.expected_output,
+            raw=str(output),
+            agent=DIRECT_AGENT,
+        )
+        print(f"Ran {self.tool.name} directly in {self.seconds:.1f}s (no agent, no LLM call)")
+        if self.callback is not None:
+            self.callback(self.task.output)
+        return inputs
+
+
+def without_task(tasks, agents, task):
+    """The crew's tasks and agents minus a task that runs directly (and its agent, if nothing else uses it)"""
+    tasks = [t for t in tasks if t is not task]
+    agents = [a for a in agents if a is not task.agent or any(t.agent is a for t in tasks)]
+    return tasks, agents
+
+
+def llm_usage(agents, tools=()):
+    """
+    Token totals over the agents' LLMs, counting a shared LLM once, plus the
+    tools that call models themselves (anything with a token_usage() method)
+    """
+    totals = {'tokens': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'requests': 0}
+    for tool in tools:
+        usage = tool.token_usage()
+        totals['prompt_tokens'] += usage.get('prompt_tokens', 0)
+        totals['completion_tokens'] += usage.get('completion_tokens', 0)
+        totals['tokens'] += usage.get('prompt_tokens', 0) + usage.get('completion_tokens', 0)
+        totals['requests'] += usage.get('requests', 0)
+    seen = set()
+    for agent in agents:
+        if id(agent.llm) in seen:
+            continue
+        seen.add(id(agent.llm))
+        if isinstance(agent.llm, BaseLLM):
+            metrics = agent.llm.get_token_usage_summary()
+        elif hasattr(agent, '_token_process'):
+            metrics = agent._token_process.get_summary()
+        else:
+            continue
+        totals['tokens'] += metrics.total_tokens
+        totals['prompt_tokens'] += metrics.prompt_tokens
+        totals['completion_tokens'] += metrics.completion_tokens
+        totals['requests'] += metrics.successful_requests
+    return totals
+
+
+def model_tools(crew):
+    """The crew's tools (on agents or tasks) that report their own model usage, each once"""
+    tools = {}
+    for owner in [*crew.agents, *crew.tasks]:
+        for tool in owner.tools or []:
+            if hasattr(tool, 'token_usage'):
+                tools[id(tool)] = tool
+    return list(tools.values())
+
+
+class StageMeter:
+    """
+    Latency and LLM tokens per stage: the agents' calls plus those of tools
+    that call models themselves, like the vision batcher. Chains itself in front
+    of the crew's task_callback; stages names the crew's tasks in order.
+    """
+
+    def __init__(self, crew, stages):
+        self.crew = crew
+        self.stages = list(stages)
+        self.results = {}
+        self._next = 0
+        self._tools = model_tools(crew)
+        self._usage = llm_usage(crew.agents, self._tools)
+        self._started = None
+        self._then = crew.task_callback
+        crew.task_callback = self
+        # Runs after any DirectExecution, so the first task's clock starts when it does
+        crew.before_kickoff_callbacks.append(self._start)
+
+    def _start(self, inputs):
+        self._started = time.time()
+        self._usage = llm_usage(self.crew.agents, self._tools)
+        return inputs
+
+    def __call__(self, task_output):
+        now = time.time()
+        usage = llm_usage(self.crew.agents, self._tools)
+        stage = self.stages[self._next] if self._next < len(self.stages) else f"task {self._next + 1}"
+        self.results[stage] = {
+            'seconds': round(now - (self._started or now), 2),
+            **{name: usage[name] - self._usage[name] for name in usage},
+            'direct': False,
+        }
+        self._next += 1
+        self._started, self._usage = now, usage
+        if self._then is not None:
+            self._then(task_output)
+
+    def direct_stages(self):
+        return [callback for callback in self.crew.before_kickoff_callbacks
+                if isinstance(callback, DirectExecution) and callback.seconds is not None]
+
+    def summary(self):
+        """{stage: {'seconds', 'tokens', 'prompt_tokens', 'completion_tokens', 'requests', 'direct'}} in run order"""
+        summary = {direct.stage: {'seconds': round(direct.seconds, 2), 'tokens': 0, 'prompt_tokens': 0,
+                                  'completion_tokens': 0, 'requests': 0, 'direct': True}
+                   for direct in self.direct_stages()}
+        summary.update(self.results)
+        return summary
+
+    def report(self):
+        """One 'LLM usage:' line: seconds, tokens and requests per stage, then the total"""
+        summary = self.summary()
+        parts = []
+        for stage, cost in summary.items():
+            how = "direct" if cost['direct'] else f"{cost['requests']} requests"
+            parts.append(f"{stage} {cost['seconds']:.1f}s {cost['tokens']:,} tokens ({how})")
+        total_seconds = sum(cost['seconds'] for cost in summary.values())
+        total_tokens = sum(cost['tokens'] for cost in summary.values())
+        parts.append(f"total {total_seconds:.1f}s {total_tokens:,} tokens")
+        return "LLM usage: " + " | ".join(parts)
@@ -0,0 +1,92 @@
+"""
+Typed manifest produced by extract_video_data.
+
+Instead of 'File: ..., Time: ...' lines that an agent has to copy and the
+analyzer has to re-parse, the extractor returns one compact JSON document
+and saves it as extraction_manifest.json in the job workspace:
+
+    {"version": 1, "youtube_url": ..., "video_id": ..., "duration_seconds": 754.2,
+     "screenshots": [{"path": ..., "times": ["01_20", "05_42"], "seconds": [80.04, 342.5],
+                      "width": 1280, "height": 720, "dhash": "f0e1...", "sha256": "..."}],
+     "transcript": {"text": ..., "structured": ..., "language": "en", "source": ...} or null,
+     "chapters": [{"title": ..., "start_time": 0.0, "end_time": 312.5}],
+     "frame_quality": {"sampled": 40, "rejected": {"blurred": 3}, "moved": 2, "dropped": 1} or null,
+     "warnings": [...], "stage_timings": {"probe": 1.2, ...}}
+
+Later stages load it from the workspace. The old line format is still
+understood, so artifacts cached by earlier versions keep working.
+"""
+import json
+import os
+import re
+
+from .vision_batch import parse_screenshot_listing
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE = "extraction_manifest.json"
+STRUCTURED_TRANSCRIPT_LINE = re.compile(r'Structured transcript at:\s*(?P<path>.+\.json)\s*$', re.MULTILINE)
+TRANSCRIPT_LINE = re.compile(r'Transcript available at:\s*(?P<path>.+)\s*$', re.MULTILINE)
+
+
+def build_manifest(youtube_url, video_id, duration_seconds, screenshots, transcript, warnings, stage_timings,
+                   chapters=(), frame_quality=None):
+    return {
+        'version': MANIFEST_VERSION,
+        'youtube_url': youtube_url,
+        'video_id': video_id,
+        'duration_seconds': round(duration_seconds, 2),
+        'screenshots': screenshots,
+        'transcript': transcript,
+        'chapters': list(chapters),
+        'frame_quality': frame_quality,
+        'warnings': warnings,
+        'stage_timings': {name: round(seconds, 2) for name, seconds in stage_timings.items()},
+    }
+
+
+def dumps(manifest):
+    return json.dumps(manifest, separators=(',', ':'))
+
+
+def manifest_path(workspace):
+    return os.path.join(workspace.path, MANIFEST_FILE)
+
+
+def save_manifest(workspace, manifest):
+    """Write the manifest into the workspace; returns the compact JSON text"""
+    text = dumps(manifest)
+    with open(manifest_path(workspace), 'w', encoding='utf-8') as f:
+        f.write(text)
+    return text
+
+
+def parse_manifest(text):
+    """Manifest dict from the extractor's output (JSON, or the old text lines), or None"""
+    if not text:
+        return None
+    try:
+        manifest = json.loads(text)
+    except ValueError:
+        manifest = None
+    if isinstance(manifest, dict):
+        return manifest if 'screenshots' in manifest else None
+
+    screenshots = parse_screenshot_listing(text)
+    if not screenshots:
+        return None
+    structured = STRUCTURED_TRANSCRIPT_LINE.search(text)
+    plain = TRANSCRIPT_LINE.search(text)
+    transcript = None
+    if structured or plain:
+        transcript = {'text': plain and plain.group('path').strip(),
+                      'structured': structured and structured.group('path').strip()}
+    return {'version': 0, 'screenshots': screenshots, 'transcript': transcript, 'warnings': []}
+
+
+def load_manifest(workspace):
+    """The manifest saved in the workspace, or None"""
+    try:
+        with open(manifest_path(workspace), encoding='utf-8') as f:
+            return parse_manifest(f.read())
+    except OSError:
+        return None
@@ -0,0 +1,422 @@
+"""
+Staged extraction pipeline behind extract_video_data.
+
+    probe ─┬─ transcript ───────────────────────────────┐
+           └─ download ══ frames (decoded while writing) ┴─ summary
+
+All files go to the job's workspace (see workspace.py), so concurrent jobs
+never share paths.
+The transcript doesn't depend on the video file, so it is fetched on a
+background thread while yt-dlp downloads. Frames are decoded from the
+partially written file as soon as the bytes covering them are on disk, and
+screenshots are written as they come. Every stage's wall-clock time is
+printed at the end of the run.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from .artifact_cache import ArtifactCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, cache_key
+from .chapter_scheduler import (MIN_SCREENSHOTS_PER_CHAPTER, allocate_screenshots, describe_schedule,
+                                detect_chapter_keyframes, plan_chapter_frame_indices, video_chapters)
+from .checkpoint import StageCheckpoint
+from .extraction_manifest import MANIFEST_VERSION, build_manifest, dumps, save_manifest
+from .format_selector import FALLBACK_FORMAT, download_report, estimated_size, select_frame_format
+from .frame_dedup import PerceptualHashIndex, dhash
+from .frame_encoder import FRAME_FORMAT, FRAME_LONG_EDGE, FRAME_QUALITY, FrameEncoder, forget_all
+from .frame_filter import (FRAME_SEARCH_SECONDS, MIN_FRAME_BRIGHTNESS, MIN_FRAME_CONTRAST, MIN_FRAME_SHARPNESS,
+                           FrameQualityFilter)
+from .frame_sampler import plan_frame_indices, sample_frames
+from .metadata_probe import PROBE_CACHE_DIR, cached_probe_path, extract_video_id, probe_video
+from .parallel_extractor import sample_frames_parallel, worker_count
+from .remote_source import open_remote_capture, resolve_media_url
+from .scene_detector import MIN_CHANGE_SCORE, detect_scene_keyframes, thumbnails_at, thumbnails_from_frames, thumbnails_parallel
+from .slide_roi import SlideCropper
+from .stage_timer import StageTimer
+from .streaming_download import BackgroundDownload
+from .transcript_engine import (GENERATED_TRANSCRIPT_MAX_AGE_DAYS, TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_MAX_AGE_DAYS,
+                                TRANSCRIPT_LANGUAGES, TranscriptEngine)
+from .workspace import current_workspace, screenshot_time
+
+DEFAULT_SETTINGS = {
+    'FORCE_INTERVAL_SECONDS': None,
+    'FORCE_MAX_SCREENSHOTS': None,
+    'ADAPTIVE_DENSITY': True,
+    'MIN_SCREENSHOTS': 10,
+    'CHAPTER_AWARE_SAMPLING': True,
+    'MIN_SCREENSHOTS_PER_CHAPTER': MIN_SCREENSHOTS_PER_CHAPTER,
+    'SCENE_CHANGE_THRESHOLD': MIN_CHANGE_SCORE,
+    'DEDUP_SCREENSHOTS': True,
+    'DEDUP_MAX_DISTANCE': 5,
+    'SLIDE_CROP': False,
+    'FILTER_BAD_FRAMES': True,
+    'MIN_FRAME_CONTRAST': MIN_FRAME_CONTRAST,
+    'MIN_FRAME_BRIGHTNESS': MIN_FRAME_BRIGHTNESS,
+    'MIN_FRAME_SHARPNESS': MIN_FRAME_SHARPNESS,
+    'FRAME_SEARCH_SECONDS': FRAME_SEARCH_SECONDS,
+    'FRAME_LONG_EDGE': FRAME_LONG_EDGE,
+    'FRAME_FORMAT': FRAME_FORMAT,
+    'FRAME_QUALITY': FRAME_QUALITY,
+    'EXTRACTION_MODE': "download",
+    'MIN_FRAME_HEIGHT': 720,
+    'EXTRACTION_WORKERS': None,
+    'STREAM_EXTRACTION': True,
+    'ENABLE_ARTIFACT_CACHE': True,
+    'ARTIFACT_CACHE_DIR': DEFAULT_CACHE_DIR,
+    'ARTIFACT_CACHE_MAX_BYTES': DEFAULT_MAX_BYTES,
+    'PROBE_CACHE_DIR': PROBE_CACHE_DIR,
+    'TRANSCRIPT_LANGUAGES': TRANSCRIPT_LANGUAGES,
+    'TRANSCRIPT_CACHE_DIR': TRANSCRIPT_CACHE_DIR,
+    'TRANSCRIPT_CACHE_MAX_AGE_DAYS': TRANSCRIPT_CACHE_MAX_AGE_DAYS,
+    'GENERATED_TRANSCRIPT_MAX_AGE_DAYS': GENERATED_TRANSCRIPT_MAX_AGE_DAYS,
+}
+
+# Settings that only change how fast extraction runs, not which screenshots it produces
+NON_SAMPLING_SETTINGS = ('EXTRACTION_WORKERS', 'STREAM_EXTRACTION', 'ENABLE_ARTIFACT_CACHE', 'ARTIFACT_CACHE_DIR',
+                         'ARTIFACT_CACHE_MAX_BYTES', 'PROBE_CACHE_DIR', 'TRANSCRIPT_CACHE_DIR',
+                         'TRANSCRIPT_CACHE_MAX_AGE_DAYS', 'GENERATED_TRANSCRIPT_MAX_AGE_DAYS')
+
+
+def load_settings(extra_names=()):
+    """DEFAULT_SETTINGS overridden by whatever config.py defines (plus extra_names, e.g. interval inputs)"""
+    settings = dict(DEFAULT_SETTINGS)
+    try:
+        import config
+    except ImportError:
+        return settings
+    for name in list(settings) + list(extra_names):
+        if hasattr(config, name):
+            settings[name] = getattr(config, name)
+    return settings
+
+
+def fetch_transcript(youtube_url, workspace, video_info=None, settings=DEFAULT_SETTINGS):
+    """
+    Write the workspace's transcript.txt and transcript_structured.json.
+    Returns ({'text': path, 'structured': path, 'language', 'source'} or None, warnings).
+    """
+    video_id = extract_video_id(youtube_url)
+    if not video_id:
+        return None, ["Could not extract video ID for transcript"]
+    engine = TranscriptEngine(settings['TRANSCRIPT_LANGUAGES'], settings['TRANSCRIPT_CACHE_DIR'],
+                              max_age_days=settings['TRANSCRIPT_CACHE_MAX_AGE_DAYS'],
+                              generated_max_age_days=settings['GENERATED_TRANSCRIPT_MAX_AGE_DAYS'])
+    result, warnings = engine.get(video_id, video_info)
+    if result is None:
+        return None, [f"Could not get transcript: {'; '.join(warnings) or 'no transcript available'}"]
+    segments = result['segments']
+
+    # Save full transcript with timestamps
+    transcript_path = workspace.transcript_path
+    with open(transcript_path, "w", encoding="utf-8") as f:
+        f.write("=== FULL TRANSCRIPT WITH TIMESTAMPS ===\n\n")
+        for item in segments:
+            start_time = item['start']
+            text = item['text']
+            minutes = int(start_time // 60)
+            seconds = int(start_time % 60)
+            f.write(f"[{minutes:02d}:{seconds:02d}] {text}\n")
+
+        f.write("\n\n=== PLAIN TEXT TRANSCRIPT ===\n\n")
+        f.write(" ".join([item['text'] for item in segments]))
+
+    # Also save a structured transcript for easier processing
+    structured_transcript_path = workspace.structured_transcript_path
+    with open(structured_transcript_path, "w", encoding="utf-8") as f:
+        json.dump(segments, f, indent=2)
+
+    print(f"Transcript: {result['language']}{' (generated)' if result['generated'] else ''} "
+          f"from {result['source']}, {engine.requests} requests")
+    transcript = {'text': transcript_path, 'structured': structured_transcript_path,
+                  'language': result['language'], 'source': result['source']}
+    return transcript, []
+
+
+def extract_screenshots(youtube_url, video_info, interval_seconds, interval_fn, settings, workspace, timer):
+    """
+    Download (or open remotely) and sample the video.
+    Returns (screenshots, duration_seconds, chapters, frame_quality) - frame_quality being the filter's
+    counts or None - or raises RuntimeError with a message for the agent.
+    """
+    remote = settings['EXTRACTION_MODE'] == "remote"
+    formats = video_info.get('formats') or []
+    probed_duration = video_info.get('duration')
+    frame_format = select_frame_format(formats, probed_duration, settings['MIN_FRAME_HEIGHT'])
+    video_path = workspace.video_path
+    download = None
+    expected_bytes = None
+    cap = None
+
+    if remote:
+        # Seek on the media URL itself: only the byte ranges around each screenshot are fetched
+        print(f"Opening remote stream for: {youtube_url}")
+        with timer.stage('open'):
+            if frame_format is not None and frame_format.get('url'):
+                video_source = frame_format['url']
+            else:
+                video_source = resolve_media_url(youtube_url)
+            cap = open_remote_capture(video_source)
+    else:
+        # --no-part writes straight to video_path so frames can be read while it grows
+        print(f"Downloading video from: {youtube_url}")
+        # Download from the probe's info dict rather than having yt-dlp extract the page again
+        info_json = cached_probe_path(youtube_url, settings['PROBE_CACHE_DIR']) if video_info else None
+        cmd = [
+            'yt-dlp',
+            '-f', frame_format['format_id'] if frame_format is not None else FALLBACK_FORMAT,
+            '-o', video_path,
+            '--no-part',
+            '--no-playlist',
+            *(['--load-info-json', info_json] if info_json else [youtube_url])
+        ]
+        expected_bytes = estimated_size(frame_format, probed_duration) if frame_format is not None else None
+        download = BackgroundDownload(cmd, video_path, expected_bytes).start()
+        video_source = video_path
+
+    try:
+        # STREAM_EXTRACTION decodes in this process while the download runs; otherwise long videos wait
+        # for the whole file and decode with EXTRACTION_WORKERS processes. Streaming needs the timeline
+        # up front: take it from the probe
+        probed_fps = (frame_format or {}).get('fps')
+        streaming = (settings['STREAM_EXTRACTION'] and download is not None and expected_bytes and probed_fps
+                     and probed_duration)
+        if streaming:
+            fps = float(probed_fps)
+            total_frames = int(probed_duration * fps)
+        else:
+            if download is not None:
+                if not download.wait():
+                    raise RuntimeError(f"Failed to download video: {download.stderr}")
+                _finish_download(download, frame_format, formats, probed_duration, timer)
+                cap = cv2.VideoCapture(video_path)
+            if not cap.isOpened():
+                raise RuntimeError(f"Error: Could not open video at {video_source}")
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        duration_seconds = total_frames / fps
+        duration_minutes = duration_seconds / 60
+
+        # Auto-calculate optimal interval if not provided
+        fixed_interval = interval_seconds is not None
+        if interval_seconds is None:
+            interval_seconds, max_screenshots = interval_fn(duration_minutes)
+        else:
+            # Use provided interval but still calculate max screenshots
+            _, max_screenshots = interval_fn(duration_minutes)
+
+        # Check for forced settings from config
+        if settings['FORCE_INTERVAL_SECONDS'] is not None:
+            interval_seconds = settings['FORCE_INTERVAL_SECONDS']
+            fixed_interval = True
+            print(f"Using forced interval: {interval_seconds}s")
+        if settings['FORCE_MAX_SCREENSHOTS'] is not None:
+            max_screenshots = settings['FORCE_MAX_SCREENSHOTS']
+            print(f"Using forced max screenshots: {max_screenshots}")
+
+        print(f"Video info: {duration_minutes:.1f} minutes ({duration_seconds:.0f}s), {fps:.1f} fps")
+        print(f"Using {interval_seconds}s intervals, max {max_screenshots} screenshots")
+
+        # Chaptered videos: split the budget across chapters so none is left without screenshots
+        chapters = video_chapters(video_info, duration_seconds) if settings['CHAPTER_AWARE_SAMPLING'] else []
+        if chapters:
+            minimum = settings['MIN_SCREENSHOTS_PER_CHAPTER']
+            allocations = allocate_screenshots(chapters, max_screenshots, minimum)
+            print(describe_schedule(chapters, allocations))
+
+        # Long videos: split the timeline across processes, each decoding with its own capture
+        workers = 1 if streaming else worker_count(settings['EXTRACTION_WORKERS'], duration_seconds)
+        if streaming:
+            print("Extracting frames while the download is still running")
+            read_frames = lambda indices: download.sample_frames(indices, total_frames)
+            probe = lambda indices: thumbnails_from_frames(read_frames(indices))
+        elif workers > 1:
+            print(f"Extracting with {workers} worker processes")
+            read_frames = lambda indices: sample_frames_parallel(video_source, indices, workers)
+            probe = lambda indices: thumbnails_parallel(video_source, indices, workers)
+        else:
+            # Single forward decode pass: grab() through short gaps, seek over long ones
+            read_frames = lambda indices: sample_frames(cap, indices)
+            probe = lambda indices: thumbnails_at(cap, indices)
+
+        with timer.stage('frames'):
+            # Scene probing decodes the whole video, which would defeat remote seeking
+            adaptive = settings['ADAPTIVE_DENSITY'] and not fixed_interval and not remote
+            if adaptive and chapters:
+                frame_indices = detect_chapter_keyframes(probe, fps, total_frames, chapters, allocations, minimum,
+                                                         min_score=settings['SCENE_CHANGE_THRESHOLD'])
+            elif adaptive:
+                # One screenshot per slide/scene change instead of one per interval
+                frame_indices = detect_scene_keyframes(probe, fps, total_frames, settings['MIN_SCREENSHOTS'],
+                                                       max_screenshots, min_score=settings['SCENE_CHANGE_THRESHOLD'])
+            elif chapters:
+                frame_indices = plan_chapter_frame_indices(chapters, allocations, fps, total_frames,
+                                                           interval_seconds, minimum)
+            else:
+                frame_indices = plan_frame_indices(total_frames, fps, interval_seconds, max_screenshots)
+
+            # Blank, dark and blurred samples move to the nearest clean frame before anything is encoded
+            quality = None
+            frames = read_frames(frame_indices)
+            if settings['FILTER_BAD_FRAMES']:
+                quality = FrameQualityFilter(fps, total_frames, settings['MIN_FRAME_CONTRAST'],
+                                             settings['MIN_FRAME_BRIGHTNESS'], settings['MIN_FRAME_SHARPNESS'],
+                                             settings['FRAME_SEARCH_SECONDS'])
+                frames = quality.filter(read_frames, frame_indices)
+            screenshots = write_screenshots(frames, fps, settings, workspace)
+            if quality is not None:
+                print(quality.summary())
+
+        print(f"Extracted {len(screenshots)} screenshots from {duration_seconds/60:.1f} minute video")
+        if streaming:
+            if not download.wait():
+                raise RuntimeError(f"Failed to download video: {download.stderr}")
+            _finish_download(download, frame_format, formats, probed_duration, timer)
+        return screenshots, duration_seconds, chapters, quality and quality.stats()
+    finally:
+        if cap is not None:
+            cap.release()
+        if download is not None:
+            download.wait()
+            if os.path.exists(video_path):
+                os.remove(video_path)
+
+
+def _finish_download(download, frame_format, formats, duration, timer):
+    timer.record('download', download.elapsed)
+    print("Download complete.")
+    print(download_report(frame_format, formats, download.bytes_written, download.elapsed, duration))
+
+
+def write_screenshots(frames, fps, settings, workspace):
+    """
+    Encode and save each (frame_index, frame), merging near-identical frames into one screenshot.
+    Returns manifest entries: path, times/seconds of every occurrence, saved size and hashes.
+    """
+    encoder = FrameEncoder(settings['FRAME_LONG_EDGE'], settings['FRAME_FORMAT'], settings['FRAME_QUALITY'])
+    # Cropping first keeps webcams and borders out of both the dedup hash and the vision call
+    cropper = SlideCropper() if settings['SLIDE_CROP'] else None
+    # Near-identical frames collapse into one screenshot that carries all their timestamps
+    dedup_index = PerceptualHashIndex(settings['DEDUP_MAX_DISTANCE']) if settings['DEDUP_SCREENSHOTS'] else None
+    screenshots = []
+    duplicates = 0
+
+    for frame_index, frame in frames:
+        time_in_seconds = frame_index / fps
+        time_str = screenshot_time(time_in_seconds)
+        screenshot_path = workspace.screenshot_path(time_in_seconds, encoder.extension)
+        if cropper is not None:
+            frame = cropper.crop(frame)
+        frame_hash = dhash(frame)
+        screenshot = {'path': screenshot_path, 'times': [time_str], 'seconds': [round(time_in_seconds, 2)],
+                      'dhash': f"{frame_hash:016x}"}
+
+        if dedup_index is not None:
+            screenshot, is_new = dedup_index.match_or_add(frame_hash, screenshot)
+            if not is_new:
+                screenshot['times'].append(time_str)
+                screenshot['seconds'].append(round(time_in_seconds, 2))
+                duplicates += 1
+                print(f"Skipped {time_str}: same image as {screenshot['times'][0]}")
+                continue
+
+        frame = encoder.resize(frame)
+        data = encoder.save(frame, screenshot_path)
+        screenshot.update(width=frame.shape[1], height=frame.shape[0], sha256=hashlib.sha256(data).hexdigest())
+        screenshots.append(screenshot)
+        print(f"Screenshot {len(screenshots)}: {time_str} ({time_in_seconds/60:.1f} min)")
+
+    if duplicates:
+        print(f"{duplicates} duplicate frames merged")
+    if cropper is not None:
+        print(cropper.summary())
+    # Frames moved by the quality filter arrive after the rest, so put occurrences and screenshots back in time order
+    for screenshot in screenshots:
+        occurrences = sorted(zip(screenshot['seconds'], screenshot['times']))
+        screenshot['seconds'] = [seconds for seconds, _ in occurrences]
+        screenshot['times'] = [time_str for _, time_str in occurrences]
+    screenshots.sort(key=lambda screenshot: screenshot['seconds'][0])
+    return screenshots
+
+
+def run_extraction(youtube_url, interval_seconds, interval_fn, settings=None, workspace=None):
+    """
+    Everything extract_video_data does: screenshots, transcript and the JSON manifest
+    (see extraction_manifest.py) that later stages read.
+    interval_fn(duration_minutes) returns (interval_seconds, max_screenshots).
+    Files go to workspace, by default the active job's.
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    timer = StageTimer()
+    workspace = (workspace or current_workspace(youtube_url)).create()
+    print(f"Job workspace: {workspace.path}")
+    forget_all()
+
+    # Warm rerun: restore screenshots and transcript without yt-dlp or OpenCV
+    video_id = extract_video_id(youtube_url) or hashlib.sha256(youtube_url.encode("utf-8")).hexdigest()[:16]
+    artifact_cache = None
+    if settings['ENABLE_ARTIFACT_CACHE']:
+        artifact_cache = ArtifactCache(settings['ARTIFACT_CACHE_DIR'], settings['ARTIFACT_CACHE_MAX_BYTES'])
+    cache_params = {name: value for name, value in settings.items() if name not in NON_SAMPLING_SETTINGS}
+    artifact_key = cache_key(video_id, {'interval_seconds': interval_seconds, 'manifest': MANIFEST_VERSION,
+                                        **cache_params})
+
+    # Rerun of this job: the extraction already finished in this workspace
+    checkpoint = StageCheckpoint(workspace)
+    checkpointed_output = checkpoint.get('extract', artifact_key)
+    if checkpointed_output is not None:
+        print(f"Resuming job: extraction already done in {workspace.path}")
+        return checkpointed_output
+
+    if artifact_cache is not None:
+        with timer.stage('cache'):
+            cached_output = artifact_cache.restore(artifact_key, workspace.path)
+        if cached_output is not None:
+            print(f"Using cached artifacts for {video_id} ({artifact_key})")
+            print(timer.summary())
+            save_manifest(workspace, json.loads(cached_output))
+            checkpoint.put('extract', cached_output, key=artifact_key)
+            return cached_output
+
+    # One metadata probe drives format selection: smallest legible video-only stream, no audio
+    with timer.stage('probe'):
+        try:
+            video_info = probe_video(youtube_url, settings['PROBE_CACHE_DIR'])
+        except Exception as e:
+            print(f"Warning: {e}; falling back to default format")
+            video_info = {}
+
+    # The transcript only needs the video ID and the probe: fetch it while the video downloads
+    with ThreadPoolExecutor(max_workers=1) as background:
+        transcript = background.submit(timer.timed, 'transcript', fetch_transcript, youtube_url, workspace,
+                                       video_info, settings)
+        try:
+            screenshots, duration_seconds, chapters, frame_quality = extract_screenshots(
+                youtube_url, video_info, interval_seconds, interval_fn, settings, workspace, timer)
+        except RuntimeError as e:
+            return dumps({'version': MANIFEST_VERSION, 'error': str(e), 'screenshots': []})
+        transcript_files, warnings = transcript.result()
+
+    print(timer.summary())
+    if not screenshots:
+        return dumps({'version': MANIFEST_VERSION, 'error': "No screenshots were extracted from the video.",
+                      'screenshots': [], 'warnings': warnings})
+
+    manifest = build_manifest(youtube_url, video_id, duration_seconds, screenshots, transcript_files, warnings,
+                              timer.timings, chapters, frame_quality)
+    output = save_manifest(workspace, manifest)
+    artifact_paths = [screenshot['path'] for screenshot in screenshots]
+    if transcript_files is not None:
+        artifact_paths += [transcript_files['text'], transcript_files['structured']]
+    checkpoint.put('extract', output, artifact_paths, key=artifact_key)
+    if artifact_cache is not None and transcript_files is None:
+        # A transient transcript failure must not be replayed on every warm rerun
+        print("Not caching artifacts: the transcript could not be fetched")
+    elif artifact_cache is not None:
+        artifact_cache.put(artifact_key, artifact_paths, output, workspace.path,
+                           metadata={'youtube_url': youtube_url, 'duration_seconds': duration_seconds,
+                                     'stage_timings': timer.timings})
+    return output
@@ -0,0 +1,83 @@
+"""
+Resolution-aware format negotiation for the frame path.
+
+Screenshots only need the picture, and slide text is legible well below 4K.
+From the probed format list, pick the smallest video-only stream (no audio
+to download) that still meets the minimum height, preferring codecs the
+OpenCV FFmpeg build decodes reliably.
+"""
+
+MIN_FRAME_HEIGHT = 720  # Smallest height that keeps slide text legible
+FALLBACK_FORMAT = 'best[ext=mp4]/best'
+
+# Lower rank is preferred at equal height; AV1 decoding is missing from many OpenCV builds
+CODEC_RANK = {'avc1': 0, 'h264': 0, 'vp9': 0, 'vp09': 0, 'av01': 1}
+
+
+def estimated_size(fmt, duration_seconds=None):
+    """Best available size estimate in bytes (exact, approximate, or bitrate x duration)"""
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if size:
+        return size
+    if fmt.get('tbr') and duration_seconds:
+        return int(fmt['tbr'] * 1000 / 8 * duration_seconds)
+    return None
+
+
+def _codec_rank(fmt):
+    codec = (fmt.get('vcodec') or '').split('.')[0]
+    return CODEC_RANK.get(codec, len(CODEC_RANK))
+
+
+def _is_video_only(fmt):
+    return (fmt.get('vcodec') not in (None, 'none') and fmt.get('acodec') == 'none'
+            and fmt.get('height') and fmt.get('ext') != 'mhtml')
+
+
+def select_frame_format(formats, duration_seconds=None, min_height=MIN_FRAME_HEIGHT):
+    """
+    Smallest video-only format at or above min_height (the tallest one below it
+    if none qualifies), or None when the list has no usable video-only stream.
+    """
+    video_only = [f for f in formats if _is_video_only(f)]
+    if not video_only:
+        return None
+
+    tall_enough = [f for f in video_only if f['height'] >= min_height]
+    if tall_enough:
+        def cost(f):
+            size = estimated_size(f, duration_seconds)
+            return (f['height'], _codec_rank(f), size if size is not None else float('inf'))
+        return min(tall_enough, key=cost)
+
+    tallest = max(f['height'] for f in video_only)
+    return min((f for f in video_only if f['height'] == tallest),
+               key=lambda f: (_codec_rank(f), estimated_size(f, duration_seconds) or float('inf')))
+
+
+def baseline_size(formats, duration_seconds=None):
+    """Estimated size of what the old 'best[ext=mp4]/best' selector would have downloaded"""
+    combined = [f for f in formats if f.get('vcodec') not in (None, 'none') and f.get('acodec') not in (None, 'none')]
+    mp4 = [f for f in combined if f.get('ext') == 'mp4'] or combined
+    if not mp4:
+        return None
+    best = max(mp4, key=lambda f: (f.get('height') or 0, f.get('tbr') or 0))
+    return estimated_size(best, duration_seconds)
+
+
+def describe_format(fmt):
+    return f"{fmt.get('format_id')} ({fmt.get('height')}p {(fmt.get('vcodec') or '?').split('.')[0]}, video only)"
+
+
+def download_report(fmt, formats, downloaded_bytes, elapsed_seconds, duration_seconds=None):
+    """One-line summary of bytes downloaded and time saved against the old 'best' download"""
+    report = f"Downloaded {downloaded_bytes / 1024 ** 2:.1f} MB in {elapsed_seconds:.1f}s"
+    if fmt is not None:
+        report += f" using format {describe_format(fmt)}"
+    baseline = baseline_size(formats, duration_seconds)
+    if baseline and downloaded_bytes and elapsed_seconds > 0:
+        saved_bytes = baseline - downloaded_bytes
+        saved_seconds = saved_bytes / (downloaded_bytes / elapsed_seconds)
+        report += (f"; 'best' would have been ~{baseline / 1024 ** 2:.1f} MB "
+                   f"(~{saved_bytes / 1024 ** 2:.1f} MB and ~{saved_seconds:.1f}s saved)")
+    return report
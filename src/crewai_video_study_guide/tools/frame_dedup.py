@@ -0,0 +1,63 @@
+"""
+Perceptual-hash deduplication for extracted screenshots.
+
+Near-identical frames (a slide that stays up for minutes, a talking head,
+a slide the speaker returns to later) hash to within a few bits of each
+other. Collapsing them before vision analysis means one VisionTool request
+per distinct image instead of one per sampled timestamp.
+"""
+import cv2
+import numpy as np
+
+HASH_SIZE = 8             # 8x8 -> 64-bit hashes
+DEFAULT_MAX_DISTANCE = 5  # Hamming distance (bits) at or below which two frames count as the same image
+
+
+def dhash(image, hash_size=HASH_SIZE):
+    """Difference hash: sign of horizontal gradients on a (hash_size+1) x hash_size thumbnail"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return _pack_bits(bits)
+
+
+def _pack_bits(bits):
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def hamming_distances(hash_value, hashes):
+    """Bit distance from hash_value to every hash in a uint64 array"""
+    xor = np.bitwise_xor(hashes, np.uint64(hash_value))
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+class PerceptualHashIndex:
+    """In-memory hash index with vectorized Hamming-distance lookup"""
+
+    def __init__(self, max_distance=DEFAULT_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.entries = []
+        self._hashes = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def nearest(self, hash_value):
+        """(entry, distance) of the closest indexed hash, or (None, None) when empty"""
+        if not self.entries:
+            return None, None
+        distances = hamming_distances(hash_value, self._hashes)
+        position = int(np.argmin(distances))
+        return self.entries[position], int(distances[position])
+
+    def add(self, hash_value, entry):
+        self._hashes = np.append(self._hashes, np.uint64(hash_value))
+        self.entries.append(entry)
+
+    def match_or_add(self, hash_value, entry):
+        """Return (existing_entry, False) for a near-duplicate, otherwise index entry and return (entry, True)"""
+        existing, distance = self.nearest(hash_value)
+        if existing is not None and distance <= self.max_distance:
+            return existing, False
+        self.add(hash_value, entry)
+        return entry, True
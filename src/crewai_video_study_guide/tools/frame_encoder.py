@@ -0,0 +1,84 @@
+"""
+Screenshot encoding: downscale to a long-edge limit and encode in memory.
+
+Frames are encoded once with cv2.imencode. The bytes are written to the
+screenshot path for the agents, and kept in a process-local registry so the
+vision stage in the same run can use them without reading the file back.
+"""
+import os
+import threading
+
+import cv2
+
+FRAME_LONG_EDGE = 1280  # Longest side in pixels; slide text stays legible, image tokens drop
+FRAME_FORMAT = "jpeg"   # "jpeg", "webp" or "png"
+FRAME_QUALITY = 80      # 0-100 for jpeg/webp
+
+# format -> (file extension, quality flag, mime type)
+FORMATS = {
+    'jpeg': ('.jpg', cv2.IMWRITE_JPEG_QUALITY, 'image/jpeg'),
+    'webp': ('.webp', cv2.IMWRITE_WEBP_QUALITY, 'image/webp'),
+    'png': ('.png', None, 'image/png'),
+}
+
+_encoded = {}
+_encoded_lock = threading.Lock()
+
+
+class FrameEncoder:
+    def __init__(self, long_edge=FRAME_LONG_EDGE, fmt=FRAME_FORMAT, quality=FRAME_QUALITY):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported frame format {fmt!r}; use one of {sorted(FORMATS)}")
+        self.long_edge = long_edge
+        self.extension, self._quality_flag, self.mime = FORMATS[fmt]
+        self.quality = quality
+
+    def resize(self, frame):
+        height, width = frame.shape[:2]
+        scale = self.long_edge / max(height, width) if self.long_edge else 1.0
+        if scale >= 1.0:
+            return frame
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def encode(self, frame):
+        params = [self._quality_flag, int(self.quality)] if self._quality_flag is not None else []
+        ok, buffer = cv2.imencode(self.extension, self.resize(frame), params)
+        if not ok:
+            raise RuntimeError(f"Could not encode frame as {self.extension}")
+        return buffer.tobytes()
+
+    def save(self, frame, path):
+        """Encode, write to path and register the bytes for in-process readers; returns the bytes"""
+        data = self.encode(frame)
+        with open(path, 'wb') as f:
+            f.write(data)
+        remember(path, data, self.mime)
+        return data
+
+
+def remember(path, data, mime):
+    stat = os.stat(path)
+    with _encoded_lock:
+        _encoded[os.path.abspath(path)] = (data, mime, stat.st_mtime_ns, stat.st_size)
+
+
+def recall(path):
+    """(bytes, mime) encoded for path in this process, or None if unknown or the file changed since"""
+    with _encoded_lock:
+        entry = _encoded.get(os.path.abspath(path))
+    if entry is None:
+        return None
+    data, mime, mtime_ns, size = entry
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+        return None
+    return data, mime
+
+
+def forget_all():
+    with _encoded_lock:
+        _encoded.clear()
@@ -0,0 +1,144 @@
+"""
+Frame-quality filter (FILTER_BAD_FRAMES).
+
+Fixed-interval and scene-change sampling regularly land on fades to black,
+blank frames, defocus and motion blur, and the washed-out middle of
+cross-dissolves. Each of those would still cost a vision call and come back
+as useless notes.
+
+Every sampled frame is scored on a small grayscale copy - mean (brightness),
+standard deviation (contrast) and variance of the Laplacian (sharpness) - with
+vectorized NumPy over a whole batch at once. A rejected sample is moved to the
+nearest frame within FRAME_SEARCH_SECONDS that passes, or dropped when there is
+none; the replacement is kept from the search, not decoded a second time.
+Rejections are counted per reason and reported, with the median scores of
+the frames that passed, so the thresholds can be tuned per kind of video.
+"""
+from collections import Counter
+from itertools import islice
+
+import cv2
+import numpy as np
+
+SCORE_SIZE = (320, 180)      # (width, height) - large enough that text edges survive for the blur check
+MIN_FRAME_CONTRAST = 8.0     # Grey-level std below this is a blank frame (solid colour, mid-fade, flash)
+MIN_FRAME_BRIGHTNESS = 16.0  # Mean grey level below this is a fade to black
+MIN_FRAME_SHARPNESS = 15.0   # Laplacian variance below this is a blurred frame (sharp slides score in the thousands)
+FRAME_SEARCH_SECONDS = 2.0   # How far either side of a rejected sample to look for a clean frame
+SEARCH_STEP_SECONDS = 0.25
+SCORE_BATCH = 16             # Candidate frames decoded and scored together
+
+
+def score_thumbnail(frame):
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    return cv2.resize(gray, SCORE_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def quality_scores(thumbnails):
+    """(brightness, contrast, sharpness) arrays for an (n, height, width) stack of grayscale thumbnails"""
+    x = np.asarray(thumbnails, dtype=np.float32)
+    laplacian = (x[:, :-2, 1:-1] + x[:, 2:, 1:-1] + x[:, 1:-1, :-2] + x[:, 1:-1, 2:]
+                 - 4 * x[:, 1:-1, 1:-1])
+    return x.mean(axis=(1, 2)), x.std(axis=(1, 2)), laplacian.var(axis=(1, 2))
+
+
+class FrameQualityFilter:
+    """Drops low-information frames from a (frame_index, frame) stream, moving each to a clean neighbour"""
+
+    def __init__(self, fps, total_frames, min_contrast=MIN_FRAME_CONTRAST, min_brightness=MIN_FRAME_BRIGHTNESS,
+                 min_sharpness=MIN_FRAME_SHARPNESS, search_seconds=FRAME_SEARCH_SECONDS):
+        self.fps = fps
+        self.total_frames = total_frames
+        self.min_contrast = min_contrast
+        self.min_brightness = min_brightness
+        self.min_sharpness = min_sharpness
+        self.search_seconds = search_seconds
+        self.sampled = 0
+        self.rejected = Counter()
+        self.moved = 0
+        self.dropped = 0
+        self._passed = []  # (brightness, contrast, sharpness) of every sample that passed, for the report
+
+    def reasons(self, thumbnails):
+        """
+        ([reason or None per thumbnail], (n, 3) scores), reasons being 'blank',
+        'dark' or 'blurred' and None where the thumbnail passes.
+        """
+        brightness, contrast, sharpness = quality_scores(thumbnails)
+        # A black frame also has no contrast: test brightness first so fades count as dark
+        reasons = np.select([brightness < self.min_brightness, contrast < self.min_contrast,
+                             sharpness < self.min_sharpness], ['dark', 'blank', 'blurred'], '')
+        return [reason or None for reason in reasons.tolist()], np.stack([brightness, contrast, sharpness], axis=1)
+
+    def _candidates(self, targets, sampled):
+        """frame_index -> [(distance rank, target)] for the frames around each rejected target"""
+        step = max(1, int(round(self.fps * SEARCH_STEP_SECONDS)))
+        reach = max(1, int(self.fps * self.search_seconds) // step)
+        offsets = [sign * k * step for k in range(1, reach + 1) for sign in (1, -1)]  # Later frame wins ties
+        candidates = {}
+        for target in targets:
+            for rank, offset in enumerate(offsets):
+                frame_index = target + offset
+                if 0 <= frame_index < self.total_frames and frame_index not in sampled:
+                    candidates.setdefault(frame_index, []).append((rank, target))
+        return candidates
+
+    def filter(self, read_frames, frame_indices):
+        """
+        Yield (frame_index, frame) for the samples that pass, then the replacements
+        for the ones that didn't. read_frames(indices) is the extractor's frame reader.
+        """
+        rejected_targets = []
+        for frame_index, frame in read_frames(frame_indices):
+            self.sampled += 1
+            (reason,), scores = self.reasons(score_thumbnail(frame)[np.newaxis])
+            if reason is None:
+                self._passed.append(scores[0])
+                yield frame_index, frame
+            else:
+                self.rejected[reason] += 1
+                rejected_targets.append(frame_index)
+        if not rejected_targets:
+            return
+
+        # Score the frames in the search windows in batches, keeping a full frame only while it is a winner
+        candidates = self._candidates(rejected_targets, set(frame_indices))
+        best = {}     # target -> (rank, frame_index)
+        winners = {}  # frame_index -> frame
+        frames = iter(read_frames(sorted(candidates)))
+        while batch := list(islice(frames, SCORE_BATCH)):
+            reasons, _ = self.reasons(np.stack([score_thumbnail(frame) for _, frame in batch]))
+            for (frame_index, frame), reason in zip(batch, reasons):
+                if reason is not None:
+                    continue
+                for rank, target in candidates[frame_index]:
+                    if target not in best or rank < best[target][0]:
+                        best[target] = (rank, frame_index)
+                        winners[frame_index] = frame
+            chosen = {frame_index for _, frame_index in best.values()}
+            winners = {frame_index: frame for frame_index, frame in winners.items() if frame_index in chosen}
+
+        # Two rejected samples can share a replacement: it is kept once, the other counts as dropped
+        self.moved = len(winners)
+        self.dropped = len(rejected_targets) - len(winners)
+        for frame_index in sorted(winners):
+            yield frame_index, winners[frame_index]
+
+    def stats(self):
+        """Counts for the extraction manifest"""
+        return {'sampled': self.sampled, 'rejected': dict(self.rejected), 'moved': self.moved,
+                'dropped': self.dropped}
+
+    def summary(self):
+        rejected = sum(self.rejected.values())
+        line = f"Frame quality: {rejected} of {self.sampled} samples rejected"
+        if rejected:
+            reasons = ", ".join(f"{reason} {count}" for reason, count in self.rejected.most_common())
+            line += (f" ({reasons}); {self.moved} moved to a clean frame within {self.search_seconds:g}s, "
+                     f"{self.dropped} dropped")
+        if self._passed:
+            brightness, contrast, sharpness = np.median(self._passed, axis=0)
+            line += (f" | passed medians: brightness {brightness:.0f}, contrast {contrast:.0f}, "
+                     f"sharpness {sharpness:.0f} (thresholds {self.min_brightness:g}/{self.min_contrast:g}/"
+                     f"{self.min_sharpness:g})")
+        return line
@@ -0,0 +1,71 @@
+"""
+Sequential-decode frame sampler.
+
+Replaces the "seek before every screenshot" loop with a single forward pass:
+frames between targets are skipped with grab() (demux + decode, no colour
+conversion) and only target frames are retrieve()d. Long gaps are still
+crossed with a seek, because a seek only re-decodes from the previous
+keyframe while a scan has to decode the whole gap.
+
+Which one is cheaper depends on the keyframe spacing of the file, so the
+sampler probes one seek, measures both costs as it goes and picks per gap
+from the observed averages.
+"""
+import time
+
+import cv2
+
+# Weight of the newest measurement in the running cost averages
+COST_SMOOTHING = 0.3
+
+
+def plan_frame_indices(total_frames, fps, interval_seconds, max_screenshots):
+    """Frame indices for fixed-interval sampling, capped at max_screenshots"""
+    frame_interval = max(1, int(fps * interval_seconds))
+    return list(range(0, total_frames, frame_interval))[:max_screenshots]
+
+
+def _smooth(previous, sample):
+    if previous is None:
+        return sample
+    return previous + COST_SMOOTHING * (sample - previous)
+
+
+def sample_frames(cap, frame_indices):
+    """
+    Yield (frame_index, frame) for each requested frame index in one forward pass.
+    Picks seek or scan per gap from the measured per-grab and per-seek cost.
+    Stops early if the stream ends before a target frame.
+    """
+    position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    grab_cost = None
+    seek_cost = None
+
+    for target in sorted(set(frame_indices)):
+        gap = target - position
+        if gap < 0:
+            should_seek = True
+        elif seek_cost is None or grab_cost is None:
+            should_seek = gap > 1  # probe one seek so both costs get measured
+        else:
+            should_seek = gap * grab_cost > seek_cost
+
+        started = time.perf_counter()
+        if should_seek:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+            seek_cost = _smooth(seek_cost, time.perf_counter() - started)
+        elif gap > 0:
+            for _ in range(gap):
+                if not cap.grab():
+                    return
+            grab_cost = _smooth(grab_cost, (time.perf_counter() - started) / gap)
+
+        started = time.perf_counter()
+        if not cap.grab():
+            return
+        grab_cost = _smooth(grab_cost, time.perf_counter() - started)
+        ret, frame = cap.retrieve()
+        if not ret:
+            return
+        position = target + 1
+        yield target, frame
@@ -0,0 +1,80 @@
+"""
+Minimal OpenAI-compatible chat client for direct (non-agent) model calls.
+
+OpenAI and Gemini both serve the /chat/completions API, so one stdlib client
+covers VISION_PROVIDER/TEXT_PROVIDER and can be pointed at a local stub
+server through base_url (or the LLM_BASE_URL environment variable).
+"""
+import base64
+import http.client
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+# provider -> (base URL, API key environment variable, default model)
+PROVIDERS = {
+    'openai': ('https://api.openai.com/v1', 'OPENAI_API_KEY', 'gpt-4o-mini'),
+    'gemini': ('https://generativelanguage.googleapis.com/v1beta/openai', 'GEMINI_API_KEY', 'gemini-2.0-flash'),
+}
+DEFAULT_PROVIDER = 'openai'
+REQUEST_TIMEOUT = 120
+MAX_ATTEMPTS = 4
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class LLMError(RuntimeError):
+    """A chat completion request that failed after all retries"""
+
+
+def image_part(data, mime='image/jpeg'):
+    """Chat message content part for an image given as raw bytes"""
+    encoded = base64.b64encode(data).decode('ascii')
+    return {'type': 'image_url', 'image_url': {'url': f"data:{mime};base64,{encoded}"}}
+
+
+class ChatClient:
+    """POSTs chat completions; retries rate limits, server errors and malformed replies with backoff"""
+
+    def __init__(self, provider=None, model=None, base_url=None, api_key=None, timeout=REQUEST_TIMEOUT):
+        provider = provider or DEFAULT_PROVIDER
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown provider {provider!r}; expected one of {', '.join(PROVIDERS)}")
+        default_url, key_var, default_model = PROVIDERS[provider]
+        self.provider = provider
+        self.model = model or default_model
+        self.base_url = (base_url or os.getenv('LLM_BASE_URL') or default_url).rstrip('/')
+        self.api_key = api_key or os.getenv(key_var, '')
+        self.timeout = timeout
+
+    def complete(self, messages, max_tokens=None):
+        """Returns (reply text, usage dict) for a list of chat messages"""
+        body = {'model': self.model, 'messages': messages}
+        if max_tokens:
+            body['max_tokens'] = max_tokens
+        request = urllib.request.Request(
+            f"{self.base_url}/chat/completions",
+            data=json.dumps(body).encode('utf-8'),
+            headers={'Content-Type': 'application/json', 'Authorization': f"Bearer {self.api_key}"},
+        )
+
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    reply = json.loads(response.read())
+                return reply['choices'][0]['message']['content'] or '', reply.get('usage') or {}
+            except urllib.error.HTTPError as e:
+                if e.code not in RETRY_STATUSES or attempt == MAX_ATTEMPTS - 1:
+                    raise LLMError(f"{self.provider} request failed: HTTP {e.code} {e.read()[:200]!r}")
+                retry_after = e.headers.get('Retry-After') or ''
+                delay = int(retry_after) if retry_after.isdigit() else 2 ** attempt
+            except (OSError, http.client.HTTPException) as e:  # URLError, timeouts, dropped connections
+                if attempt == MAX_ATTEMPTS - 1:
+                    raise LLMError(f"{self.provider} request failed: {e}")
+                delay = 2 ** attempt
+            except (ValueError, LookupError, TypeError, AttributeError) as e:  # not JSON, or no choices[0].message
+                if attempt == MAX_ATTEMPTS - 1:
+                    raise LLMError(f"{self.provider} returned a malformed reply: {e!r}")
+                delay = 2 ** attempt
+            time.sleep(delay)
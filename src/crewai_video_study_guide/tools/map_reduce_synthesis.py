@@ -0,0 +1,120 @@
+"""
+Hierarchical (map-reduce) study guide synthesis for long videos.
+
+The timeline is cut into windows (chapters when known, otherwise fixed
+lengths). Each window's screenshot analyses and transcript are turned into
+section notes by an independent model call, run concurrently under the
+request and rate limits. A final call sees only the section notes and
+writes the overview and takeaways. Latency follows the longest window plus
+one reduce, and no call's context grows with the length of the video.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .llm_client import LLMError
+from .transcript_index import format_timestamp
+from .vision_batch import MAX_CONCURRENT_REQUESTS, MAX_RPM, TokenBucket, time_seconds
+
+WINDOW_SECONDS = 15 * 60
+MAX_TRANSCRIPT_CHARS = 24000      # Per window; about 6k tokens of speech
+MAX_NOTES_CHARS_FOR_REDUCE = 2500  # Per section, when building the overview
+
+MAP_PROMPT = """You are writing one section of a study guide for an educational video.
+This section covers {start} to {end}{title}.
+
+Screenshot analyses from this part of the video:
+{analyses}
+
+Transcript of this part of the video:
+{transcript}
+
+Write the study notes for this section in Markdown: a '## ' heading with a descriptive title and the time range,
+then the key concepts, definitions, examples and any formulas or code shown, as organized bullet points.
+Include short transcript quotes where they add educational value. Do not write an introduction or conclusion
+for the whole video."""
+
+REDUCE_PROMPT = """Below are the section notes of a study guide for a {duration} educational video, in order.
+
+{sections}
+
+Write the opening and closing of the study guide in Markdown:
+1. A '# ' title for the whole video.
+2. '## Executive Summary': one paragraph on what the video teaches.
+3. '## Contents': one bullet per section heading above, in order.
+Then write a line containing only '---SECTIONS---', and after it:
+4. '## Key Takeaways': the most important points across all sections.
+5. '## Review Questions': 5-10 questions covering the whole video."""
+
+SECTIONS_MARKER = '---SECTIONS---'
+
+
+def plan_windows(duration, window_seconds=WINDOW_SECONDS, chapters=None):
+    """[(start, end, title)] covering [0, duration): chapters if given, otherwise fixed-length windows"""
+    if chapters:
+        windows = []
+        for chapter in sorted(chapters, key=lambda c: c['start_time']):
+            end = chapter.get('end_time') or duration
+            windows.append((float(chapter['start_time']), float(end), chapter.get('title')))
+        return windows
+    count = max(1, -(-int(duration) // window_seconds))
+    size = duration / count
+    return [(i * size, (i + 1) * size if i < count - 1 else duration, None) for i in range(count)]
+
+
+class MapReduceSynthesizer:
+    def __init__(self, client, max_concurrent=MAX_CONCURRENT_REQUESTS, max_rpm=MAX_RPM):
+        self.client = client
+        self.max_concurrent = max(1, max_concurrent)
+        self.limiter = TokenBucket(max_rpm, capacity=self.max_concurrent)
+        self.requests = 0
+        self.usage = {'prompt_tokens': 0, 'completion_tokens': 0}
+        self._lock = threading.Lock()
+
+    def _complete(self, prompt):
+        self.limiter.acquire()
+        text, usage = self.client.complete([{'role': 'user', 'content': prompt}])
+        with self._lock:
+            self.requests += 1
+            for name in self.usage:
+                self.usage[name] += usage.get(name) or 0
+        return text.strip()
+
+    def map_window(self, window, screenshots, transcript_index):
+        start, end, title = window
+        analyses = []
+        for screenshot in screenshots:
+            times = [t for t in screenshot['times'] if start <= time_seconds(t) < end]
+            if times:
+                analyses.append(f"[{', '.join(times)}] {screenshot['analysis']}")
+        transcript = transcript_index.text(start, end) if transcript_index is not None else ""
+        prompt = MAP_PROMPT.format(
+            start=format_timestamp(start), end=format_timestamp(end),
+            title=f' ("{title}")' if title else '',
+            analyses="\n\n".join(analyses) or "(no screenshots in this part)",
+            transcript=transcript[:MAX_TRANSCRIPT_CHARS] or "(no transcript available)",
+        )
+        try:
+            return self._complete(prompt)
+        except LLMError as e:
+            # One failed window shouldn't sink a multi-hour guide: keep the raw material instead
+            print(f"Warning: section {format_timestamp(start)}-{format_timestamp(end)} failed: {e}")
+            return (f"## {title or 'Section'} ({format_timestamp(start)}-{format_timestamp(end)})\n\n"
+                    + "\n".join(f"- {a}" for a in analyses))
+
+    def synthesize(self, screenshots, transcript_index, duration, window_seconds=WINDOW_SECONDS, chapters=None):
+        """The full study guide in Markdown"""
+        windows = [w for w in plan_windows(duration, window_seconds, chapters) if w[1] > w[0]]
+        print(f"Map-reduce synthesis: {len(windows)} sections, up to {self.max_concurrent} at a time")
+        with ThreadPoolExecutor(max_workers=self.max_concurrent) as pool:
+            sections = list(pool.map(lambda w: self.map_window(w, screenshots, transcript_index), windows))
+
+        overview = REDUCE_PROMPT.format(
+            duration=format_timestamp(duration),
+            sections="\n\n".join(section[:MAX_NOTES_CHARS_FOR_REDUCE] for section in sections),
+        )
+        try:
+            opening, _, closing = self._complete(overview).partition(SECTIONS_MARKER)
+        except LLMError as e:
+            print(f"Warning: overview failed: {e}")
+            opening, closing = "# Study Guide", ""
+        return "\n\n".join(part.strip() for part in [opening, *sections, closing] if part.strip())
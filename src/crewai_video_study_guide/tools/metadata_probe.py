@@ -0,0 +1,123 @@
+"""
+Single metadata probe per video.
+
+One in-process yt-dlp extract_info call returns everything later stages
+need - duration, the full format list (with direct URLs), chapters and
+caption tracks - so crew-settings selection, format selection, sampling and
+download don't each start their own yt-dlp. The info dict is kept in memory
+for the process and on disk by video ID, and the download hands the cached
+file to yt-dlp (--load-info-json) instead of extracting the page again.
+"""
+import hashlib
+import json
+import os
+import re
+import subprocess
+import time
+
+PROBE_CACHE_DIR = '.cache/probes'
+PROBE_MAX_AGE_SECONDS = 4 * 3600  # Direct stream URLs in the info dict expire after about six hours
+YDL_OPTIONS = {'quiet': True, 'no_warnings': True, 'noplaylist': True, 'skip_download': True}
+
+_probes = {}  # cache file path -> (probed at, info dict), shared by every stage in this process
+
+
+def extract_video_id(url):
+    """Extract video ID from various YouTube URL formats"""
+    patterns = [
+        r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/)([^&\n?#]+)',
+        r'youtube\.com/watch\?.*v=([^&\n?#]+)'
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+    return None
+
+
+def probe_cache_path(youtube_url, cache_dir=PROBE_CACHE_DIR):
+    video_id = extract_video_id(youtube_url) or hashlib.sha256(youtube_url.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{video_id}.info.json")
+
+
+def cached_probe_path(youtube_url, cache_dir=PROBE_CACHE_DIR, max_age_seconds=PROBE_MAX_AGE_SECONDS):
+    """The on-disk info dict for this video if it is fresh enough to download from, else None"""
+    if not cache_dir:
+        return None
+    path = probe_cache_path(youtube_url, cache_dir)
+    try:
+        fresh = time.time() - os.path.getmtime(path) < max_age_seconds
+    except OSError:
+        return None
+    return path if fresh else None
+
+
+def _extract_info(youtube_url):
+    """yt-dlp info dict from the Python API (the CLI when the package isn't importable)"""
+    try:
+        import yt_dlp
+    except ImportError:
+        cmd = ['yt-dlp', '-J', '--no-playlist', youtube_url]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Metadata probe failed: {result.stderr.strip()}")
+        return json.loads(result.stdout)
+
+    try:
+        with yt_dlp.YoutubeDL(YDL_OPTIONS) as ydl:
+            return ydl.sanitize_info(ydl.extract_info(youtube_url, download=False))
+    except yt_dlp.utils.YoutubeDLError as e:
+        raise RuntimeError(f"Metadata probe failed: {e}") from e
+
+
+def probe_video(youtube_url, cache_dir=PROBE_CACHE_DIR, max_age_seconds=PROBE_MAX_AGE_SECONDS):
+    """
+    yt-dlp info dict for a single video, without downloading it: probed once,
+    then served from memory or the disk cache (cache_dir=None disables it).
+    """
+    path = probe_cache_path(youtube_url, cache_dir or PROBE_CACHE_DIR)
+    probed = _probes.get(path)
+    if probed is not None and time.time() - probed[0] < max_age_seconds:
+        return probed[1]
+
+    cached_path = cached_probe_path(youtube_url, cache_dir, max_age_seconds)
+    if cached_path is not None:
+        try:
+            with open(cached_path, encoding='utf-8') as f:
+                info = json.load(f)
+            _probes[path] = (os.path.getmtime(cached_path), info)
+            return info
+        except (OSError, ValueError):
+            pass  # Unreadable cache entry: probe again and overwrite it
+
+    info = _extract_info(youtube_url)
+    _probes[path] = (time.time(), info)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(info, f)
+        os.replace(tmp_path, path)
+    return info
+
+
+def expand_playlist(url):
+    """
+    Video URLs behind a playlist/channel URL, from one flat yt-dlp listing
+    (no per-video requests); a single-video URL comes back as [url].
+    """
+    cmd = ['yt-dlp', '-J', '--flat-playlist', url]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Playlist listing failed: {result.stderr.strip()}")
+    info = json.loads(result.stdout)
+    if info.get('_type') != 'playlist':
+        return [url]
+    urls = []
+    for entry in info.get('entries') or []:
+        if entry.get('id') and entry.get('ie_key', 'Youtube') == 'Youtube':
+            urls.append(f"https://www.youtube.com/watch?v={entry['id']}")
+        elif entry.get('url'):
+            urls.append(entry['url'])
+    return urls
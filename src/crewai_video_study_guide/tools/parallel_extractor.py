@@ -0,0 +1,67 @@
+"""
+Multi-process segmented frame extraction.
+
+Decoding is CPU-bound and a single VideoCapture uses one core. For long
+recordings the timeline is split into contiguous segments; each worker
+process opens its own capture, walks its segment with the sequential
+sampler, and results are merged back in timestamp order.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from .frame_sampler import sample_frames
+from .remote_source import open_remote_capture
+
+# Segments shorter than this don't pay back a worker's startup and first seek
+MIN_SEGMENT_SECONDS = 120
+
+
+def worker_count(requested, duration_seconds):
+    """Workers to use for a video: requested (default CPU count), capped so segments stay worthwhile"""
+    if requested is None:
+        requested = os.cpu_count() or 1
+    return max(1, min(requested, int(duration_seconds // MIN_SEGMENT_SECONDS)))
+
+
+def open_capture(source):
+    """VideoCapture for a local path or a remote media URL"""
+    if source.startswith(('http://', 'https://')):
+        return open_remote_capture(source)
+    return cv2.VideoCapture(source)
+
+
+def split_segments(frame_indices, segments):
+    """Contiguous, roughly equal runs of the sorted frame indices"""
+    indices = sorted(set(frame_indices))
+    return [[int(i) for i in chunk] for chunk in np.array_split(indices, segments) if len(chunk)]
+
+
+def _init_worker():
+    # One decode thread per process; the pool already provides the parallelism
+    cv2.setNumThreads(1)
+
+
+def map_segments(segment_fn, source, frame_indices, workers):
+    """Run segment_fn(source, segment_indices) across a process pool; results come back in timeline order"""
+    segments = split_segments(frame_indices, workers)
+    if len(segments) <= 1:
+        return [segment_fn(source, segment) for segment in segments]
+    with ProcessPoolExecutor(max_workers=len(segments), initializer=_init_worker) as pool:
+        return list(pool.map(segment_fn, [source] * len(segments), segments))
+
+
+def _extract_segment(source, frame_indices):
+    cap = open_capture(source)
+    try:
+        return list(sample_frames(cap, frame_indices))
+    finally:
+        cap.release()
+
+
+def sample_frames_parallel(source, frame_indices, workers):
+    """Same (frame_index, frame) stream as sample_frames, decoded by `workers` processes"""
+    for segment in map_segments(_extract_segment, source, frame_indices, workers):
+        yield from segment
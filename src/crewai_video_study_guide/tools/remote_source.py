@@ -0,0 +1,33 @@
+"""
+Remote-seek frame source.
+
+Instead of downloading the whole video to keep ~30 frames, resolve the
+direct media URL once and open it with OpenCV's FFmpeg backend. Every seek
+becomes an HTTP Range request, so only the byte ranges around the chosen
+timestamps (plus the container index) are fetched.
+"""
+import subprocess
+
+import cv2
+
+# Progressive MP4 keeps the index in one place and is seekable with plain Range requests
+REMOTE_FORMAT = 'best[ext=mp4]/best'
+NETWORK_TIMEOUT_MS = 30000
+
+
+def resolve_media_url(youtube_url, format_selector=REMOTE_FORMAT):
+    """Direct media URL for the selected format, from a single yt-dlp call"""
+    cmd = ['yt-dlp', '-f', format_selector, '-g', '--no-playlist', youtube_url]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Could not resolve media URL: {result.stderr.strip()}")
+    # Merged formats print one URL per stream; the video stream comes first
+    return result.stdout.strip().splitlines()[0]
+
+
+def open_remote_capture(media_url):
+    """VideoCapture over HTTP(S); seeks are served with Range requests"""
+    return cv2.VideoCapture(media_url, cv2.CAP_FFMPEG, [
+        cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, NETWORK_TIMEOUT_MS,
+        cv2.CAP_PROP_READ_TIMEOUT_MSEC, NETWORK_TIMEOUT_MS,
+    ])
@@ -0,0 +1,133 @@
+"""
+Content-adaptive keyframe selection (ADAPTIVE_DENSITY).
+
+Probes the video at a fixed rate on small grayscale thumbnails, scores the
+change between consecutive probes with vectorized NumPy, and keeps a frame
+only where the slide or scene actually changes. Static slides therefore cost
+one screenshot instead of one per interval.
+"""
+import cv2
+import numpy as np
+
+from .frame_sampler import sample_frames
+from .parallel_extractor import map_segments, open_capture
+
+THUMBNAIL_SIZE = (64, 36)  # (width, height) - enough to see a slide change, cheap to diff
+PROBE_SECONDS = 1.0        # Probe rate for scene detection
+MAX_PROBES = 4000          # Caps probing work on multi-hour videos
+MIN_CHANGE_SCORE = 2.0     # Mean absolute grey-level difference (0-255) that counts as a change; slides
+                           # sharing a template score 4-9 against each other, a static slide well under 1
+NOISE_MADS = 4.0           # Changes must also stand this many MADs above the video's typical motion
+
+
+def probe_frame_indices(fps, total_frames, probe_seconds=PROBE_SECONDS, max_probes=MAX_PROBES):
+    """Evenly spaced probe frames, at most max_probes of them"""
+    step = max(1, int(fps * probe_seconds), int(np.ceil(total_frames / max_probes)))
+    return range(0, total_frames, step)
+
+
+def thumbnail(frame):
+    """Small grayscale copy used for change scoring"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def thumbnails_from_frames(frames):
+    """Turn a (frame_index, frame) stream into (frame_indices, thumbnails) arrays"""
+    indices = []
+    thumbnails = []
+    for frame_index, frame in frames:
+        thumbnails.append(thumbnail(frame))
+        indices.append(frame_index)
+
+    if not thumbnails:
+        return np.empty(0, dtype=np.int64), np.empty((0, THUMBNAIL_SIZE[1], THUMBNAIL_SIZE[0]), dtype=np.float32)
+    return np.array(indices), np.stack(thumbnails).astype(np.float32)
+
+
+def thumbnails_at(cap, frame_indices):
+    """Decode the given frames in one pass and return (frame_indices, thumbnails) as arrays"""
+    return thumbnails_from_frames(sample_frames(cap, frame_indices))
+
+
+def _probe_segment(source, frame_indices):
+    cap = open_capture(source)
+    try:
+        return thumbnails_at(cap, frame_indices)
+    finally:
+        cap.release()
+
+
+def probe_thumbnails(cap, fps, total_frames, probe_seconds=PROBE_SECONDS, max_probes=MAX_PROBES,
+                     source=None, workers=1):
+    """Probe thumbnails for the whole video, split across worker processes when workers > 1"""
+    indices = probe_frame_indices(fps, total_frames, probe_seconds, max_probes)
+    if workers <= 1 or source is None:
+        return thumbnails_at(cap, indices)
+    return thumbnails_parallel(source, indices, workers)
+
+
+def thumbnails_parallel(source, frame_indices, workers):
+    """thumbnails_at split across worker processes, each opening its own capture"""
+    parts = map_segments(_probe_segment, source, frame_indices, workers)
+    if not parts:
+        return thumbnails_from_frames([])
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+def change_scores(thumbnails):
+    """Mean absolute difference of each thumbnail to the previous one; the first probe scores inf"""
+    if len(thumbnails) == 0:
+        return np.empty(0, dtype=np.float32)
+    diffs = np.abs(np.diff(thumbnails, axis=0)).mean(axis=(1, 2))
+    return np.concatenate(([np.inf], diffs))
+
+
+def change_threshold(scores, min_score=MIN_CHANGE_SCORE):
+    """Score a probe needs to count as a scene change, raised above the video's own noise floor"""
+    finite = scores[1:]
+    if finite.size == 0:
+        return min_score
+    median = np.median(finite)
+    mad = np.median(np.abs(finite - median))
+    return max(min_score, float(median + NOISE_MADS * mad))
+
+
+def select_keyframes(probe_indices, scores, min_count, max_count, min_score=MIN_CHANGE_SCORE):
+    """
+    Pick the probes that start a new scene, trimmed to the strongest max_count
+    changes and padded up to min_count by splitting the longest unchanged stretches.
+    """
+    if len(probe_indices) == 0 or max_count <= 0:
+        return []
+
+    threshold = change_threshold(scores, min_score)
+    chosen = np.flatnonzero(scores >= threshold)  # always contains probe 0
+    if len(chosen) > max_count:
+        strongest = np.argsort(scores[chosen], kind="stable")[::-1][:max_count]
+        chosen = np.sort(chosen[strongest])
+
+    chosen = [int(i) for i in chosen]
+    target = min(min_count, max_count, len(probe_indices))
+    while len(chosen) < target:
+        bounds = np.array(chosen + [len(probe_indices)])
+        gaps = np.diff(bounds)
+        widest = int(np.argmax(gaps))
+        chosen.insert(widest + 1, int(bounds[widest] + gaps[widest] // 2))
+
+    return [int(probe_indices[i]) for i in chosen]
+
+
+def detect_scene_keyframes(probe, fps, total_frames, min_count, max_count,
+                           probe_seconds=PROBE_SECONDS, min_score=MIN_CHANGE_SCORE):
+    """
+    Frame indices where the content changes, within [min_count, max_count].
+    probe(frame_indices) returns (frame_indices, thumbnails), e.g. thumbnails_at bound to a capture.
+    """
+    probe_indices, thumbnails = probe(probe_frame_indices(fps, total_frames, probe_seconds))
+    scores = change_scores(thumbnails)
+    keyframes = select_keyframes(probe_indices, scores, min_count, max_count, min_score)
+
+    changes = int(np.count_nonzero(scores[1:] >= change_threshold(scores, min_score)))
+    print(f"Adaptive density: {changes} scene changes in {len(probe_indices)} probes → {len(keyframes)} screenshots")
+    return keyframes
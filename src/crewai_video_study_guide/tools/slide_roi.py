@@ -0,0 +1,97 @@
+"""
+Slide region detection and auto-crop (SLIDE_CROP).
+
+Screen recordings and lecture captures often show the slide in only part of
+the frame, next to a webcam, a border or black bars. Once per scene the
+dominant content region is found - the largest strongly rectangular
+contour, or else the area inside black bars - and every frame in that scene
+is cropped to it before dedup, encoding and vision analysis.
+"""
+import cv2
+import numpy as np
+
+from .scene_detector import thumbnail
+
+MIN_REGION_FRACTION = 0.25  # Smaller rectangles are webcams, logos or UI chrome, not the slide
+MAX_REGION_FRACTION = 0.95  # Larger ones mean the content already fills the frame
+RECTANGULARITY = 0.85       # Contour area / bounding-box area for a region to count as a rectangle
+BAR_STD = 4.0               # Rows/columns flatter than this (grey levels)...
+BAR_LEVEL = 32              # ...and darker than this are letterbox/pillarbox bars
+REGION_MARGIN = 0.01        # Padding around the detected region, as a fraction of the frame
+LAYOUT_CHANGE_SCORE = 8.0   # Thumbnail change that re-detects the region; slides sharing a template keep theirs
+
+
+def _trim_bars(gray):
+    """(x0, y0, x1, y1) after removing flat dark rows/columns at each edge"""
+    rows = np.flatnonzero((gray.std(axis=1) > BAR_STD) | (gray.mean(axis=1) > BAR_LEVEL))
+    cols = np.flatnonzero((gray.std(axis=0) > BAR_STD) | (gray.mean(axis=0) > BAR_LEVEL))
+    if len(rows) == 0 or len(cols) == 0:
+        return 0, 0, gray.shape[1], gray.shape[0]
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+def _largest_rectangle(gray, min_area, max_area):
+    edges = cv2.dilate(cv2.Canny(gray, 50, 150), np.ones((3, 3), np.uint8))
+    contours, _ = cv2.findContours(edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    best = None
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        area = w * h
+        if not min_area <= area <= max_area or (best is not None and area <= best[2] * best[3]):
+            continue
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) == 4 and cv2.contourArea(approx) >= RECTANGULARITY * area:
+            best = (x, y, w, h)
+    return best
+
+
+def find_content_region(frame):
+    """(x, y, w, h) of the slide/content region, or None when it already fills the frame"""
+    height, width = frame.shape[:2]
+    frame_area = width * height
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    region = _largest_rectangle(gray, MIN_REGION_FRACTION * frame_area, MAX_REGION_FRACTION * frame_area)
+    if region is None:
+        # No framed rectangle: fall back to whatever the black bars leave
+        x0, y0, x1, y1 = _trim_bars(gray)
+        if (x1 - x0) * (y1 - y0) <= MAX_REGION_FRACTION * frame_area:
+            region = (x0, y0, x1 - x0, y1 - y0)
+    if region is None or region[2] * region[3] < MIN_REGION_FRACTION * frame_area:
+        return None
+
+    x, y, w, h = region
+    pad_x, pad_y = int(width * REGION_MARGIN), int(height * REGION_MARGIN)
+    x, y = max(0, x - pad_x), max(0, y - pad_y)
+    return x, y, min(width, x + w + 2 * pad_x) - x, min(height, y + h + 2 * pad_y) - y
+
+
+class SlideCropper:
+    """Crops frames to their scene's content region, detecting it again only when the scene changes"""
+
+    def __init__(self, scene_change=LAYOUT_CHANGE_SCORE):
+        self.scene_change = scene_change
+        self.region = None
+        self.scenes = 0
+        self.pixels_in = 0
+        self.pixels_out = 0
+        self._scene_thumbnail = None
+
+    def crop(self, frame):
+        current = thumbnail(frame).astype(np.float32)
+        if self._scene_thumbnail is None or np.abs(current - self._scene_thumbnail).mean() >= self.scene_change:
+            self._scene_thumbnail = current
+            self.region = find_content_region(frame)
+            self.scenes += 1
+
+        cropped = frame
+        if self.region is not None:
+            x, y, w, h = self.region
+            cropped = frame[y:y + h, x:x + w]
+        self.pixels_in += frame.shape[0] * frame.shape[1]
+        self.pixels_out += cropped.shape[0] * cropped.shape[1]
+        return cropped
+
+    def summary(self):
+        kept = self.pixels_out / self.pixels_in if self.pixels_in else 1.0
+        return f"Slide crop: {self.scenes} scenes, {kept:.0%} of pixels kept"
@@ -0,0 +1,43 @@
+"""Wall-clock timing of pipeline stages"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """Records how long each named stage took; stages may run concurrently in other threads"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def timed(self, name, fn, *args, **kwargs):
+        """Call fn inside a stage, e.g. as a thread-pool task"""
+        with self.stage(name):
+            return fn(*args, **kwargs)
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        """One line with every stage, the total, and the time saved by running stages concurrently"""
+        total = self.total()
+        busy = sum(self.timings.values())
+        line = " | ".join(f"{name} {seconds:.1f}s" for name, seconds in self.timings.items())
+        line = f"Stage timings: {line} | total {total:.1f}s"
+        if busy > total + 0.05:
+            line += f" ({busy - total:.1f}s overlapped)"
+        return line
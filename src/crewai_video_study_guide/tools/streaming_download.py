@@ -0,0 +1,106 @@
+"""
+Background yt-dlp download that can be decoded while it is still being written.
+
+YouTube MP4 streams carry their index at the front, so a target frame can be
+decoded as soon as the bytes up to its position are on disk. Readers wait for
+an estimated byte offset (linear in time, plus headroom) and retry with more
+headroom whenever the estimate turns out to be short.
+"""
+import os
+import subprocess
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from .frame_sampler import sample_frames
+
+POLL_SECONDS = 0.25
+HEADER_BYTES = 2 * 1024 ** 2     # Container index and first GOP
+RETRY_MARGIN_FRACTION = 0.1      # Extra headroom (of the expected size) after a short read
+
+
+class BackgroundDownload:
+    """yt-dlp running in a thread, writing straight to its final path"""
+
+    def __init__(self, cmd, path, expected_bytes=None):
+        self.cmd = cmd
+        self.path = path
+        self.expected_bytes = expected_bytes
+        self.returncode = None
+        self.stderr = ''
+        self.elapsed = None
+        self._done = threading.Event()
+
+    def start(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def _run(self):
+        started = time.perf_counter()
+        try:
+            result = subprocess.run(self.cmd, capture_output=True, text=True)
+            self.returncode, self.stderr = result.returncode, result.stderr
+        except Exception as e:
+            self.returncode, self.stderr = -1, str(e)
+        self.elapsed = time.perf_counter() - started
+        self._done.set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def succeeded(self):
+        return self.done and self.returncode == 0
+
+    @property
+    def bytes_written(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def wait(self):
+        """Block until the download finishes; True if it succeeded"""
+        self._done.wait()
+        return self.succeeded
+
+    def wait_for_bytes(self, needed):
+        while not self.done and self.bytes_written < needed:
+            time.sleep(POLL_SECONDS)
+
+    def _bytes_needed(self, frame_index, total_frames, margin):
+        fraction = min(1.0, (frame_index + 1) / max(1, total_frames))
+        return HEADER_BYTES + self.expected_bytes * fraction + margin
+
+    def sample_frames(self, frame_indices, total_frames):
+        """
+        Yield (frame_index, frame) like sample_frames, starting before the download
+        completes. Needs expected_bytes to map frame positions to byte offsets.
+        """
+        pending = deque(sorted(set(frame_indices)))
+        margin = 0
+        while pending:
+            self.wait_for_bytes(self._bytes_needed(pending[0], total_frames, margin))
+            complete = self.done
+            available = self.bytes_written
+            ready = [i for i in pending
+                     if complete or self._bytes_needed(i, total_frames, margin) <= available]
+
+            produced = 0
+            cap = cv2.VideoCapture(self.path)
+            if cap.isOpened():
+                for frame_index, frame in sample_frames(cap, ready):
+                    pending.popleft()
+                    produced += 1
+                    yield frame_index, frame
+            cap.release()
+
+            if complete:
+                return  # whatever is still pending lies past the end of the stream
+            if produced < len(ready):
+                margin += self.expected_bytes * RETRY_MARGIN_FRACTION
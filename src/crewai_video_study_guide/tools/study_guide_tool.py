@@ -0,0 +1,63 @@
+import json
+import time
+from typing import Optional, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+from .batch_vision_tool import load_transcript_index
+from .llm_client import ChatClient
+from .map_reduce_synthesis import WINDOW_SECONDS, MapReduceSynthesizer
+from .vision_batch import MAX_CONCURRENT_REQUESTS, MAX_RPM, time_seconds
+from .workspace import current_workspace
+
+
+class StudyGuideWriterInput(BaseModel):
+    analyses_file: Optional[str] = Field(
+        default=None,
+        description="JSON file written by the Batch Screenshot Analyzer. Leave empty for the current job's.",
+    )
+
+
+class HierarchicalStudyGuideWriter(BaseTool):
+    name: str = "Hierarchical Study Guide Writer"
+    description: str = (
+        "Writes the complete study guide for a long video from the Batch Screenshot Analyzer results and "
+        "the transcript, section by section in parallel. Call it once; its output is the finished guide."
+    )
+    args_schema: Type[BaseModel] = StudyGuideWriterInput
+    result_as_answer: bool = True
+    provider: str = "openai"
+    model: Optional[str] = None
+    base_url: Optional[str] = None
+    max_concurrent: int = MAX_CONCURRENT_REQUESTS
+    max_rpm: int = MAX_RPM
+    window_seconds: int = WINDOW_SECONDS
+    _usage: dict = PrivateAttr(default_factory=dict)
+
+    def token_usage(self):
+        """Tokens and requests of this tool's own model calls so far (StageMeter adds them to the stage)"""
+        return dict(self._usage)
+
+    def _run(self, analyses_file: Optional[str] = None) -> str:
+        analyses_file = analyses_file or current_workspace().analyses_path
+        try:
+            with open(analyses_file, encoding='utf-8') as f:
+                analyses = json.load(f)
+        except (OSError, ValueError) as e:
+            return f"Error: could not read screenshot analyses from {analyses_file}: {e}"
+
+        screenshots = analyses.get('screenshots') or []
+        transcript_index = load_transcript_index(analyses.get('transcript_path'))
+        last_screenshot = max((time_seconds(t) for s in screenshots for t in s['times']), default=0)
+        duration = max(transcript_index.end_time if transcript_index is not None else 0, last_screenshot + 1)
+
+        synthesizer = MapReduceSynthesizer(ChatClient(self.provider, self.model, self.base_url),
+                                           self.max_concurrent, self.max_rpm)
+        started = time.time()
+        guide = synthesizer.synthesize(screenshots, transcript_index, duration, self.window_seconds,
+                                       analyses.get('chapters'))
+        print(f"Study guide written with {synthesizer.requests} model calls in {time.time() - started:.1f}s")
+        for name, value in {**synthesizer.usage, 'requests': synthesizer.requests}.items():
+            self._usage[name] = self._usage.get(name, 0) + value
+        return guide
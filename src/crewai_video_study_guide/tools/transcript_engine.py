@@ -0,0 +1,208 @@
+"""
+Transcript retrieval.
+
+Instead of guessing languages one request at a time ('en', then 'en-US',
+then anything - every miss a full round trip), the engine lists the video's
+tracks once, picks the best one locally and fetches only that:
+
+    1. youtube-transcript-api: one list request, one fetch
+    2. caption tracks from the yt-dlp probe (no listing request; json3 over HTTP)
+
+Manually created tracks beat generated ones, then TRANSCRIPT_LANGUAGES in
+order, then other variants of those languages, then anything (the original
+track before machine translations). Transcripts are cached on disk by video
+ID and language preference, so reruns and other jobs for the same video make
+no requests at all. A cached generated track expires after a few days, so a
+manual track published later replaces it; a manual one after a month.
+
+Sources are plain objects with tracks(video_id), so tests and benchmarks can
+pass a stand-in API (see benchmarks/bench_transcript.py) or caption URLs
+pointing at a local server.
+"""
+import hashlib
+import json
+import os
+import time
+import urllib.request
+from dataclasses import dataclass
+from typing import Callable
+
+TRANSCRIPT_LANGUAGES = ('en', 'en-US', 'en-GB')
+TRANSCRIPT_CACHE_DIR = '.cache/transcripts'
+TRANSCRIPT_CACHE_MAX_AGE_DAYS = 30
+GENERATED_TRANSCRIPT_MAX_AGE_DAYS = 3
+CAPTION_FORMAT = 'json3'
+REQUEST_TIMEOUT = 30
+
+
+class TranscriptUnavailable(Exception):
+    pass
+
+
+@dataclass
+class Track:
+    language_code: str
+    is_generated: bool
+    fetch: Callable[[], list]  # -> [{'text', 'start', 'duration'}]
+
+
+def _base_language(code):
+    return code.split('-')[0].lower()
+
+
+def choose_track(tracks, languages=TRANSCRIPT_LANGUAGES):
+    """The best track for the preferred languages, chosen without any request; None if tracks is empty"""
+    def rank(track):
+        code = track.language_code
+        if code in languages:
+            language_rank = languages.index(code)
+        elif _base_language(code) in {_base_language(language) for language in languages}:
+            language_rank = len(languages)
+        elif code.endswith('-orig'):
+            language_rank = len(languages) + 1  # The spoken language, before YouTube's machine translations
+        else:
+            language_rank = len(languages) + 2
+        return language_rank, track.is_generated
+    return min(tracks, key=rank, default=None)
+
+
+class TranscriptApiSource:
+    """youtube-transcript-api, 1.x instance API or the older class methods"""
+    name = "transcript API"
+    listing_requests = 1
+
+    def __init__(self, api=None):
+        self.api = api  # None: the installed youtube-transcript-api
+
+    def _api(self):
+        if self.api is None:
+            from youtube_transcript_api import YouTubeTranscriptApi
+            self.api = YouTubeTranscriptApi()
+        return self.api
+
+    def tracks(self, video_id):
+        api = self._api()
+        listing = api.list(video_id) if hasattr(api, 'list') else api.list_transcripts(video_id)
+        return [Track(t.language_code, t.is_generated, lambda t=t: _raw_segments(t.fetch())) for t in listing]
+
+
+def _raw_segments(fetched):
+    # 1.x returns a FetchedTranscript, older versions a list of dicts
+    segments = fetched.to_raw_data() if hasattr(fetched, 'to_raw_data') else fetched
+    return [{'text': s['text'], 'start': float(s['start']), 'duration': float(s.get('duration') or 0)}
+            for s in segments]
+
+
+class CaptionTrackSource:
+    """Caption tracks listed in the yt-dlp probe; listing them costs nothing"""
+    name = "caption tracks"
+    listing_requests = 0
+
+    def __init__(self, video_info):
+        self.video_info = video_info or {}
+
+    def tracks(self, video_id):
+        tracks = []
+        for key, generated in (('subtitles', False), ('automatic_captions', True)):
+            for language_code, formats in (self.video_info.get(key) or {}).items():
+                url = next((f['url'] for f in formats if f.get('ext') == CAPTION_FORMAT and f.get('url')), None)
+                if url and language_code != 'live_chat':
+                    tracks.append(Track(language_code, generated, lambda url=url: fetch_json3(url)))
+        return tracks
+
+
+def fetch_json3(url):
+    """Segments from a YouTube json3 caption file"""
+    with urllib.request.urlopen(url, timeout=REQUEST_TIMEOUT) as response:
+        data = json.load(response)
+    segments = []
+    for event in data.get('events') or []:
+        text = "".join(seg.get('utf8', '') for seg in event.get('segs') or []).strip()
+        if text:
+            segments.append({'text': text, 'start': event.get('tStartMs', 0) / 1000,
+                             'duration': event.get('dDurationMs', 0) / 1000})
+    return segments
+
+
+class TranscriptCache:
+    """One JSON file per video ID, language preference and kind of track (manual or generated)"""
+
+    def __init__(self, cache_dir=TRANSCRIPT_CACHE_DIR, max_age_days=TRANSCRIPT_CACHE_MAX_AGE_DAYS,
+                 generated_max_age_days=GENERATED_TRANSCRIPT_MAX_AGE_DAYS):
+        self.cache_dir = cache_dir
+        self.max_age = {False: max_age_days * 86400, True: generated_max_age_days * 86400}
+
+    def path(self, video_id, languages, generated):
+        preference = hashlib.sha256('|'.join(languages).encode('utf-8')).hexdigest()[:12]
+        kind = 'generated' if generated else 'manual'
+        return os.path.join(self.cache_dir, f"{video_id}.{preference}.{kind}.json")
+
+    def get(self, video_id, languages=TRANSCRIPT_LANGUAGES):
+        """The fresh entry for this language preference, a manual track's before a generated one's; else None"""
+        for generated in (False, True):
+            path = self.path(video_id, languages, generated)
+            try:
+                if time.time() - os.path.getmtime(path) >= self.max_age[generated]:
+                    continue
+                with open(path, encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                continue
+        return None
+
+    def put(self, video_id, languages, entry):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(video_id, languages, entry['generated'])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+class TranscriptEngine:
+    """Transcript for a video ID: the disk cache, then each source in turn"""
+
+    def __init__(self, languages=TRANSCRIPT_LANGUAGES, cache_dir=TRANSCRIPT_CACHE_DIR, sources=None,
+                 max_age_days=TRANSCRIPT_CACHE_MAX_AGE_DAYS, generated_max_age_days=GENERATED_TRANSCRIPT_MAX_AGE_DAYS):
+        self.languages = tuple(languages)
+        self.cache = TranscriptCache(cache_dir, max_age_days, generated_max_age_days) if cache_dir else None
+        self.sources = sources  # None: the transcript API, then the probe's caption tracks
+        self.requests = 0  # Listing and fetch calls made, for reports and benchmarks
+
+    def get(self, video_id, video_info=None):
+        """
+        ({'segments', 'language', 'generated', 'source'}, warnings), or (None, warnings)
+        when no source has a transcript.
+        """
+        cached = self.cache.get(video_id, self.languages) if self.cache is not None else None
+        if cached is not None:
+            return cached, []
+
+        warnings = []
+        sources = self.sources or [TranscriptApiSource(), CaptionTrackSource(video_info)]
+        for source in sources:
+            try:
+                self.requests += source.listing_requests
+                track = choose_track(source.tracks(video_id), self.languages)
+                if track is None:
+                    raise TranscriptUnavailable("no tracks")
+                self.requests += 1
+                segments = track.fetch()
+                if not segments:
+                    raise TranscriptUnavailable(f"empty {track.language_code} track")
+            except Exception as e:
+                # Any failure just moves on to the next source
+                warnings.append(f"{source.name}: {_describe(e)}")
+                continue
+            result = {'segments': segments, 'language': track.language_code, 'generated': track.is_generated,
+                      'source': source.name}
+            if self.cache is not None:
+                self.cache.put(video_id, self.languages, result)
+            return result, warnings
+        return None, warnings
+
+
+def _describe(error):
+    """Error class plus the first line of its message (the library's messages run to a page)"""
+    lines = str(error).strip().splitlines()
+    return f"{type(error).__name__}: {lines[0]}" if lines else type(error).__name__
@@ -0,0 +1,87 @@
+"""
+Timestamp-aligned transcript lookups.
+
+TranscriptIndex keeps the segments of transcript_structured.json in sorted
+start-time arrays, so the speech under any time window is two bisects away.
+Each screenshot gets the transcript from its timestamp until the next
+screenshot (capped), which is what the synthesizer needs instead of the
+whole file.
+"""
+import json
+from bisect import bisect_left, bisect_right
+
+MAX_WINDOW_SECONDS = 180  # A screenshot never claims more transcript than this
+
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    if hours:
+        return f"{hours}:{rest // 60:02d}:{rest % 60:02d}"
+    return f"{rest // 60:02d}:{rest % 60:02d}"
+
+
+class TranscriptIndex:
+    def __init__(self, segments):
+        segments = sorted(segments, key=lambda s: s['start'])
+        self.starts = [float(s['start']) for s in segments]
+        self.ends = [float(s['start']) + float(s.get('duration') or 0) for s in segments]
+        self.texts = [s['text'].replace('\n', ' ').strip() for s in segments]
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def end_time(self):
+        return max(self.ends, default=0.0)
+
+    def window(self, start, end):
+        """Indices of the segments spoken in [start, end): the one in progress at start, then all starting before end"""
+        in_progress = self.segment_at(start)
+        lo = in_progress if in_progress is not None else bisect_left(self.starts, start)
+        return range(lo, bisect_left(self.starts, end))
+
+    def text(self, start, end):
+        return " ".join(self.texts[i] for i in self.window(start, end) if self.texts[i])
+
+    def segment_at(self, time):
+        """Index of the segment being spoken at `time`, or None"""
+        i = bisect_right(self.starts, time) - 1
+        return i if i >= 0 and self.ends[i] > time else None
+
+
+def screenshot_windows(occurrences, end_time, max_window=MAX_WINDOW_SECONDS):
+    """
+    [(start, end)] for sorted screenshot occurrence times: each runs until the next
+    occurrence of any screenshot, at most max_window seconds, and never past end_time.
+    """
+    windows = []
+    for i, start in enumerate(occurrences):
+        end = occurrences[i + 1] if i + 1 < len(occurrences) else end_time
+        windows.append((start, max(start, min(end, start + max_window))))
+    return windows
+
+
+def attach_transcript(screenshots, index, time_seconds, max_window=MAX_WINDOW_SECONDS):
+    """
+    Add 'transcript' (list of {'start', 'end', 'text'}) to each screenshot dict, one entry per
+    time it appears. time_seconds converts a screenshot timestamp string to seconds.
+    """
+    occurrences = sorted((time_seconds(t), screenshot_number, t)
+                         for screenshot_number, screenshot in enumerate(screenshots)
+                         for t in screenshot['times'])
+    times = [o[0] for o in occurrences]
+    windows = screenshot_windows(times, max(index.end_time, times[-1] if times else 0), max_window)
+
+    for screenshot in screenshots:
+        screenshot['transcript'] = []
+    for (start, screenshot_number, _), (_, end) in zip(occurrences, windows):
+        text = index.text(start, end)
+        if text:
+            screenshots[screenshot_number]['transcript'].append({'start': start, 'end': end, 'text': text})
+    return screenshots
@@ -1,224 +1,82 @@
-import os
-import cv2
-import subprocess
-import json
-import re
 from crewai.tools import tool
+from .budget_planner import BudgetPlanner
+from .extraction_pipeline import run_extraction
+from .metadata_probe import probe_video
 
-SCREENSHOT_DIR = "screenshots"
-os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+# Default extraction settings for deployment
+TARGET_JOB_SECONDS = 600      # Wall-clock target per video; the budget planner picks the screenshot count
+TOKEN_BUDGET = 300_000        # Vision and synthesis tokens per video
+SCREENSHOT_QUALITY = "HIGH"   # Preferred density before the budgets: LOW, MEDIUM, HIGH, ULTRA
+ADAPTIVE_DENSITY = True
+MIN_SCREENSHOTS = 10
+MAX_SCREENSHOTS = 50
+CHAPTER_AWARE_SAMPLING = True  # Split the budget across chapters by length
+MIN_SCREENSHOTS_PER_CHAPTER = 2
+SCENE_CHANGE_THRESHOLD = 2.0  # Raised per video above its own motion noise
+DEDUP_SCREENSHOTS = True
+DEDUP_MAX_DISTANCE = 5
+SLIDE_CROP = False            # Crop each scene to its slide region (lecture captures, screen recordings)
+FILTER_BAD_FRAMES = True      # Move blank, dark and blurred samples to the nearest clean frame
+FRAME_LONG_EDGE = 1280        # Screenshots are downscaled to this longest side
+FRAME_FORMAT = "jpeg"         # "jpeg", "webp" or "png"
+FRAME_QUALITY = 80
+ENABLE_ARTIFACT_CACHE = True
+EXTRACTION_MODE = "download"  # "download" fetches the whole file, "remote" seeks on the media URL
+MIN_FRAME_HEIGHT = 720        # Smallest video height that keeps slide text legible
+STREAM_EXTRACTION = True      # Decode while downloading; False decodes the finished file with EXTRACTION_WORKERS
+EXTRACTION_WORKERS = None     # Worker processes for long videos (None = CPU count)
+SYNTHESIS_MODE = "auto"       # "single", "map_reduce" or "auto" (map_reduce past MAP_REDUCE_MIN_MINUTES)
+MAP_REDUCE_MIN_MINUTES = 60
 
-def extract_video_id(url):
-    """Extract video ID from various YouTube URL formats"""
-    patterns = [
-        r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/)([^&\n?#]+)',
-        r'youtube\.com/watch\?.*v=([^&\n?#]+)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
-
-def calculate_optimal_interval(duration_minutes):
-    """Calculate optimal screenshot interval with intelligent density control"""
-    # Default settings for deployment
-    SCREENSHOT_QUALITY = "HIGH"
-    FAST_MODE = False
-    MIN_SCREENSHOTS = 10
-    MAX_SCREENSHOTS = 50
-    
-    # Quality-based multipliers
-    quality_multipliers = {
-        "LOW": 0.5,      # Fewer screenshots, faster processing
-        "MEDIUM": 0.75,  # Balanced approach
-        "HIGH": 1.0,     # Standard density
-        "ULTRA": 1.5     # More screenshots, better coverage
+def extraction_settings():
+    return {
+        'TARGET_JOB_SECONDS': TARGET_JOB_SECONDS,
+        'TOKEN_BUDGET': TOKEN_BUDGET,
+        'SCREENSHOT_QUALITY': SCREENSHOT_QUALITY,
+        'ADAPTIVE_DENSITY': ADAPTIVE_DENSITY,
+        'MIN_SCREENSHOTS': MIN_SCREENSHOTS,
+        'MAX_SCREENSHOTS': MAX_SCREENSHOTS,
+        'CHAPTER_AWARE_SAMPLING': CHAPTER_AWARE_SAMPLING,
+        'MIN_SCREENSHOTS_PER_CHAPTER': MIN_SCREENSHOTS_PER_CHAPTER,
+        'SCENE_CHANGE_THRESHOLD': SCENE_CHANGE_THRESHOLD,
+        'DEDUP_SCREENSHOTS': DEDUP_SCREENSHOTS,
+        'DEDUP_MAX_DISTANCE': DEDUP_MAX_DISTANCE,
+        'SLIDE_CROP': SLIDE_CROP,
+        'FILTER_BAD_FRAMES': FILTER_BAD_FRAMES,
+        'FRAME_LONG_EDGE': FRAME_LONG_EDGE,
+        'FRAME_FORMAT': FRAME_FORMAT,
+        'FRAME_QUALITY': FRAME_QUALITY,
+        'ENABLE_ARTIFACT_CACHE': ENABLE_ARTIFACT_CACHE,
+        'EXTRACTION_MODE': EXTRACTION_MODE,
+        'MIN_FRAME_HEIGHT': MIN_FRAME_HEIGHT,
+        'STREAM_EXTRACTION': STREAM_EXTRACTION,
+        'EXTRACTION_WORKERS': EXTRACTION_WORKERS,
+        'SYNTHESIS_MODE': SYNTHESIS_MODE,
+        'MAP_REDUCE_MIN_MINUTES': MAP_REDUCE_MIN_MINUTES,
     }
-    
-    multiplier = quality_multipliers.get(SCREENSHOT_QUALITY, 1.0)
-    
-    if FAST_MODE:
-        # Speed-optimized settings
-        base_intervals = {
-            2: (20, 8),    # Very short: 20s intervals, ~8 screenshots
-            5: (30, 10),   # Short: 30s intervals, ~10 screenshots  
-            15: (60, 12),  # Medium: 1min intervals, ~12 screenshots
-            30: (120, 12), # Long: 2min intervals, ~12 screenshots
-            60: (240, 15), # Very long: 4min intervals, ~15 screenshots
-            120: (480, 15),# Extra long: 8min intervals, ~15 screenshots
-            300: (900, 20),# Super long: 15min intervals, ~20 screenshots
-            float('inf'): (1200, 25) # Ultra long: 20min intervals, ~25 screenshots
-        }
-    else:
-        # Quality-optimized settings
-        base_intervals = {
-            2: (10, 15),   # Very short: 10s intervals, ~15 screenshots
-            5: (20, 20),   # Short: 20s intervals, ~20 screenshots
-            15: (45, 25),  # Medium: 45s intervals, ~25 screenshots
-            30: (90, 25),  # Long: 1.5min intervals, ~25 screenshots
-            60: (180, 30), # Very long: 3min intervals, ~30 screenshots
-            120: (300, 30),# Extra long: 5min intervals, ~30 screenshots
-            300: (600, 35),# Super long: 10min intervals, ~35 screenshots
-            float('inf'): (900, 40) # Ultra long: 15min intervals, ~40 screenshots
-        }
-    
-    # Find appropriate interval based on duration
-    for max_duration, (interval, max_shots) in base_intervals.items():
-        if duration_minutes <= max_duration:
-            # Apply quality multiplier correctly
-            if SCREENSHOT_QUALITY == "ULTRA":
-                adjusted_interval = max(5, int(interval * 0.7))  # 30% smaller intervals
-                adjusted_max = min(MAX_SCREENSHOTS, int(max_shots * 1.5))  # 50% more shots
-            elif SCREENSHOT_QUALITY == "HIGH":
-                adjusted_interval = max(10, int(interval * 0.8))  # 20% smaller intervals  
-                adjusted_max = min(MAX_SCREENSHOTS, int(max_shots * 1.2))  # 20% more shots
-            elif SCREENSHOT_QUALITY == "MEDIUM":
-                adjusted_interval = interval
-                adjusted_max = max_shots
-            else:  # LOW
-                adjusted_interval = int(interval * 1.5)  # 50% larger intervals
-                adjusted_max = max(MIN_SCREENSHOTS, int(max_shots * 0.7))  # 30% fewer shots
-            
-            # Ensure within bounds
-            adjusted_max = max(MIN_SCREENSHOTS, min(adjusted_max, MAX_SCREENSHOTS))
-            adjusted_interval = max(5, adjusted_interval)
-            
-            print(f"Quality: {SCREENSHOT_QUALITY}, Duration: {duration_minutes:.1f}min")
-            print(f"Base: {interval}s/{max_shots} → Final: {adjusted_interval}s/{adjusted_max}")
-            
-            return adjusted_interval, adjusted_max
-    
-    # Fallback
-    return 60, 20
 
-@tool("Video Screenshot and Transcript Extractor")
+def budget_planner():
+    """Planner for the deployment settings; the crew and the extractor plan alike"""
+    return BudgetPlanner.from_settings(extraction_settings())
+
+def video_duration(youtube_url):
+    """Duration in seconds from the shared metadata probe, or None when it can't be read"""
+    try:
+        return probe_video(youtube_url)['duration']
+    except (RuntimeError, KeyError, TypeError) as e:
+        print(f"Warning: could not read the video duration ({e})")
+        return None
+
+@tool("Video Screenshot and Transcript Extractor", result_as_answer=True)
 def extract_video_data(youtube_url: str, interval_seconds: int = None) -> str:
     """
     Downloads a YouTube video, automatically calculates optimal screenshot intervals based on duration,
     and retrieves the full video transcript. Works with any video length from 30 seconds to 10+ hours.
-    Returns a string summary of the extracted data paths.
+    Returns a JSON manifest of the screenshots (path, timestamps, size, hashes), transcript paths and warnings.
     """
     try:
-        video_path = os.path.join(os.getcwd(), "temp_video.mp4")
-        
-        # Use yt-dlp to download video (more reliable than pytube)
-        print(f"Downloading video from: {youtube_url}")
-        cmd = [
-            'yt-dlp', 
-            '-f', 'best[ext=mp4]/best',
-            '-o', video_path,
-            '--no-playlist',
-            youtube_url
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            return f"Failed to download video: {result.stderr}"
-        
-        print("Download complete.")
-        
-        # Screenshots
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            return f"Error: Could not open video at {video_path}"
-
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration_seconds = total_frames / fps
-        duration_minutes = duration_seconds / 60
-        
-        # Auto-calculate optimal interval if not provided
-        if interval_seconds is None:
-            interval_seconds, max_screenshots = calculate_optimal_interval(duration_minutes)
-        else:
-            # Use provided interval but still calculate max screenshots
-            _, max_screenshots = calculate_optimal_interval(duration_minutes)
-        
-        print(f"Video info: {duration_minutes:.1f} minutes ({duration_seconds:.0f}s), {fps:.1f} fps")
-        print(f"Using {interval_seconds}s intervals, max {max_screenshots} screenshots")
-        
-        frame_interval = int(fps * interval_seconds) # Calculate frames to skip
-        frame_count = 0
-        screenshot_details = []
-
-        while frame_count * frame_interval < total_frames and len(screenshot_details) < max_screenshots:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_count * frame_interval)
-            
-            ret, frame = cap.read()
-            if not ret:
-                break
-                
-            time_in_seconds = (frame_count * frame_interval) / fps
-            minutes = int(time_in_seconds // 60)
-            seconds = int(time_in_seconds % 60)
-            time_str = f"{minutes:02d}_{seconds:02d}"
-
-            screenshot_name = f"ss_{time_str}.jpg"
-            screenshot_path = os.path.join(SCREENSHOT_DIR, screenshot_name)
-            cv2.imwrite(screenshot_path, frame)
-
-            screenshot_details.append(f"File: {screenshot_path}, Time: {time_str}")
-            print(f"Screenshot {len(screenshot_details)}: {time_str} ({time_in_seconds/60:.1f} min)")
-            frame_count += 1
-
-        cap.release()
-        print(f"Extracted {len(screenshot_details)} screenshots from {duration_seconds/60:.1f} minute video")
-        os.remove(video_path)
-
-        # Get transcript with timestamps
-        try:
-            from youtube_transcript_api import YouTubeTranscriptApi
-            video_id = extract_video_id(youtube_url)
-            
-            if video_id:
-                # Try to get transcript in different languages
-                try:
-                    transcript_list = YouTubeTranscriptApi.get_transcript(video_id, languages=['en'])
-                except:
-                    try:
-                        transcript_list = YouTubeTranscriptApi.get_transcript(video_id, languages=['en-US'])
-                    except:
-                        try:
-                            # Try to get any available transcript
-                            transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
-                        except:
-                            # If all else fails, skip transcript
-                            raise Exception("No transcript available")
-                
-                # Save full transcript with timestamps
-                transcript_path = os.path.join(os.getcwd(), "transcript.txt")
-                with open(transcript_path, "w", encoding="utf-8") as f:
-                    f.write("=== FULL TRANSCRIPT WITH TIMESTAMPS ===\n\n")
-                    for item in transcript_list:
-                        start_time = item['start']
-                        duration = item['duration']
-                        text = item['text']
-                        minutes = int(start_time // 60)
-                        seconds = int(start_time % 60)
-                        f.write(f"[{minutes:02d}:{seconds:02d}] {text}\n")
-                    
-                    f.write("\n\n=== PLAIN TEXT TRANSCRIPT ===\n\n")
-                    f.write(" ".join([item['text'] for item in transcript_list]))
-                
-                # Also save a structured transcript for easier processing
-                structured_transcript_path = os.path.join(os.getcwd(), "transcript_structured.json")
-                with open(structured_transcript_path, "w", encoding="utf-8") as f:
-                    json.dump(transcript_list, f, indent=2)
-                
-                screenshot_details.append(f"Transcript available at: {transcript_path}")
-                screenshot_details.append(f"Structured transcript at: {structured_transcript_path}")
-            else:
-                screenshot_details.append("Warning: Could not extract video ID for transcript")
-
-        except Exception as e:
-            screenshot_details.append(f"Warning: Could not get transcript: {e}")
-
-        if not screenshot_details:
-             return "No screenshots or data were extracted from the video."
-
-        return "\n".join(screenshot_details)
-
+        settings = extraction_settings()
+        planner = BudgetPlanner.from_settings(settings)
+        return run_extraction(youtube_url, interval_seconds, planner.sampling, settings)
     except Exception as e:
-        return f"An error occurred during video processing: {e}"
\ No newline at end of file
+        return f"An error occurred during video processing: {e}"
@@ -0,0 +1,188 @@
+"""
+Batched, rate-limited screenshot analysis.
+
+Screenshots go to the vision model BATCH_SIZE images per request, with at
+most MAX_CONCURRENT_REQUESTS requests in flight and a token bucket keeping
+the request rate under the crew's max_rpm. A batch whose reply can't be
+split back into one answer per image is retried image by image. With a
+VisionCache, images analyzed before (same bytes, prompt and model) are
+answered from the cache and never sent.
+"""
+import mimetypes
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .frame_encoder import recall
+from .llm_client import LLMError, image_part
+from .vision_cache import analysis_key
+
+BATCH_SIZE = 5
+MAX_CONCURRENT_REQUESTS = 3
+MAX_RPM = 15
+
+VISION_PROMPT = (
+    "This is a screenshot from an educational video. Identify the key visual elements, "
+    "transcribe important text, titles, code or data, and state the concepts it teaches. Be concise."
+)
+BATCH_PROMPT = (
+    "You are given {count} screenshots from an educational video, labelled Image 1 to Image {count} in order. "
+    "Analyze each one separately. Start each analysis with a line '### Image <number>'. {prompt}"
+)
+
+SCREENSHOT_LINE = re.compile(r'File:\s*(?P<path>.+?),\s*Time:\s*(?P<time>[\d_]+)(?:,\s*Also at:\s*(?P<also>.*))?$')
+IMAGE_HEADING = re.compile(r'^#+\s*Image\s+(\d+)\b.*$', re.MULTILINE | re.IGNORECASE)
+
+
+class TokenBucket:
+    """Allows `rate_per_minute` acquisitions per minute, with bursts of up to `capacity`"""
+
+    def __init__(self, rate_per_minute, capacity=1):
+        self.rate = max(1, rate_per_minute) / 60.0
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def parse_screenshot_listing(text):
+    """Screenshots from the extractor's summary: [{'path', 'times'}] in the order listed"""
+    screenshots = []
+    for line in text.splitlines():
+        match = SCREENSHOT_LINE.search(line.strip())
+        if match:
+            also = [t.strip() for t in (match.group('also') or '').split(',') if t.strip()]
+            screenshots.append({'path': match.group('path').strip(), 'times': [match.group('time')] + also})
+    return screenshots
+
+
+def time_seconds(time_str):
+    """Seconds for a screenshot timestamp like MM_SS or HH_MM_SS"""
+    seconds = 0
+    for part in time_str.split('_'):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def split_batch_reply(reply, count):
+    """Per-image sections of a batch reply, or None if it doesn't contain exactly Image 1..count"""
+    headings = list(IMAGE_HEADING.finditer(reply))
+    if [int(h.group(1)) for h in headings] != list(range(1, count + 1)):
+        return None
+    ends = [h.start() for h in headings[1:]] + [len(reply)]
+    return [reply[h.end():end].strip() for h, end in zip(headings, ends)]
+
+
+def load_image(screenshot):
+    """(bytes, mime type) of a screenshot: its in-memory buffer, the bytes encoded this run, or its file"""
+    if screenshot.get('image') is not None:
+        return screenshot['image'], screenshot.get('mime', 'image/jpeg')
+    encoded = recall(screenshot['path'])
+    if encoded is not None:
+        return encoded
+    with open(screenshot['path'], 'rb') as f:
+        return f.read(), mimetypes.guess_type(screenshot['path'])[0] or 'image/jpeg'
+
+
+class BatchVisionAnalyzer:
+    """Runs VISION_PROMPT over many screenshots with bounded concurrency"""
+
+    def __init__(self, client, batch_size=BATCH_SIZE, max_concurrent=MAX_CONCURRENT_REQUESTS,
+                 max_rpm=MAX_RPM, prompt=VISION_PROMPT, cache=None):
+        self.client = client
+        self.batch_size = max(1, batch_size)
+        self.max_concurrent = max(1, max_concurrent)
+        self.limiter = TokenBucket(max_rpm, capacity=self.max_concurrent)
+        self.prompt = prompt
+        self.cache = cache
+        self.requests = 0
+        self.usage = {'prompt_tokens': 0, 'completion_tokens': 0}
+        self._lock = threading.Lock()
+
+    def _request(self, content):
+        self.limiter.acquire()
+        text, usage = self.client.complete([{'role': 'user', 'content': content}])
+        with self._lock:
+            self.requests += 1
+            for name in self.usage:
+                self.usage[name] += usage.get(name) or 0
+        return text
+
+    def _analyze_one(self, image):
+        """(analysis, succeeded) for one image content part"""
+        try:
+            return self._request([{'type': 'text', 'text': self.prompt}, image]), True
+        except LLMError as e:
+            return f"Analysis failed: {e}", False
+
+    def _analyze_batch(self, images):
+        if len(images) > 1:
+            content = [{'type': 'text', 'text': BATCH_PROMPT.format(count=len(images), prompt=self.prompt)}]
+            for number, image in enumerate(images, 1):
+                content += [{'type': 'text', 'text': f"Image {number}:"}, image]
+            try:
+                sections = split_batch_reply(self._request(content), len(images))
+            except LLMError:
+                sections = None
+            if sections is not None:
+                return [(section, True) for section in sections]
+        return [self._analyze_one(image) for image in images]
+
+    def analyze(self, screenshots, completed=None, on_analyzed=None):
+        """
+        [{'path', 'times', 'analysis'}] for each screenshot, in timestamp order.
+        completed maps paths to analyses from an earlier attempt, which are reused as-is;
+        on_analyzed(screenshot, analysis) is called as soon as each new analysis succeeds.
+        """
+        ordered = sorted(screenshots, key=lambda s: time_seconds(s['times'][0]))
+        completed = completed or {}
+        analyses = [None] * len(ordered)
+        pending = []  # (position, image content part, cache key)
+        for position, screenshot in enumerate(ordered):
+            if screenshot['path'] in completed:
+                analyses[position] = completed[screenshot['path']]
+                continue
+            try:
+                data, mime = load_image(screenshot)
+            except OSError as e:
+                analyses[position] = f"Analysis failed: {e}"
+                continue
+            key = analysis_key(data, self.prompt, self.client.model) if self.cache is not None else None
+            cached = self.cache.get(key) if key is not None else None
+            if cached is not None:
+                analyses[position] = cached
+                if on_analyzed is not None:
+                    on_analyzed(screenshot, cached)
+            else:
+                pending.append((position, image_part(data, mime), key))
+
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=self.max_concurrent) as pool:
+            futures = {pool.submit(self._analyze_batch, [image for _, image, _ in batch]): batch for batch in batches}
+            # Record each batch as it lands, so an interrupted run keeps everything analyzed so far
+            for future in as_completed(futures):
+                for (position, _, key), (analysis, succeeded) in zip(futures[future], future.result()):
+                    analyses[position] = analysis
+                    if not succeeded:
+                        continue
+                    if key is not None:
+                        self.cache.put(key, analysis, self.client.model)
+                    if on_analyzed is not None:
+                        on_analyzed(ordered[position], analysis)
+        if self.cache is not None:
+            self.cache.evict()
+
+        return [{**screenshot, 'analysis': analysis} for screenshot, analysis in zip(ordered, analyses)]
@@ -0,0 +1,94 @@
+"""
+Persistent cache of vision analyses.
+
+Keyed by a hash of the image bytes, the prompt and the model, so a rerun of
+the same video - or another video sharing its intro/outro slides - skips the
+vision call. Entries older than max_age_days are dropped, and the least
+recently used ones go once the stored text exceeds max_bytes.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "vision.sqlite3")
+DEFAULT_MAX_BYTES = 64 * 1024 ** 2  # 64 MB of analysis text
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+def analysis_key(image_bytes, prompt, model):
+    digest = hashlib.sha256()
+    for part in (hashlib.sha256(image_bytes).digest(), prompt.encode('utf-8'), (model or '').encode('utf-8')):
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class VisionCache:
+    """SQLite-backed analysis cache with hit/miss counters; safe to share between threads"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Batch jobs in other processes share the file: wait for their writes instead of failing
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " key TEXT PRIMARY KEY, model TEXT, analysis TEXT NOT NULL,"
+            " size INTEGER NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, key):
+        with self._lock:
+            # Expired entries are misses even before evict() removes them
+            now = time.time()
+            row = self._db.execute("SELECT analysis FROM analyses WHERE key = ? AND created >= ?",
+                                   (key, now - self.max_age_days * 86400)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE analyses SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, analysis, model=None):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO analyses (key, model, analysis, size, created, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, analysis, len(analysis.encode('utf-8')), now, now),
+            )
+            self._db.commit()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes; returns rows removed"""
+        with self._lock:
+            removed = self._db.execute("DELETE FROM analyses WHERE created < ?",
+                                       (time.time() - self.max_age_days * 86400,)).rowcount
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM analyses").fetchone()[0]
+            if total > self.max_bytes:
+                for key, size in self._db.execute("SELECT key, size FROM analyses ORDER BY last_used").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    self._db.execute("DELETE FROM analyses WHERE key = ?", (key,))
+                    total -= size
+                    removed += 1
+            self._db.commit()
+            return removed
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analyses").fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': size}
+
+    def close(self):
+        self._db.close()
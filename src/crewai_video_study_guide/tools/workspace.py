@@ -0,0 +1,145 @@
+"""
+Per-job workspaces.
+
+Every run gets its own directory, jobs/<job_id>/, holding the temporary video,
+screenshots, transcripts, screenshot analyses and the study guide, so two jobs
+on one machine never write to the same path. The active workspace is
+published through the JOB_WORKSPACE environment variable: the extractor and
+the analysis tools resolve it on their own (agents don't pass paths around),
+and a job started as a subprocess inherits it. Run concurrent jobs as
+separate processes, one workspace each.
+"""
+import os
+import shutil
+import time
+import uuid
+
+from .checkpoint import CHECKPOINT_FILE
+from .metadata_probe import extract_video_id
+
+WORKSPACE_ROOT = "jobs"
+WORKSPACE_ENV = "JOB_WORKSPACE"
+SCREENSHOT_DIR = "screenshots"
+OUTPUT_FILE = "final_study_guide.md"
+
+
+def new_job_id(youtube_url=None):
+    """Sortable, unique job ID: <video id>-<YYYYmmdd-HHMMSS>-<random>"""
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    video_id = extract_video_id(youtube_url) if youtube_url else None
+    return f"{video_id}-{stamp}" if video_id else stamp
+
+
+def screenshot_time(seconds):
+    """Timestamp used in screenshot names and listings: MM_SS, or HH_MM_SS from the first hour on"""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    if hours:
+        return f"{hours:02d}_{rest // 60:02d}_{rest % 60:02d}"
+    return f"{rest // 60:02d}_{rest % 60:02d}"
+
+
+def check_root(root):
+    """
+    root, or ValueError when it is outside the working directory: crewai
+    rejects a Task output_file that is absolute or climbs out with '..'.
+    """
+    if os.path.relpath(os.path.abspath(root)).split(os.sep)[0] == os.pardir:
+        raise ValueError(f"Job workspaces must be under the working directory ({os.getcwd()}), got {root!r}: "
+                         f"crewai can't write the study guide outside it. Use a relative WORKSPACE_DIR, "
+                         f"or run from a directory that contains it.")
+    return root
+
+
+class JobWorkspace:
+    """Directory and artifact names for one job"""
+
+    def __init__(self, job_id=None, root=WORKSPACE_ROOT, output_file=OUTPUT_FILE):
+        self.job_id = job_id or new_job_id()
+        self.path = os.path.abspath(os.path.join(root, self.job_id))
+        self.screenshot_dir = os.path.join(self.path, SCREENSHOT_DIR)
+        self.output_path = os.path.join(self.path, output_file)
+
+    @classmethod
+    def for_url(cls, youtube_url, **kwargs):
+        return cls(new_job_id(youtube_url), **kwargs)
+
+    @classmethod
+    def at(cls, path, **kwargs):
+        """The workspace in an existing directory"""
+        path = os.path.abspath(path)
+        return cls(os.path.basename(path), root=os.path.dirname(path), **kwargs)
+
+    @property
+    def task_output_file(self):
+        """output_path for a crew Task: crewai only writes relative output_file paths (see check_root)"""
+        return os.path.relpath(check_root(self.output_path))
+
+    @property
+    def video_path(self):
+        return os.path.join(self.path, "temp_video.mp4")
+
+    @property
+    def transcript_path(self):
+        return os.path.join(self.path, "transcript.txt")
+
+    @property
+    def structured_transcript_path(self):
+        return os.path.join(self.path, "transcript_structured.json")
+
+    @property
+    def analyses_path(self):
+        return os.path.join(self.path, "screenshot_analyses.json")
+
+    def screenshot_path(self, seconds, extension):
+        return os.path.join(self.screenshot_dir, f"ss_{screenshot_time(seconds)}{extension}")
+
+    def create(self):
+        os.makedirs(self.screenshot_dir, exist_ok=True)
+        return self
+
+    def activate(self):
+        """Make this the workspace the tools in this process (and its subprocesses) write to"""
+        self.create()
+        os.environ[WORKSPACE_ENV] = self.path
+        return self
+
+    def cleanup(self, keep_output=True):
+        """
+        Delete the job's files; with keep_output only the study guide survives,
+        with the checkpoint that marks the job finished (so it isn't resumed).
+        """
+        if not keep_output:
+            shutil.rmtree(self.path, ignore_errors=True)
+            return
+        kept = {self.output_path, os.path.join(self.path, CHECKPOINT_FILE)}
+        for name in os.listdir(self.path) if os.path.isdir(self.path) else []:
+            path = os.path.join(self.path, name)
+            if path in kept:
+                continue
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+
+    def __repr__(self):
+        return f"JobWorkspace({self.path!r})"
+
+
+def latest_workspace(youtube_url, root=WORKSPACE_ROOT, **kwargs):
+    """The most recent workspace under root for this video, or None"""
+    video_id = extract_video_id(youtube_url)
+    if not video_id or not os.path.isdir(root):
+        return None
+    # Job IDs embed a sortable timestamp after the video ID
+    job_ids = sorted(name for name in os.listdir(root)
+                     if name.startswith(f"{video_id}-") and os.path.isdir(os.path.join(root, name)))
+    return JobWorkspace(job_ids[-1], root=root, **kwargs) if job_ids else None
+
+
+def current_workspace(youtube_url=None):
+    """The active workspace; a tool called outside any job starts (and activates) a fresh one"""
+    path = os.environ.get(WORKSPACE_ENV)
+    if path:
+        return JobWorkspace.at(path).create()
+    return JobWorkspace(new_job_id(youtube_url)).activate()
@@ -0,0 +1,39 @@
+"""Restoring cached extraction artifacts into a new workspace"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_video_study_guide.tools.artifact_cache import ArtifactCache  # noqa: E402
+
+
+def make_job(root):
+    """A workspace with one screenshot and a transcript, and its manifest text"""
+    os.makedirs(os.path.join(root, "screenshots"))
+    screenshot = os.path.join(root, "screenshots", "ss_00_05.jpg")
+    transcript = os.path.join(root, "transcript.txt")
+    for path in (screenshot, transcript):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(os.path.basename(path))
+    manifest = {"version": 1, "screenshots": [{"path": screenshot, "times": ["00_05"], "seconds": [5.0]}],
+                "transcript": {"text": transcript, "structured": None, "language": "en"}, "warnings": []}
+    return [screenshot, transcript], json.dumps(manifest, separators=(",", ":"))
+
+
+def test_restore_points_the_manifest_at_the_new_workspace(tmp_path):
+    # A backslash in the path is escaped in the JSON text, as every Windows path is
+    old_job = str(tmp_path / "jobs" / "old\\job")
+    new_job = str(tmp_path / "jobs" / "new-job")
+    paths, output = make_job(old_job)
+    cache = ArtifactCache(str(tmp_path / "cache"))
+    cache.put("video-key", paths, output, base=old_job)
+
+    manifest = json.loads(cache.restore("video-key", base=new_job))
+
+    screenshot = manifest["screenshots"][0]["path"]
+    assert screenshot == os.path.join(new_job, "screenshots", "ss_00_05.jpg")
+    assert manifest["transcript"]["text"] == os.path.join(new_job, "transcript.txt")
+    assert manifest["transcript"]["structured"] is None
+    with open(screenshot, encoding="utf-8") as f:
+        assert f.read() == "ss_00_05.jpg"
@@ -0,0 +1,45 @@
+"""Screenshot writing after the quality filter, on synthetic frames"""
+import os
+import sys
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_video_study_guide.tools.extraction_pipeline import DEFAULT_SETTINGS, write_screenshots  # noqa: E402
+from src.crewai_video_study_guide.tools.frame_filter import FrameQualityFilter  # noqa: E402
+from src.crewai_video_study_guide.tools.workspace import JobWorkspace  # noqa: E402
+
+FPS = 4
+
+
+def slide(title, chart):
+    frame = np.full((360, 640, 3), 245, dtype=np.uint8)
+    cv2.putText(frame, title, (40, 120), cv2.FONT_HERSHEY_SIMPLEX, 2, (20, 20, 20), 4)
+    cv2.rectangle(frame, chart[0], chart[1], (90, 50, 20), -1)
+    for line in range(3):
+        cv2.putText(frame, f"{title} point {line + 1}", (60, 200 + 50 * line), cv2.FONT_HERSHEY_SIMPLEX, 1,
+                    (40, 40, 40), 2)
+    return frame
+
+
+def test_replacement_frames_merge_in_time_order(tmp_path):
+    # Slide A, a blank gap around 5s, slide B, then slide A again
+    a, b = slide("Slide A", ((420, 20), (630, 340))), slide("Slide B", ((10, 160), (300, 350)))
+    blank = np.full((360, 640, 3), 128, dtype=np.uint8)
+    video = [a] * 18 + [blank] * 4 + [a] * 8 + [b] * 30 + [a] * 20
+
+    def read_frames(indices):
+        return ((i, video[i]) for i in indices)
+
+    quality = FrameQualityFilter(FPS, len(video))
+    frames = quality.filter(read_frames, [0, 20, 40, 60])
+    workspace = JobWorkspace.at(str(tmp_path / "job")).create()
+    screenshots = write_screenshots(frames, FPS, DEFAULT_SETTINGS, workspace)
+
+    assert quality.moved == 1
+    assert [s['seconds'] for s in screenshots] == [[0.0, 5.5, 15.0], [10.0]]
+    assert [s['times'] for s in screenshots] == [['00_00', '00_05', '00_15'], ['00_10']]
@@ -0,0 +1,100 @@
+"""Remote-seek capture against a local HTTP server with Range support"""
+import http.server
+import os
+import re
+import sys
+import threading
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_video_study_guide.tools.frame_sampler import sample_frames  # noqa: E402
+from src.crewai_video_study_guide.tools.remote_source import open_remote_capture  # noqa: E402
+
+FPS = 10
+SECONDS = 30
+SIZE = (320, 180)
+
+
+class RangeHandler(http.server.SimpleHTTPRequestHandler):
+    """Static files with single-range Range support; records every Range header"""
+    ranges = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        match = re.match(r'bytes=(\d*)-(\d*)', self.headers.get('Range', ''))
+        if match:
+            self.ranges.append(self.headers['Range'])
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else end
+            else:
+                start = max(0, size - int(match.group(2)))
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        else:
+            self.send_response(200)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        with open(path, 'rb') as f:
+            f.seek(start)
+            try:
+                self.wfile.write(f.read(end - start + 1))
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # The client seeked away
+
+
+@pytest.fixture
+def served_video(tmp_path):
+    """(url, local path, Range headers received) for a clip whose frames all differ"""
+    path = str(tmp_path / "video.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), FPS, SIZE)
+    pattern = cv2.resize(np.random.default_rng(0).integers(0, 255, (SIZE[1] // 10, SIZE[0] // 10, 3), dtype=np.uint8),
+                         SIZE, interpolation=cv2.INTER_NEAREST)
+    for i in range(SECONDS * FPS):
+        frame = np.roll(pattern, i * 3, axis=1)
+        cv2.putText(frame, str(i), (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3)
+        writer.write(frame)
+    writer.release()
+
+    handler = type('Handler', (RangeHandler,), {'ranges': []})
+    server = http.server.ThreadingHTTPServer(
+        ('127.0.0.1', 0), lambda *args, **kwargs: handler(*args, directory=str(tmp_path), **kwargs))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/video.mp4", path, handler.ranges
+    server.shutdown()
+
+
+def test_remote_capture_seeks_to_the_same_frames_as_a_local_file(served_video):
+    url, path, ranges = served_video
+    indices = [0, 75, 150, 225, 290]
+
+    remote = open_remote_capture(url)
+    assert remote.isOpened()
+    try:
+        assert int(remote.get(cv2.CAP_PROP_FRAME_COUNT)) == SECONDS * FPS
+        remote_frames = dict(sample_frames(remote, indices))
+    finally:
+        remote.release()
+    local = cv2.VideoCapture(path)
+    try:
+        local_frames = dict(sample_frames(local, indices))
+    finally:
+        local.release()
+
+    assert sorted(remote_frames) == indices
+    for index in indices:
+        assert np.array_equal(remote_frames[index], local_frames[index]), index
+    # Seeks became Range requests into the file rather than one sequential read
+    assert any(not header.startswith('bytes=0-') for header in ranges)
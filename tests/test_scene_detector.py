@@ -0,0 +1,60 @@
+"""Scene detection on a synthetic slide deck whose slides share one template"""
+import os
+import sys
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_video_study_guide.tools.scene_detector import (  # noqa: E402
+    change_scores, detect_scene_keyframes, thumbnails_from_frames)
+
+FRAME_SIZE = (1280, 720)
+WORDS = ("gradient", "descent", "matrix", "vector", "loss", "entropy", "kernel", "tensor", "batch", "layer")
+SLIDES = 12
+SECONDS_PER_SLIDE = 8
+
+
+def template_slide(number):
+    """Same title bar and layout on every slide; only the text differs"""
+    frame = np.full((FRAME_SIZE[1], FRAME_SIZE[0], 3), 245, dtype=np.uint8)
+    frame[:110] = (120, 60, 20)
+    cv2.putText(frame, f"Lecture 3: part {number}", (40, 80), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+    words = np.random.default_rng(number)
+    for line in range(5):
+        text = "- " + " ".join(words.choice(WORDS, 4))
+        cv2.putText(frame, text, (60, 200 + line * 95), cv2.FONT_HERSHEY_SIMPLEX, 1.6, (30, 30, 30), 3)
+    return frame
+
+
+@pytest.fixture(scope="module")
+def deck():
+    """frame_index -> frame at 1 fps, with sensor noise so no two probes are identical"""
+    noise = np.random.default_rng(0)
+    frames = {}
+    for number in range(SLIDES):
+        slide = template_slide(number).astype(np.int16)
+        for second in range(SECONDS_PER_SLIDE):
+            noisy = slide + noise.normal(0, 2, slide.shape)
+            frames[number * SECONDS_PER_SLIDE + second] = np.clip(noisy, 0, 255).astype(np.uint8)
+    return frames
+
+
+def test_same_template_changes_score_well_above_a_static_slide(deck):
+    _, thumbnails = thumbnails_from_frames(sorted(deck.items()))
+    scores = change_scores(thumbnails)[1:]
+    changes = scores[SECONDS_PER_SLIDE - 1::SECONDS_PER_SLIDE]
+    static = np.delete(scores, np.arange(SECONDS_PER_SLIDE - 1, len(scores), SECONDS_PER_SLIDE))
+    assert changes.min() > 4 * static.max()
+
+
+def test_detects_every_same_template_slide_change(deck):
+    def probe(frame_indices):
+        return thumbnails_from_frames((i, deck[i]) for i in frame_indices)
+
+    keyframes = detect_scene_keyframes(probe, fps=1, total_frames=len(deck), min_count=1, max_count=50)
+    assert keyframes == [number * SECONDS_PER_SLIDE for number in range(SLIDES)]
+
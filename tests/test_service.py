@@ -0,0 +1,175 @@
+"""
+End-to-end test of the job-queue service: JobQueue runs `service run` in a
+child process for a small generated clip, against a fake OpenAI-compatible
+LLM. The only other stand-in is a `yt-dlp` on PATH that copies the clip;
+the probe and transcript come from their disk caches, so nothing touches
+the network.
+"""
+import json
+import os
+import stat
+import sys
+import textwrap
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+pytest.importorskip("crewai")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from src.crewai_video_study_guide.service import JobQueue, STAGES  # noqa: E402
+from src.crewai_video_study_guide.tools.extraction_manifest import MANIFEST_FILE  # noqa: E402
+from src.crewai_video_study_guide.tools.metadata_probe import probe_cache_path  # noqa: E402
+from src.crewai_video_study_guide.tools.transcript_engine import TRANSCRIPT_LANGUAGES, TranscriptCache  # noqa: E402
+
+VIDEO_URL = "https://www.youtube.com/watch?v=fixtureclip"
+CLIP_SECONDS = 12
+CLIP_FPS = 5
+CLIP_SIZE = (1280, 720)
+GUIDE = "# Study guide\n\nNotes from the fake model."
+JOB_TIMEOUT = 240
+
+
+class FakeLLM(BaseHTTPRequestHandler):
+    """
+    /chat/completions: numbered analyses for image requests, a call of the
+    first tool for an agent that hasn't called one yet, otherwise the guide.
+    """
+    calls = None
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        messages = body.get('messages', [])
+        images = sum(1 for m in messages if isinstance(m.get('content'), list)
+                     for part in m['content'] if part.get('type') == 'image_url')
+        message = {'role': 'assistant', 'content': None}
+        if images:
+            kind = 'vision'
+            message['content'] = "\n".join(f"[{i + 1}] A slide with a heading." for i in range(images))
+        elif body.get('tools') and not any(m.get('role') == 'tool' for m in messages):
+            kind = 'tool_call'
+            message['tool_calls'] = [{'id': f"call_{len(self.calls)}", 'type': 'function',
+                                      'function': {'name': body['tools'][0]['function']['name'], 'arguments': '{}'}}]
+        else:
+            kind = 'answer'
+            message['content'] = GUIDE
+        self.calls.append(kind)
+        data = json.dumps({
+            'id': 'fake', 'object': 'chat.completion', 'created': int(time.time()), 'model': body.get('model'),
+            'choices': [{'index': 0, 'message': message,
+                         'finish_reason': 'tool_calls' if message.get('tool_calls') else 'stop'}],
+            'usage': {'prompt_tokens': 100, 'completion_tokens': 10, 'total_tokens': 110},
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    handler = type('Handler', (FakeLLM,), {'calls': []})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    for name, value in {'OPENAI_API_KEY': 'test', 'OPENAI_BASE_URL': url, 'OPENAI_API_BASE': url,
+                        'LLM_BASE_URL': url, 'OPENAI_MODEL_NAME': 'gpt-4o-mini', 'MODEL': 'gpt-4o-mini',
+                        'CREWAI_DISABLE_TELEMETRY': 'true', 'OTEL_SDK_DISABLED': 'true'}.items():
+        monkeypatch.setenv(name, value)
+    yield handler.calls
+    server.shutdown()
+
+
+@pytest.fixture
+def video_clip(tmp_path):
+    """Three 'slides' of CLIP_SECONDS / 3 each"""
+    path = str(tmp_path / "clip.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), CLIP_FPS, CLIP_SIZE)
+    for slide in range(3):
+        frame = np.full((CLIP_SIZE[1], CLIP_SIZE[0], 3), 250, dtype=np.uint8)
+        cv2.putText(frame, f"Slide {slide + 1}", (100, 200), cv2.FONT_HERSHEY_SIMPLEX, 4, (20, 20, 20), 8)
+        for line in range(4):
+            cv2.putText(frame, f"Point {line + 1} of slide {slide + 1}", (120, 330 + 90 * line),
+                        cv2.FONT_HERSHEY_SIMPLEX, 2, (40, 40, 40), 4)
+        for _ in range(CLIP_SECONDS // 3 * CLIP_FPS):
+            writer.write(frame)
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def job_dir(tmp_path, monkeypatch, video_clip):
+    """Working directory with the clip's probe and transcript cached and a fake yt-dlp on PATH"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('PYTHONPATH', REPO_ROOT)
+
+    info = {'id': 'fixtureclip', 'title': 'Fixture clip', 'duration': CLIP_SECONDS, 'chapters': [],
+            'formats': [{'format_id': '136', 'ext': 'mp4', 'vcodec': 'avc1.4d401f', 'acodec': 'none',
+                         'height': CLIP_SIZE[1], 'fps': CLIP_FPS, 'filesize': os.path.getsize(video_clip),
+                         'url': video_clip}]}
+    probe_path = probe_cache_path(VIDEO_URL, os.path.join('.cache', 'probes'))
+    os.makedirs(os.path.dirname(probe_path))
+    with open(probe_path, 'w', encoding='utf-8') as f:
+        json.dump(info, f)
+    TranscriptCache(os.path.join('.cache', 'transcripts')).put('fixtureclip', TRANSCRIPT_LANGUAGES, {
+        'segments': [{'text': f"Now slide {i + 1}.", 'start': i * 4.0, 'duration': 4.0} for i in range(3)],
+        'language': 'en', 'generated': False, 'source': 'transcript API'})
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    yt_dlp = bin_dir / "yt-dlp"
+    yt_dlp.write_text(textwrap.dedent(f"""\
+        #!{sys.executable}
+        import shutil, sys
+        shutil.copyfile({video_clip!r}, sys.argv[sys.argv.index('-o') + 1])
+        """))
+    yt_dlp.chmod(yt_dlp.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return tmp_path
+
+
+def wait_for(jobs, job_id, timeout=JOB_TIMEOUT):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = jobs.get(job_id)
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.5)
+    pytest.fail(f"job {job_id} still {jobs.get(job_id)['status']} after {timeout}s")
+
+
+def test_job_queue_runs_crew_with_fake_llm(job_dir, fake_llm):
+    jobs = JobQueue('jobs', workers=1).start()
+    job = jobs.submit(VIDEO_URL)
+    assert job['status'] == 'queued'
+
+    job = wait_for(jobs, job['job_id'])
+    with open(os.path.join('jobs', job['job_id'], 'run.log'), encoding='utf-8', errors='replace') as log:
+        output = log.read()
+    assert job['status'] == 'done', job['error'] or output[-3000:]
+    assert 'Budget vs actual' in output
+
+    with open(jobs.guide_path(job['job_id']), encoding='utf-8') as f:
+        assert f.read().strip() == GUIDE
+    assert set(job['stage_timings']) == set(STAGES)
+    assert 'vision' in fake_llm
+
+    with open(os.path.join('jobs', job['job_id'], MANIFEST_FILE), encoding='utf-8') as f:
+        manifest = json.load(f)
+    assert manifest['screenshots']
+    assert manifest['transcript'] is not None
+
+
+def test_job_queue_rejects_root_outside_working_directory(job_dir):
+    with pytest.raises(ValueError, match="under the working directory"):
+        JobQueue(os.path.join(os.path.dirname(str(job_dir)), 'elsewhere'))
@@ -0,0 +1,102 @@
+"""Transcript track choice and the transcript cache, with a stand-in source"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_video_study_guide.tools.transcript_engine import (  # noqa: E402
+    GENERATED_TRANSCRIPT_MAX_AGE_DAYS, TRANSCRIPT_CACHE_MAX_AGE_DAYS, Track, TranscriptEngine, choose_track)
+
+
+def track(code, generated=False):
+    return Track(code, generated, lambda: [{'text': f"{code} line", 'start': 0.0, 'duration': 2.0}])
+
+
+class StandInSource:
+    """The transcript API's listing for each video ID, changeable between calls"""
+    name = "stand-in"
+    listing_requests = 1
+
+    def __init__(self, listings):
+        self.listings = listings
+
+    def tracks(self, video_id):
+        return [track(code, generated) for code, generated in self.listings.get(video_id, [])]
+
+
+def choice(tracks, languages=('en', 'en-US', 'en-GB')):
+    chosen = choose_track(tracks, languages)
+    return chosen and (chosen.language_code, chosen.is_generated)
+
+
+def test_choose_track():
+    assert choice([track('en', True), track('en')]) == ('en', False)
+    assert choice([track('en-GB'), track('en-US')]) == ('en-US', False)
+    assert choice([track('en', True), track('de')]) == ('en', True)
+    assert choice([track('de'), track('en-AU', True)]) == ('en-AU', True)
+    assert choice([track('fr'), track('de-orig', True)]) == ('de-orig', True)
+    assert choice([track('fr'), track('en')], languages=('fr',)) == ('fr', False)
+    assert choice([]) is None
+
+
+def age(cache_dir, days):
+    """Backdates every cached transcript by `days`"""
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        when = time.time() - days * 86400
+        os.utime(path, (when, when))
+
+
+def test_cached_transcript_makes_no_requests(tmp_path):
+    source = StandInSource({'lecture': [('de', False), ('en', True)]})
+    result, warnings = TranscriptEngine(cache_dir=str(tmp_path), sources=[source]).get('lecture')
+    assert (result['language'], result['generated'], warnings) == ('en', True, [])
+
+    engine = TranscriptEngine(cache_dir=str(tmp_path), sources=[source])
+    assert engine.get('lecture') == (result, [])
+    assert engine.requests == 0
+
+
+def test_cache_is_keyed_by_language_preference(tmp_path):
+    source = StandInSource({'lecture': [('de', False), ('en', False)]})
+    english, _ = TranscriptEngine(cache_dir=str(tmp_path), sources=[source]).get('lecture')
+    german, _ = TranscriptEngine(['de'], cache_dir=str(tmp_path), sources=[source]).get('lecture')
+    assert (english['language'], german['language']) == ('en', 'de')
+    assert TranscriptEngine(cache_dir=str(tmp_path), sources=[source]).get('lecture')[0] == english
+
+
+def test_generated_transcript_is_replaced_by_a_later_manual_one(tmp_path):
+    listings = {'lecture': [('en', True)]}
+    source = StandInSource(listings)
+    TranscriptEngine(cache_dir=str(tmp_path), sources=[source]).get('lecture')
+    listings['lecture'].append(('en', False))
+
+    engine = TranscriptEngine(cache_dir=str(tmp_path), sources=[source])
+    assert engine.get('lecture')[0]['generated'] is True  # Still fresh
+    assert engine.requests == 0
+
+    age(str(tmp_path), GENERATED_TRANSCRIPT_MAX_AGE_DAYS + 1)
+    engine = TranscriptEngine(cache_dir=str(tmp_path), sources=[source])
+    assert engine.get('lecture')[0]['generated'] is False
+    assert engine.requests == 2
+
+    # The manual entry now wins over the stale generated one without any request
+    engine = TranscriptEngine(cache_dir=str(tmp_path), sources=[source])
+    assert engine.get('lecture')[0]['generated'] is False
+    assert engine.requests == 0
+
+
+def test_manual_transcript_expires(tmp_path):
+    source = StandInSource({'lecture': [('en', False)]})
+    TranscriptEngine(cache_dir=str(tmp_path), sources=[source]).get('lecture')
+
+    age(str(tmp_path), TRANSCRIPT_CACHE_MAX_AGE_DAYS - 1)
+    engine = TranscriptEngine(cache_dir=str(tmp_path), sources=[source])
+    engine.get('lecture')
+    assert engine.requests == 0
+
+    age(str(tmp_path), TRANSCRIPT_CACHE_MAX_AGE_DAYS + 1)
+    engine = TranscriptEngine(cache_dir=str(tmp_path), sources=[source])
+    engine.get('lecture')
+    assert engine.requests == 2
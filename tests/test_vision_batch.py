@@ -0,0 +1,132 @@
+"""Batch vision analysis and the chat client's retries against a local stub server"""
+import http.server
+import json
+import os
+import sys
+import threading
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crewai_video_study_guide.tools import llm_client  # noqa: E402
+from src.crewai_video_study_guide.tools.llm_client import ChatClient, LLMError  # noqa: E402
+from src.crewai_video_study_guide.tools.vision_batch import BatchVisionAnalyzer, split_batch_reply  # noqa: E402
+
+
+def completion(content):
+    return json.dumps({'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}}],
+                       'usage': {'prompt_tokens': 10, 'completion_tokens': 5}}).encode('utf-8')
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """Answers each POST with the next queued (status, body); records the image count of every request"""
+    replies = None
+    images = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.images.append(sum(1 for part in body['messages'][0]['content'] if part.get('type') == 'image_url'))
+        status, data = self.replies.pop(0) if self.replies else (200, completion("Unexpected request"))
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """(client, queued replies, image counts received); retries don't sleep"""
+    handler = type('Handler', (StubHandler,), {'replies': [], 'images': []})
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(llm_client, 'time', types.SimpleNamespace(sleep=lambda seconds: None))
+    client = ChatClient('openai', 'stub', f"http://127.0.0.1:{server.server_address[1]}/v1", api_key='stub')
+    yield client, handler.replies, handler.images
+    server.shutdown()
+
+
+def screenshots(count):
+    return [{'path': f"shot_{i}.jpg", 'times': [f"00_{i:02d}"], 'image': b'jpeg %d' % i} for i in range(count)]
+
+
+def test_split_batch_reply():
+    reply = "### Image 1\nA title slide.\n\n### Image 2\nA chart.\n## image 3 (code)\nA loop."
+    assert split_batch_reply(reply, 3) == ["A title slide.", "A chart.", "A loop."]
+    assert split_batch_reply(reply, 2) is None
+    assert split_batch_reply("### Image 2\nA chart.\n### Image 1\nA title slide.", 2) is None
+    assert split_batch_reply("Both images show slides.", 2) is None
+
+
+def test_batch_reply_is_split_per_image(stub):
+    client, replies, images = stub
+    replies.append((200, completion("### Image 1\nFirst.\n### Image 2\nSecond.\n### Image 3\nThird.")))
+
+    analyzer = BatchVisionAnalyzer(client, batch_size=3, max_rpm=6000)
+    results = analyzer.analyze(screenshots(3))
+    assert [r['analysis'] for r in results] == ["First.", "Second.", "Third."]
+    assert images == [3]
+    assert analyzer.usage == {'prompt_tokens': 10, 'completion_tokens': 5}
+
+
+def test_unsplittable_batch_reply_falls_back_to_one_request_per_image(stub):
+    client, replies, images = stub
+    replies.append((200, completion("All three screenshots show lecture slides.")))
+    replies.extend((200, completion(f"Slide {i}.")) for i in range(3))
+
+    analyzer = BatchVisionAnalyzer(client, batch_size=3, max_rpm=6000)
+    results = analyzer.analyze(screenshots(3))
+    assert [r['analysis'] for r in results] == ["Slide 0.", "Slide 1.", "Slide 2."]
+    assert images == [3, 1, 1, 1]
+    assert analyzer.requests == 4
+
+
+def test_failed_batch_falls_back_and_reports_failed_images(stub):
+    client, replies, images = stub
+    replies.extend([(500, b'{}')] * llm_client.MAX_ATTEMPTS)  # the batch
+    replies.append((200, completion("Slide 0.")))
+    replies.extend([(503, b'{}')] * llm_client.MAX_ATTEMPTS)  # the second image
+
+    analyzed = []
+    analyzer = BatchVisionAnalyzer(client, batch_size=2, max_rpm=6000)
+    results = analyzer.analyze(screenshots(2), on_analyzed=lambda shot, analysis: analyzed.append(shot['path']))
+    assert results[0]['analysis'] == "Slide 0."
+    assert results[1]['analysis'].startswith("Analysis failed: openai request failed: HTTP 503")
+    assert analyzed == ["shot_0.jpg"]
+    assert images == [2] * llm_client.MAX_ATTEMPTS + [1] + [1] * llm_client.MAX_ATTEMPTS
+
+
+def test_client_retries_server_errors_and_malformed_replies(stub):
+    client, replies, images = stub
+    replies.extend([(503, b'{}'), (200, b'<html>Bad gateway</html>'), (200, b'{"choices": []}'),
+                    (200, completion("Done."))])
+    assert client.complete([{'role': 'user', 'content': []}]) == (
+        "Done.", {'prompt_tokens': 10, 'completion_tokens': 5})
+    assert len(images) == 4
+
+
+def test_client_raises_llm_error_when_every_reply_is_malformed(stub):
+    client, replies, images = stub
+    replies.extend([(200, b'{"error": "overloaded"}')] * llm_client.MAX_ATTEMPTS)
+    with pytest.raises(LLMError, match="malformed reply"):
+        client.complete([{'role': 'user', 'content': []}])
+    assert len(images) == llm_client.MAX_ATTEMPTS
+
+
+def test_client_does_not_retry_client_errors(stub):
+    client, replies, images = stub
+    replies.append((400, b'{"error": "bad request"}'))
+    with pytest.raises(LLMError, match="HTTP 400"):
+        client.complete([{'role': 'user', 'content': []}])
+    assert len(images) == 1
+
+
+def test_unknown_provider_is_rejected():
+    assert ChatClient(api_key='x').provider == llm_client.DEFAULT_PROVIDER
+    with pytest.raises(ValueError, match="claude"):
+        ChatClient('claude')